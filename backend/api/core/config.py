@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings
 from pydantic import ConfigDict
-from typing import List
+from typing import List, Optional
 import os
 
 class Settings(BaseSettings):
@@ -12,7 +12,8 @@ class Settings(BaseSettings):
     BACKEND_CORS_ORIGINS: List[str] = ["http://localhost", "http://localhost:3000"]
     
     # Configurações EEG
-    SAMPLING_RATE: float = 128.0
+    SAMPLING_RATE: float = 128.0  # taxa de análise
+    DEVICE_SAMPLING_RATE: Optional[float] = None  # ex.: 500 ou 1000 (decimado para SAMPLING_RATE)
     BUFFER_SIZE: int = 1000  # ~7.8 segundos @ 128Hz
     DEFAULT_CHANNELS: List[str] = [
         'AF3', 'F7', 'F3', 'FC5', 'T7', 'P7', 'O1',
@@ -22,6 +23,36 @@ class Settings(BaseSettings):
     # Configurações processamento
     PROCESS_BATCH_SIZE: int = 128  # 1 segundo de dados
     MIN_SIGNAL_QUALITY: float = 0.5
+    PROCESSING_DTYPE: str = 'float64'  # 'float32' reduz memória e tempo de FFT
+    
+    # Gravações (arquivos ou diretórios) reproduzidas em /ws/stream;
+    # 'synthetic' ou 'synthetic:<semente>' usa um headset sintético
+    REPLAY_SOURCES: List[str] = ['data/eeg-eye-state.csv']
+    REPLAY_PREFETCH: int = 32  # janelas decodificadas à frente
+    
+    # Sessões gravadas (um diretório por sessão)
+    SESSION_DIR: str = 'data/sessions'
+    SESSION_FSYNC_INTERVAL: float = 1.0  # segundos entre fsync durante a gravação
+    SESSION_RESOLUTION: float = 20 / 39  # LSB do dispositivo em µV (Emotiv EPOC)
+    SESSION_DECIMALS: Optional[int] = 2  # casas decimais exportadas pelo dispositivo
+    
+    # Resultados por época em partições colunares (None desativa)
+    RESULTS_DIR: Optional[str] = 'data/results'
+    RESULTS_FORMAT: str = 'npz'  # 'npz' ou 'parquet' (requer pyarrow)
+    RESULTS_BATCH_SIZE: int = 1024  # épocas por partição
+    RESULTS_FLUSH_INTERVAL: float = 10.0  # segundos máximos em memória
+    
+    # Agregados para /eeg/summary e /eeg/trends
+    ROLLUP_MAX_POINTS: int = 300  # buckets por consulta
+    ROLLUP_MAX_SESSIONS: int = 16  # sessões com agregados mantidos em memória
+    
+    # Pontos máximos por canal enviados aos gráficos (/eeg/process)
+    VISUALIZATION_WIDTH: int = 512
+    
+    # Modelo treinado carregado na inicialização (opcional)
+    MODEL_PATH: Optional[str] = None
+    INFERENCE_MAX_WAIT_MS: float = 2.0  # janela de agrupamento das predições entre sessões
+    INFERENCE_MAX_BATCH: int = 64
     
     model_config = ConfigDict(
         case_sensitive=True,
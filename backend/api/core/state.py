@@ -1,5 +1,5 @@
 from dataclasses import dataclass, field
-from typing import Set, Dict, List, Optional
+from typing import Set, Dict, Iterator, List, Optional, Union
 from collections import deque
 from fastapi import WebSocket
 import numpy as np
@@ -10,11 +10,48 @@ import json
 from src.signal_processor import EEGProcessor, SignalConfig
 from src.attention_bci import AttentionBCI, BCIConfig
 from src.data_loader import EEGDataLoader
-from api.models.schemas import EEGDataPoint, ProcessedEEG
+from src.ingest import align_channels
+from src.session_recorder import SessionRecorder, SessionRecording
+from src.session_archive import compress_session, open_session
+from src.results_sink import ResultsSink
+from src.rollups import RollupStore
+from api.models.schemas import EEGDataPoint, ProcessedEEG, AnalysisRequest
+from api.core.config import settings
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+LIVE_SESSION = 'live'  # agregados dos dados processados fora de gravações
+
+def _select_record(
+    record: Dict,
+    channels: Optional[Set[str]],
+    fields: Optional[Dict[str, Optional[Set[str]]]]
+) -> Dict:
+    """Copia de um registro do buffer apenas os canais/campos pedidos"""
+    selected = {'timestamp': record['timestamp']}
+    if channels is None or channels:
+        selected['channels'] = {
+            ch: values.tolist() if isinstance(values, np.ndarray) else values
+            for ch, values in record.get('channels', {}).items()
+            if channels is None or ch in channels
+        }
+    for name, value in record.items():
+        if name in ('timestamp', 'channels') or name.startswith('_'):
+            continue
+        if fields is None or (name in fields and fields[name] is None):
+            selected[name] = value
+        elif name in fields and isinstance(value, dict):
+            selected[name] = {k: v for k, v in value.items() if k in fields[name]}
+    return selected
+
+def _session_rollups(session: SessionRecording) -> RollupStore:
+    """Agregados de uma sessão gravada a partir de results.jsonl"""
+    store = RollupStore()
+    for timestamp, result in zip(session.result_index['timestamp'], session.results()):
+        store.add(float(timestamp), result)
+    return store
+
 class GlobalState:
     """Gerencia estado global da aplicação"""
     
@@ -28,7 +65,8 @@ class GlobalState:
         # Buffers e estado
         self.data_buffer = deque(maxlen=buffer_size)
         self.clients: Set[WebSocket] = set()
-        self.session_data: List[Dict] = []
+        self.recorder: Optional[SessionRecorder] = None  # sessão em gravação
+        self.session: Optional[SessionRecording] = None  # última sessão gravada/carregada
         self.is_recording = False
         
         # Métricas e estatísticas
@@ -43,10 +81,62 @@ class GlobalState:
         
         # Componentes do sistema
         self.processor = EEGProcessor(
-            SignalConfig(sfreq=128.0, buffer_size=buffer_size, window_size=int(128*0.5))
+            SignalConfig(
+                sfreq=settings.SAMPLING_RATE,
+                input_sfreq=settings.DEVICE_SAMPLING_RATE,
+                buffer_size=buffer_size,
+                window_size=int(128*0.5),
+                dtype=settings.PROCESSING_DTYPE
+            )
         )
-        self.bci = AttentionBCI()
+        self.bci = self._load_bci()
         self.data_loader = EEGDataLoader(buffer_size=buffer_size)
+        self.results_sink = self._create_results_sink()
+        # Agregados por sessão (nome do diretório em SESSION_DIR)
+        self.session_rollups: Dict[str, RollupStore] = {LIVE_SESSION: RollupStore()}
+        self.rollup_session = LIVE_SESSION  # sessão alimentada por process_data
+
+    def _load_bci(self) -> AttentionBCI:
+        """Carrega o modelo salvo em MODEL_PATH, se houver"""
+        inference = {
+            'inference_max_wait_ms': settings.INFERENCE_MAX_WAIT_MS,
+            'inference_max_batch': settings.INFERENCE_MAX_BATCH
+        }
+        if settings.MODEL_PATH and Path(settings.MODEL_PATH).exists():
+            try:
+                return AttentionBCI.load(settings.MODEL_PATH, **inference)
+            except Exception as e:
+                logger.error(f"Modelo em {settings.MODEL_PATH} ignorado: {str(e)}")
+        return AttentionBCI(BCIConfig(dtype=settings.PROCESSING_DTYPE, **inference))
+
+    @property
+    def rollups(self) -> RollupStore:
+        """Agregados da sessão em andamento (gravação atual ou LIVE_SESSION)"""
+        return self.session_rollups[self.rollup_session]
+
+    def get_rollups(self, session: Optional[str] = None) -> RollupStore:
+        """Agregados de uma sessão (None = sessão em andamento); KeyError se desconhecida"""
+        return self.rollups if session is None else self.session_rollups[session]
+
+    def _set_rollups(self, session: str, store: RollupStore) -> None:
+        """Registra os agregados de uma sessão, descartando os mais antigos além de ROLLUP_MAX_SESSIONS"""
+        self.session_rollups.pop(session, None)
+        self.session_rollups[session] = store
+        removable = [k for k in self.session_rollups if k not in (LIVE_SESSION, self.rollup_session, session)]
+        while len(self.session_rollups) > settings.ROLLUP_MAX_SESSIONS + 1 and removable:
+            del self.session_rollups[removable.pop(0)]
+
+    def _create_results_sink(self) -> Optional[ResultsSink]:
+        """Coletor de resultados por época em RESULTS_DIR, se configurado"""
+        if not settings.RESULTS_DIR:
+            return None
+        return ResultsSink(
+            settings.RESULTS_DIR,
+            channels=self.processor.config.channels,
+            batch_size=settings.RESULTS_BATCH_SIZE,
+            flush_interval=settings.RESULTS_FLUSH_INTERVAL,
+            format=settings.RESULTS_FORMAT
+        )
 
     async def process_data(self, data: Dict) -> Dict:
         try:
@@ -54,27 +144,30 @@ class GlobalState:
             logger.info(f"Dados recebidos: {data['channels'].keys()}")
             logger.info(f"Tamanho dos canais: {[len(v) for v in data['channels'].values()]}")
 
-            channels_data = []
-            for ch in self.processor.config.channels:
-                ch_data = data['channels'].get(ch, [])
-                # Verifica se há dados válidos
-                if not ch_data:
-                    ch_data = np.random.normal(0, 0.1, self.processor.config.window_size)
-                elif len(ch_data) != self.processor.config.window_size:
-                    # Interpola para o tamanho correto
-                    old_x = np.linspace(0, 1, len(ch_data))
-                    new_x = np.linspace(0, 1, self.processor.config.window_size)
-                    ch_data = np.interp(new_x, old_x, ch_data)
-                channels_data.append(ch_data)
-            
-            channels_array = np.array(channels_data, dtype=np.float64)
+            # Alinha todos os canais de uma vez e mascara os ausentes
+            channels_array, channel_mask = align_channels(
+                data['channels'],
+                self.processor.config.channels,
+                self.processor.input_window_size,
+                dtype=self.processor.dtype
+            )
+            if not np.any(channel_mask):
+                raise ValueError("Nenhum canal válido nos dados recebidos")
             logger.info(f"Shape do array processado: {channels_array.shape}")
             
             if np.all(channels_array == 0):
                 logger.error("Array contém apenas zeros após processamento")
             
-            processed = await self.processor.process_async(channels_array)
-            result = await self.bci.process_epoch(processed)
+            # Apenas decima aqui (blocos de fluxos diferentes não compartilham
+            # o estado de reamostragem); o processamento ocorre uma única vez
+            # em process_epoch, como no treinamento
+            epoch = await asyncio.to_thread(
+                self.processor.resample, channels_array, data.get('stream_id')
+            )
+            result = await self.bci.process_epoch(epoch, channel_mask)
+            if self.bci.is_trained:
+                # Predição no micro-lote compartilhado pelas sessões concorrentes
+                result.update(await self.bci.predict_features(result['features']))
             
             '''
             processed_result = {
@@ -106,6 +199,27 @@ class GlobalState:
                     'overall_score': float(result['quality']['overall_score'])
                 }
             }
+            if 'prediction' in result:
+                processed_result['prediction'] = {
+                    'label': result['prediction'],
+                    'probabilities': result['probabilities'],
+                    'confidence': result['confidence'],
+                    'model_version': result['model_version']
+                }
+            
+            if self.is_recording:
+                # Escrita e fsync fora do event loop
+                await asyncio.to_thread(self._record, self.recorder, data, processed_result)
+            if self.results_sink is not None:
+                self.results_sink.append(data['timestamp'], result)
+            self.rollups.add(data['timestamp'], result)
+            self.add_data({
+                'timestamp': data['timestamp'],
+                'channels': data['channels'],
+                'attention_metrics': processed_result['attention_metrics'],
+                'band_powers': processed_result['band_powers'],
+                'quality_metrics': processed_result['quality_metrics']
+            })
             
             self.stats['total_processed'] += 1
             return processed_result
@@ -142,15 +256,141 @@ class GlobalState:
             return []
     
     def add_data(self, data: Dict) -> None:
-        """Adiciona dados ao buffer"""
+        """Adiciona dados ao buffer (canais guardados como arrays, não listas)"""
         self.data_buffer.append({
             **data,
+            'channels': {
+                ch: np.asarray(values, dtype=np.float64)
+                for ch, values in data.get('channels', {}).items()
+            },
             '_added_time': datetime.now().timestamp()
         })
+
+    def iter_analysis(self, request: AnalysisRequest) -> Iterator[Dict]:
+        """
+        Registros do buffer no período, já prontos para serialização
         
-        # Se estiver gravando, adiciona aos dados da sessão
+        Apenas os canais (request.channels) e campos (request.metrics,
+        como 'band_powers' ou 'band_powers.alpha') pedidos são convertidos;
+        com apenas metrics, os sinais brutos não são incluídos.
+        O buffer é copiado (apenas as referências) na chamada, então o
+        gerador pode ser consumido enquanto novos dados chegam.
+        """
+        records = list(self.data_buffer)
+        # Sem seleção alguma, tudo; com apenas metrics, nenhum canal
+        channels = None
+        if request.channels is not None:
+            channels = set(request.channels)
+        elif request.metrics is not None:
+            channels = set()
+        fields: Optional[Dict[str, Optional[Set[str]]]] = None
+        if request.metrics is not None:
+            fields = {}
+            for metric in request.metrics:
+                name, _, key = metric.partition('.')
+                if not key:
+                    fields[name] = None  # campo inteiro
+                elif fields.get(name, set()) is not None:
+                    fields.setdefault(name, set()).add(key)
+
+        def generate() -> Iterator[Dict]:
+            for record in records:
+                timestamp = record['timestamp']
+                if request.start_time is not None and timestamp < request.start_time:
+                    continue
+                if request.end_time is not None and timestamp > request.end_time:
+                    continue
+                yield _select_record(record, channels, fields)
+
+        return generate()
+
+    @property
+    def session_data(self) -> Union[SessionRecorder, SessionRecording, List]:
+        """Sessão em gravação ou última sessão; len() é o número de amostras"""
+        if self.recorder is not None:
+            return self.recorder
+        return self.session if self.session is not None else []
+
+    async def shutdown(self) -> None:
+        """Finaliza gravação e grava os resultados pendentes"""
+        await self.stop_recording()
+        if self.results_sink is not None:
+            await asyncio.to_thread(self.results_sink.close)
+
+    async def start_recording(self) -> None:
+        """Inicia a gravação de uma nova sessão em SESSION_DIR"""
+        if self.is_recording:
+            return
+        config = self.processor.config
+        self.recorder = SessionRecorder(
+            self._session_path(datetime.now().strftime('%Y%m%d-%H%M%S-%f')),
+            channels=config.channels,
+            sfreq=config.input_sfreq or config.sfreq,
+            fsync_interval=settings.SESSION_FSYNC_INTERVAL
+        )
+        self._set_rollups(self.recorder.path.name, RollupStore())
+        self.rollup_session = self.recorder.path.name
+        self.is_recording = True
+        logger.info(f"Gravação iniciada em {self.recorder.path}")
+
+    async def stop_recording(self) -> None:
+        """Finaliza a gravação e abre a sessão gravada"""
+        if not self.is_recording:
+            return
+        self.is_recording = False
+        recorder, self.recorder = self.recorder, None
+        self.rollup_session = LIVE_SESSION
+        await asyncio.to_thread(recorder.close)
+        if recorder.path.exists():
+            self.session = SessionRecording(recorder.path)
+        logger.info(f"Gravação finalizada: {len(recorder)} amostras")
+
+    async def save_session(self, filename: str) -> None:
+        """Arquiva a última sessão, comprimida, em SESSION_DIR/filename"""
         if self.is_recording:
-            self.session_data.append(data)
+            raise RuntimeError("Finalize a gravação antes de salvar a sessão")
+        if self.session is None:
+            raise ValueError("Nenhuma sessão gravada")
+        target = self._session_path(filename)
+        if target.exists():
+            raise FileExistsError(f"Sessão já existe: {target}")
+        # Compressão em blocos, sem carregar os sinais na memória
+        source = self.session.path.name
+        self.session = await asyncio.to_thread(
+            compress_session,
+            self.session,
+            target,
+            resolution=settings.SESSION_RESOLUTION,
+            decimals=settings.SESSION_DECIMALS
+        )
+        if source in self.session_rollups:
+            self._set_rollups(target.name, self.session_rollups[source])
+
+    async def load_session(self, filename: str) -> None:
+        """Abre (via memory-map) uma sessão de SESSION_DIR"""
+        path = self._session_path(filename)
+        if not path.exists():
+            raise FileNotFoundError(f"Sessão não encontrada: {path}")
+        self.session = await asyncio.to_thread(open_session, path)
+        if path.name not in self.session_rollups:
+            # Reconstruídos uma vez a partir dos resultados gravados
+            self._set_rollups(path.name, await asyncio.to_thread(_session_rollups, self.session))
+
+    def _record(self, recorder: SessionRecorder, data: Dict, result: Dict) -> None:
+        """
+        Grava as amostras recebidas, na taxa do dispositivo, e o resultado
+        
+        Em payloads com taxas mistas, canais mais curtos são reamostrados
+        para o comprimento do mais longo (o arquivo tem uma única taxa).
+        """
+        n_samples = max(len(v) for v in data['channels'].values())
+        block, mask = align_channels(data['channels'], self.processor.config.channels, n_samples)
+        recorder.append(data['timestamp'], block, result, mask)
+
+    @staticmethod
+    def _session_path(name: str) -> Path:
+        # Apenas o nome: sessões ficam sempre dentro de SESSION_DIR
+        return Path(settings.SESSION_DIR) / Path(name).name
 
     def get_processing_stats(self) -> Dict:
         """Retorna estatísticas de processamento"""
@@ -159,7 +399,9 @@ class GlobalState:
             'errors': self.stats['errors'],
             'last_error': self.stats['last_error'],
             'quality_metrics': dict(self.stats['quality_metrics']),
-            'processing_times': list(self.stats['processing_times'])
+            'processing_times': list(self.stats['processing_times']),
+            'inference': self.bci.batcher.get_stats(),
+            'results': self.results_sink.get_stats() if self.results_sink is not None else None
         }
     
     async def broadcast(self, message: Dict):
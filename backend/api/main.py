@@ -3,7 +3,7 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from .core.config import settings
-from .core.application import app
+from .core.application import app, get_state
 from .routes import eeg_router, websocket_router, session_router
 import logging
 
@@ -16,6 +16,9 @@ async def lifespan(app_: FastAPI):
     yield
     # Shutdown
     logger.info("Finalizando API...")
+    await get_state().shutdown()
+
+app.router.lifespan_context = lifespan
 
 # Adiciona CORS
 app.add_middleware(
@@ -1,11 +1,16 @@
 from pydantic import BaseModel, Field
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 
 class EEGDataPoint(BaseModel):
     """Dados EEG brutos recebidos"""
     timestamp: float = Field(..., description="Timestamp em segundos")
     channels: Dict[str, List[float]] = Field(..., description="Dados por canal")
+    stream_id: Optional[str] = Field(
+        None,
+        description="Fluxo de origem (headset/sessão); sem ele, cada bloco é "
+                    "reamostrado isoladamente, sem estado entre blocos"
+    )
 
 class AttentionMetrics(BaseModel):
     """Métricas de atenção calculadas"""
@@ -23,12 +28,23 @@ class BandPowers(BaseModel):
     beta: float = Field(..., ge=0) 
     gamma: float = Field(..., ge=0)
 
+class Prediction(BaseModel):
+    """Classificação da época pelo modelo ativo"""
+    label: int
+    probabilities: List[float]
+    confidence: float = Field(..., ge=0, le=1)
+    model_version: int
+
 class ProcessedEEG(BaseModel):
     """Resultado do processamento EEG"""
     timestamp: float
     attention_metrics: AttentionMetrics
     band_powers: BandPowers
     channel_data: Dict[str, List[float]]  # Tornando obrigatório
+    # Eixo do tempo de channel_data: start + índice / sampling_rate, com
+    # os índices das amostras mantidas nos canais reduzidos
+    channel_axis: Optional[Dict[str, Any]] = None
+    prediction: Optional[Prediction] = None  # apenas com modelo treinado
     
     class Config:
         arbitrary_types_allowed = True  # Permite tipos personalizados como numpy.ndarray
@@ -1,33 +1,51 @@
-from fastapi import APIRouter, HTTPException, WebSocket, Depends
+from fastapi import APIRouter, HTTPException, WebSocket, Depends, Query
+from fastapi.responses import StreamingResponse
 from fastapi.websockets import WebSocketDisconnect
-from typing import Dict, Optional
-from datetime import datetime
-from ..models.schemas import EEGDataPoint, ProcessedEEG
+from typing import Dict, Iterator, List, Optional, Tuple
+from ..models.schemas import EEGDataPoint, ProcessedEEG, AnalysisRequest, AnalysisSummary
+from ..core.config import settings
 from ..core.state import GlobalState
 from ..core.application import get_state
+from src.utils.visualization import prepare_eeg_visualization
 import numpy as np
 import logging
 import asyncio
+import json
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 @router.post("/process")
-async def process_eeg(data: EEGDataPoint):
-    """Processa dados EEG"""
+async def process_eeg(data: EEGDataPoint, width: Optional[int] = Query(None, ge=3)):
+    """
+    Processa dados EEG
+    
+    Os canais devolvidos (e enviados aos clientes WebSocket) são
+    reduzidos por LTTB a no máximo width pontos (limitado a
+    VISUALIZATION_WIDTH); channel_axis descreve o eixo do tempo.
+    """
     try:
         state = get_state()
         raw_result = await state.process_data(data.model_dump())
+        channel_data, channel_axis = _channel_traces(
+            data.channels, data.timestamp, min(width or settings.VISUALIZATION_WIDTH, settings.VISUALIZATION_WIDTH)
+        )
         
         # Converte arrays NumPy para floats simples
         processed_result = {
             'timestamp': raw_result['timestamp'],
-            'attention_metrics': raw_result['attention_metrics'],
+            'attention_metrics': {
+                # Qualidade geral da época como qualidade do sinal da métrica
+                'signal_quality': raw_result['quality_metrics']['overall_score'],
+                **raw_result['attention_metrics']
+            },
             'band_powers': {
                 band: float(power[0]) if isinstance(power, np.ndarray) else float(power)
                 for band, power in raw_result['band_powers'].items()
             },
-            'channel_data': data.channels  # Adiciona os dados dos canais
+            'channel_data': channel_data,
+            'channel_axis': channel_axis,
+            'prediction': raw_result.get('prediction')
         }
         
         # Envia dados processados para clientes WebSocket
@@ -42,10 +60,28 @@ async def process_eeg(data: EEGDataPoint):
         logger.error(f"Erro no processamento: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
     
+def _channel_traces(
+    channels: Dict[str, List[float]],
+    start: float,
+    width: int
+) -> Tuple[Dict[str, List[float]], Dict]:
+    """Reduz cada canal para visualização; indices só para canais reduzidos"""
+    sfreq = settings.DEVICE_SAMPLING_RATE or settings.SAMPLING_RATE
+    data, indices = {}, {}
+    for name, values in channels.items():
+        trace = prepare_eeg_visualization(np.asarray(values, dtype=np.float64), sfreq, width, 'lttb', start)
+        data[name] = trace['data'][0]
+        if trace['method']:
+            indices[name] = trace['indices'][0]
+    return data, {'start': start, 'sampling_rate': sfreq, 'indices': indices}
+
 @router.get("/analysis")
 async def get_analysis(
     start_time: Optional[float] = None,
     end_time: Optional[float] = None,
+    channels: Optional[List[str]] = Query(None),
+    metrics: Optional[List[str]] = Query(None),
+    format: str = 'json',
     state: GlobalState = Depends(get_state)
 ):
     """
@@ -54,15 +90,28 @@ async def get_analysis(
     Args:
         start_time: Timestamp inicial
         end_time: Timestamp final
+        channels: Canais a incluir (padrão: todos, ou nenhum se houver metrics)
+        metrics: Campos a incluir, ex. 'band_powers' ou 'attention_metrics.attention_score'
+        format: 'json' (documento único) ou 'ndjson' (um registro por linha, em streaming)
         state: Estado global da aplicação
     """
+    if format not in ('json', 'ndjson'):
+        raise HTTPException(status_code=400, detail=f"Formato não suportado: {format}")
+    
     try:
-        # Obtém dados do período
-        recent_data = await state.get_recent_data(
-            seconds=(end_time or datetime.now().timestamp()) - (start_time or 0)
+        request = AnalysisRequest(
+            start_time=start_time,
+            end_time=end_time,
+            channels=channels,
+            metrics=metrics
         )
+        records = state.iter_analysis(request)
         
-        if not recent_data:
+        if format == 'ndjson':
+            return StreamingResponse(_ndjson_lines(records), media_type='application/x-ndjson')
+        
+        data = list(records)
+        if not data:
             raise HTTPException(
                 status_code=404,
                 detail="Nenhum dado encontrado para o período"
@@ -72,14 +121,132 @@ async def get_analysis(
         stats = state.get_processing_stats()
         
         return {
-            'data': recent_data,
+            'data': data,
             'stats': stats
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Erro na análise: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/summary", response_model=AnalysisSummary)
+async def get_summary(
+    start_time: Optional[float] = None,
+    end_time: Optional[float] = None,
+    session: Optional[str] = None,
+    state: GlobalState = Depends(get_state)
+):
+    """
+    Resumo do período a partir dos agregados incrementais
+    
+    Args:
+        start_time: Timestamp inicial (padrão: início do histórico)
+        end_time: Timestamp final (padrão: último resultado)
+        session: Sessão gravada/carregada (padrão: sessão em andamento)
+        state: Estado global da aplicação
+    """
+    summary = _session_rollups(state, session).summary(start_time, end_time, settings.ROLLUP_MAX_POINTS)
+    if summary is None:
+        raise HTTPException(status_code=404, detail="Nenhum dado encontrado para o período")
+    return AnalysisSummary(**summary)
+
+@router.get("/trends")
+async def get_trends(
+    start_time: Optional[float] = None,
+    end_time: Optional[float] = None,
+    metrics: Optional[List[str]] = Query(None),
+    max_points: Optional[int] = None,
+    session: Optional[str] = None,
+    state: GlobalState = Depends(get_state)
+):
+    """
+    Séries agregadas (média, mínimo e máximo por bucket) das métricas
+    
+    Args:
+        start_time: Timestamp inicial
+        end_time: Timestamp final
+        metrics: Métricas (padrão: todas de ROLLUP_METRICS)
+        max_points: Buckets máximos (padrão: ROLLUP_MAX_POINTS)
+        session: Sessão gravada/carregada (padrão: sessão em andamento)
+        state: Estado global da aplicação
+    """
+    store = _session_rollups(state, session)
+    try:
+        return store.trends(
+            start_time, end_time, max_points or settings.ROLLUP_MAX_POINTS, metrics
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _session_rollups(state: GlobalState, session: Optional[str]):
+    try:
+        return state.get_rollups(session)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Sessão sem agregados: {session}")
+
+def _ndjson_lines(records: Iterator[Dict], batch_size: int = 64) -> Iterator[bytes]:
+    """Serializa registros em NDJSON, enviando batch_size linhas por bloco"""
+    lines = []
+    for record in records:
+        lines.append(json.dumps(record, default=_json_default))
+        if len(lines) >= batch_size:
+            yield ('\n'.join(lines) + '\n').encode()
+            lines = []
+    if lines:
+        yield ('\n'.join(lines) + '\n').encode()
+
+def _json_default(value):
+    """Tipos numpy em registros do buffer"""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Tipo não serializável: {type(value).__name__}")
+
+@router.get("/results")
+async def download_results(
+    start_time: Optional[float] = None,
+    end_time: Optional[float] = None,
+    columns: Optional[List[str]] = Query(None),
+    format: str = 'csv',
+    state: GlobalState = Depends(get_state)
+):
+    """
+    Exporta os resultados por época gravados pelo ResultsSink
+    
+    Args:
+        start_time: Timestamp inicial
+        end_time: Timestamp final (exclusivo)
+        columns: Colunas a exportar (CSV); padrão: todas
+        format: 'csv' (uma partição por vez) ou 'zip' (partições originais)
+        state: Estado global da aplicação
+    """
+    sink = state.results_sink
+    if sink is None:
+        raise HTTPException(status_code=404, detail="Gravação de resultados desativada (RESULTS_DIR)")
+    if format not in ('csv', 'zip'):
+        raise HTTPException(status_code=400, detail=f"Formato não suportado: {format}")
+    
+    try:
+        # Inclui o lote ainda em memória
+        await asyncio.to_thread(sink.flush)
+        if format == 'csv':
+            content = sink.iter_csv(start_time, end_time, columns)
+            media_type, filename = 'text/csv', 'results.csv'
+        else:
+            content = sink.iter_zip(start_time, end_time)
+            media_type, filename = 'application/zip', 'results.zip'
+        return StreamingResponse(
+            content,
+            media_type=media_type,
+            headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+        )
+    except Exception as e:
+        logger.error(f"Erro na exportação de resultados: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.websocket("/stream")
 async def websocket_endpoint(
     websocket: WebSocket,
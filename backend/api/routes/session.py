@@ -1,18 +1,15 @@
 from fastapi import APIRouter, HTTPException, Depends
 from typing import Dict
 from ..core.state import GlobalState
+from ..core.application import get_state
 
 router = APIRouter()
 
-def get_state():
-    """Dependency injection para GlobalState"""
-    return GlobalState()
-
 @router.post("/start")
 async def start_session(state: GlobalState = Depends(get_state)):
     """Inicia gravação de sessão"""
     try:
-        state.is_recording = True
+        await state.start_recording()
         return {"message": "Gravação iniciada"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -21,7 +18,7 @@ async def start_session(state: GlobalState = Depends(get_state)):
 async def stop_session(state: GlobalState = Depends(get_state)):
     """Para gravação de sessão"""
     try:
-        state.is_recording = False
+        await state.stop_recording()
         return {
             "message": "Gravação finalizada",
             "samples": len(state.session_data)
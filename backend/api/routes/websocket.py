@@ -2,6 +2,9 @@ from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from typing import List
 from ..core.state import GlobalState
 from ..core.application import get_state
+from ..core.config import settings
+from src.streaming import PrefetchingLoader
+from src.synthetic import replay_sources
 import asyncio
 
 router = APIRouter()
@@ -9,15 +12,27 @@ router = APIRouter()
 @router.websocket("/stream")
 async def websocket_endpoint(websocket: WebSocket):
     state = get_state()
-    data_loader = state.data_loader
+    # Leitura antecipada em thread: o event loop nunca espera por I/O
+    loader = PrefetchingLoader(
+        replay_sources(
+            settings.REPLAY_SOURCES,
+            state.processor.config.channels,
+            settings.DEVICE_SAMPLING_RATE or settings.SAMPLING_RATE
+        ),
+        window=settings.PROCESS_BATCH_SIZE,
+        channels=state.processor.config.channels,
+        max_prefetch=settings.REPLAY_PREFETCH,
+        repeat=True
+    )
 
     await websocket.accept()
     print("connection open")
+    stream = f'ws-{id(websocket)}'
+    state.processor.reset(stream)
     
     try:
-        while True:
-            data = data_loader.get_next_sample()
-            result = await state.process_data(data)
+        async for window in loader:
+            result = await state.process_data({**window.to_payload(), 'stream_id': stream})
             await websocket.send_json(result)
             await asyncio.sleep(1/128)
             
@@ -28,4 +43,7 @@ async def websocket_endpoint(websocket: WebSocket):
         try:
             await websocket.close()
         except:
-            pass
\ No newline at end of file
+            pass
+    finally:
+        loader.close()
+        state.processor.reset(stream)
\ No newline at end of file
@@ -0,0 +1,68 @@
+"""
+Benchmark dos backends de classificação nos dados de olho aberto/fechado
+
+Extrai as características das épocas de data/eeg-eye-state.csv (com
+cache em FeatureStore, então só a primeira execução é lenta) e compara,
+para cada backend de BCIConfig.classifier, tempo de ajuste, latência de
+inferência por época e acurácia em um conjunto de teste temporal
+(últimos 30% das épocas, evitando vazamento entre janelas sobrepostas).
+
+Uso: python scripts/benchmark_classifiers.py [max_epochs]
+"""
+import sys
+import time
+import asyncio
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+from src.attention_bci import AttentionBCI, BCIConfig
+from src.data_loader import EyeStateDataset
+from src.training import CLASSIFIER_BACKENDS, DEFAULT_MODEL_PARAMS, fit_classifier
+
+WINDOW = 128
+HOP = 64
+
+def load_epochs(max_epochs: int = None):
+    dataset = EyeStateDataset(ROOT / 'data' / 'eeg-eye-state.csv')
+    X, y = dataset.epochs(WINDOW, HOP)
+    return X[:max_epochs], y[:max_epochs]
+
+def _latency_ms(fn, row, repeats=200):
+    fn(row)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn(row)
+    return (time.perf_counter() - start) / repeats * 1000.0
+
+async def main(max_epochs: int = None):
+    X, y = load_epochs(max_epochs)
+    bci = AttentionBCI(BCIConfig(
+        feature_store_path=str(ROOT / 'data' / 'feature_store'),
+        n_jobs=-1
+    ))
+    start = time.perf_counter()
+    features = await bci.extract_features(X)
+    print(f"{len(X)} épocas, {features.shape[1]} características ({time.perf_counter() - start:.1f} s)")
+
+    split = int(len(X) * 0.7)
+    for backend in CLASSIFIER_BACKENDS:
+        start = time.perf_counter()
+        scaler, classifier, _ = fit_classifier(
+            features[:split], y[:split], DEFAULT_MODEL_PARAMS[backend], backend
+        )
+        fit_time = time.perf_counter() - start
+
+        X_test = scaler.transform(features[split:])
+        accuracy = classifier.score(X_test, y[split:])
+        latency = _latency_ms(
+            lambda row: classifier.predict_proba(scaler.transform(row)),
+            features[split:split + 1]
+        )
+        print(
+            f"{backend:24s} ajuste={fit_time * 1000:8.1f} ms  "
+            f"inferência={latency:.3f} ms/época  acurácia={accuracy:.3f}"
+        )
+
+if __name__ == '__main__':
+    asyncio.run(main(*(int(arg) for arg in sys.argv[1:])))
@@ -0,0 +1,46 @@
+"""
+Benchmark de latência de inferência por época
+
+Compara o predict_proba do GradientBoostingClassifier com o avaliador
+vetorizado (CompiledEnsemble) para uma linha e para um micro-lote.
+
+Uso: python scripts/benchmark_inference.py [n_features]
+"""
+import sys
+import time
+import numpy as np
+from pathlib import Path
+from sklearn.ensemble import GradientBoostingClassifier
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.tree_ensemble import CompiledEnsemble
+
+def _time_per_call(fn, X, repeats=200):
+    fn(X)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn(X)
+    return (time.perf_counter() - start) / repeats * 1000.0
+
+def main(n_features: int = 1000):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(2000, n_features))
+    y = (X[:, 0] + X[:, 1] ** 2 > 1).astype(int)
+    classifier = GradientBoostingClassifier(n_estimators=100, max_depth=3, random_state=42).fit(X, y)
+    ensemble = CompiledEnsemble.from_sklearn(classifier)
+
+    X_test = rng.normal(size=(64, n_features))
+    diff = np.abs(ensemble.predict_proba(X_test) - classifier.predict_proba(X_test)).max()
+    print(f"Diferença máxima de probabilidade: {diff:.2e}")
+
+    for batch in (1, 64):
+        rows = X_test[:batch]
+        sk = _time_per_call(classifier.predict_proba, rows)
+        compiled = _time_per_call(ensemble.predict_proba, rows)
+        print(
+            f"lote={batch:3d}  sklearn={sk:.3f} ms  compilado={compiled:.3f} ms  "
+            f"({sk / compiled:.1f}x, {compiled / batch * 1000:.1f} µs/época)"
+        )
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,110 @@
+"""
+Teste de carga com headsets sintéticos
+
+Modo 'process': cada headset virtual envia um bloco por intervalo para
+POST /eeg/process. Modo 'ws': cada headset abre uma conexão em
+/ws/stream (use REPLAY_SOURCES=["synthetic"] no servidor) e conta as
+mensagens recebidas. Ao final, imprime vazão, erros e percentis de
+latência para encontrar o limite de capacidade local.
+
+Os canais usam os nomes da montagem do servidor (SignalConfig.channels);
+--channels abaixo de 14 envia apenas os primeiros, que o servidor
+processa mascarando os ausentes.
+
+Uso: python scripts/load_test.py --headsets 32 --seconds 30 [--mode ws]
+"""
+import sys
+import time
+import json
+import asyncio
+import argparse
+import numpy as np
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.synthetic import SyntheticConfig, SyntheticFleet
+
+def build_fleet(n_headsets: int, n_channels: int, sfreq: float) -> SyntheticFleet:
+    """Headsets com os primeiros n_channels canais da montagem do servidor"""
+    montage = SyntheticConfig().channels
+    if not 1 <= n_channels <= len(montage):
+        raise ValueError(f"--channels deve estar entre 1 e {len(montage)} (canais da montagem)")
+    return SyntheticFleet(n_headsets, SyntheticConfig(channels=montage[:n_channels], sfreq=sfreq))
+
+async def run_process(args, fleet, latencies, errors, transport=None):
+    import httpx
+    url = f"{args.url}/api/v1/eeg/process"
+    n_samples = int(args.block * fleet.config.sfreq)
+    deadline = time.perf_counter() + args.seconds
+
+    async def headset_loop(client, headset):
+        next_send = time.perf_counter()
+        while time.perf_counter() < deadline:
+            # Um fluxo por headset: estado de reamostragem separado no servidor
+            payload = {**headset.payload(n_samples, time.time()), 'stream_id': f'load-{headset.headset_id}'}
+            start = time.perf_counter()
+            try:
+                response = await client.post(url, json=payload)
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+            except Exception as e:
+                errors.append(str(e))
+            # Tempo real: um bloco por intervalo (0 = o mais rápido possível)
+            next_send += args.block if args.realtime else 0
+            await asyncio.sleep(max(0.0, next_send - time.perf_counter()))
+
+    async with httpx.AsyncClient(timeout=30, transport=transport) as client:
+        await asyncio.gather(*(headset_loop(client, h) for h in fleet))
+
+async def run_ws(args, fleet, latencies, errors):
+    import websockets
+    url = args.url.replace('http', 'ws', 1) + "/api/v1/ws/stream"
+    deadline = time.perf_counter() + args.seconds
+
+    async def client_loop(_):
+        try:
+            async with websockets.connect(url) as ws:
+                last = time.perf_counter()
+                while time.perf_counter() < deadline:
+                    json.loads(await ws.recv())
+                    now = time.perf_counter()
+                    latencies.append(now - last)  # intervalo entre mensagens
+                    last = now
+        except Exception as e:
+            errors.append(str(e))
+
+    await asyncio.gather(*(client_loop(h) for h in fleet))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--url', default='http://localhost:8000')
+    parser.add_argument('--mode', choices=['process', 'ws'], default='process')
+    parser.add_argument('--headsets', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=10.0)
+    parser.add_argument('--channels', type=int, default=14, help='primeiros N canais da montagem (máx. 14)')
+    parser.add_argument('--sfreq', type=float, default=128.0)
+    parser.add_argument('--block', type=float, default=1.0, help='segundos por requisição')
+    parser.add_argument('--realtime', action=argparse.BooleanOptionalAction, default=True)
+    args = parser.parse_args()
+
+    try:
+        fleet = build_fleet(args.headsets, args.channels, args.sfreq)
+    except ValueError as e:
+        parser.error(str(e))
+
+    latencies, errors = [], []
+    start = time.perf_counter()
+    runner = run_process if args.mode == 'process' else run_ws
+    asyncio.run(runner(args, fleet, latencies, errors))
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.headsets} headsets, {args.mode}, {elapsed:.1f} s")
+    print(f"mensagens: {len(latencies)} ({len(latencies) / elapsed:.1f}/s), erros: {len(errors)}")
+    if latencies:
+        ms = np.array(latencies) * 1000
+        print(f"latência ms: p50={np.percentile(ms, 50):.1f} p95={np.percentile(ms, 95):.1f} max={ms.max():.1f}")
+    if errors:
+        print(f"primeiro erro: {errors[0]}")
+
+if __name__ == '__main__':
+    main()
@@ -18,6 +18,7 @@ setup(
         'pandas>=1.2.0',
         'scipy>=1.6.0',
         'scikit-learn>=0.24.0',
+        'joblib>=1.0.0',
         'mne>=0.23.0',
         'PyWavelets>=1.1.0',
     ],
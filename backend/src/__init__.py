@@ -6,9 +6,24 @@ de estados de atenção usando EEG adaptado para streaming de dados.
 """
 
 from .attention_bci import AttentionBCI
-from .data_loader import EEGDataLoader
+from .data_loader import EEGDataLoader, EyeStateDataset
 from .feature_extractor import EEGFeatureExtractor
 from .signal_processor import EEGProcessor, SignalConfig
+from .spatial_filter import SpatialFilter
+from .band_power import BandPowerEngine, get_band_power_engine
+from .feature_store import FeatureStore
+from .model_registry import ModelRegistry, ModelVersion
+from .inference import InferenceBatcher
+from .tree_ensemble import CompiledEnsemble
+from .adaptation import RunningScaler, SubjectAdapter
+from .evaluation import CVResult, cross_validate
+from .streaming import PrefetchingLoader, Window
+from .edf_reader import EDFReader, EDFEpochs
+from .session_recorder import SessionRecorder, SessionRecording
+from .session_archive import CompressedSession, compress_session, open_session
+from .results_sink import ResultsSink
+from .rollups import RollupStore
+from .synthetic import SyntheticConfig, SyntheticHeadset, SyntheticFleet
 from . import utils
 
 __version__ = '0.2.0'
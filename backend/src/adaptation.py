@@ -0,0 +1,181 @@
+import numpy as np
+import os
+import copy
+import time
+import joblib
+import logging
+from pathlib import Path
+from typing import Any, Dict, Tuple, Union
+from .model_registry import ModelVersion
+
+logger = logging.getLogger(__name__)
+
+# Versão do formato do checkpoint salvo por SubjectAdapter.save
+ADAPTER_FORMAT_VERSION = 1
+
+class RunningScaler:
+    """
+    Normalização com média e variância atualizadas online (Welford)
+
+    Começa da média/variância populacional do StandardScaler do modelo,
+    com peso equivalente a prior_weight épocas, e converge para as
+    estatísticas do sujeito conforme as épocas chegam. Cada atualização
+    custa O(características).
+    """
+
+    def __init__(self, mean: np.ndarray, var: np.ndarray, prior_weight: float = 30.0):
+        """
+        Inicializa o scaler
+
+        Args:
+            mean: Média inicial por característica
+            var: Variância inicial por característica
+            prior_weight: Peso (em épocas) das estatísticas iniciais
+        """
+        self.count = float(prior_weight)
+        self.mean = np.array(mean, dtype=np.float64)
+        self.m2 = np.array(var, dtype=np.float64) * self.count
+
+    @classmethod
+    def from_scaler(cls, scaler, prior_weight: float = 30.0) -> 'RunningScaler':
+        """Cria a partir de um StandardScaler treinado"""
+        return cls(scaler.mean_, scaler.var_, prior_weight)
+
+    @property
+    def var(self) -> np.ndarray:
+        return self.m2 / max(self.count, 1.0)
+
+    @property
+    def scale(self) -> np.ndarray:
+        # Mesma convenção do StandardScaler: variância nula não escala
+        scale = np.sqrt(self.var)
+        scale[scale < 10 * np.finfo(np.float64).eps] = 1.0
+        return scale
+
+    def update(self, row: np.ndarray):
+        """Incorpora uma linha de características"""
+        row = np.asarray(row, dtype=np.float64)
+        self.count += 1.0
+        delta = row - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (row - self.mean)
+
+    def transform(self, rows: np.ndarray) -> np.ndarray:
+        """Normaliza linhas (..., características)"""
+        return (np.asarray(rows, dtype=np.float64) - self.mean) / self.scale
+
+class SubjectAdapter:
+    """
+    Estado adaptado de um sujeito/sessão sobre uma versão do modelo
+
+    Mantém um RunningScaler próprio e, quando o classificador suporta
+    partial_fit (ex.: SGD), uma cópia do classificador atualizada com os
+    rótulos de feedback ou de eventos (ex.: olho aberto/fechado).
+    Classificadores sem partial_fit adaptam apenas a normalização.
+    """
+
+    def __init__(self, model: ModelVersion, prior_weight: float = 30.0):
+        """
+        Inicializa o adaptador
+
+        Args:
+            model: Versão do modelo base
+            prior_weight: Peso (em épocas) das estatísticas populacionais
+        """
+        self.model_version = model.version
+        self.feature_schema = tuple(model.feature_schema)
+        self.scaler = RunningScaler.from_scaler(model.scaler, prior_weight)
+        self.incremental = hasattr(model.classifier, 'partial_fit')
+        self.classifier = copy.deepcopy(model.classifier) if self.incremental else model.classifier
+        self.estimator = model.estimator if not self.incremental else self.classifier
+        self.n_observed = 0
+        self.n_labeled = 0
+
+    def observe(self, row: np.ndarray):
+        """Atualiza a normalização com uma época sem rótulo"""
+        self.scaler.update(row)
+        self.n_observed += 1
+
+    def update(self, row: np.ndarray, label: int):
+        """Atualiza normalização e classificador com uma época rotulada"""
+        self.observe(row)
+        if self.incremental:
+            # Um passo de SGD: O(características)
+            self.classifier.partial_fit(
+                self.scaler.transform(row)[None, :],
+                np.array([label])
+            )
+        self.n_labeled += 1
+
+    def predict_proba(self, row: np.ndarray) -> Tuple[int, np.ndarray]:
+        """
+        Prediz uma linha com a normalização e o classificador adaptados
+
+        Returns:
+            Tupla (rótulo, probabilidades por classe)
+        """
+        probs = self.estimator.predict_proba(self.scaler.transform(row)[None, :])[0]
+        return int(self.estimator.classes_[np.argmax(probs)]), probs
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'model_version': self.model_version,
+            'incremental': self.incremental,
+            'n_observed': self.n_observed,
+            'n_labeled': self.n_labeled
+        }
+
+    def save(self, path: Union[str, Path]) -> Path:
+        """Salva o estado adaptado (escrita atômica)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        state = {
+            'format_version': ADAPTER_FORMAT_VERSION,
+            'saved_at': time.time(),
+            'model_version': self.model_version,
+            'feature_schema': list(self.feature_schema),
+            'count': self.scaler.count,
+            'mean': self.scaler.mean,
+            'm2': self.scaler.m2,
+            'classifier': self.classifier if self.incremental else None,
+            'n_observed': self.n_observed,
+            'n_labeled': self.n_labeled
+        }
+        tmp_path = path.with_name(path.name + '.tmp')
+        joblib.dump(state, tmp_path)
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path: Union[str, Path], model: ModelVersion) -> 'SubjectAdapter':
+        """
+        Restaura um estado salvo sobre a versão do modelo em uso
+
+        Args:
+            path: Caminho do checkpoint
+            model: Versão do modelo ativa
+
+        Returns:
+            Adaptador restaurado
+        """
+        state = joblib.load(path)
+        if state.get('format_version') != ADAPTER_FORMAT_VERSION:
+            raise ValueError(f"Versão de checkpoint não suportada: {state.get('format_version')}")
+        if tuple(state['feature_schema']) != tuple(model.feature_schema):
+            raise ValueError("Checkpoint incompatível com o schema do modelo ativo")
+        if state['model_version'] != model.version:
+            logger.warning(
+                f"Checkpoint criado sobre o modelo {state['model_version']}, "
+                f"restaurado sobre o modelo {model.version}"
+            )
+
+        adapter = cls(model)
+        adapter.scaler.count = state['count']
+        adapter.scaler.mean = np.array(state['mean'], dtype=np.float64)
+        adapter.scaler.m2 = np.array(state['m2'], dtype=np.float64)
+        if adapter.incremental and state['classifier'] is not None:
+            adapter.classifier = state['classifier']
+            adapter.estimator = adapter.classifier
+        adapter.n_observed = state['n_observed']
+        adapter.n_labeled = state['n_labeled']
+        return adapter
@@ -1,16 +1,34 @@
 import numpy as np
 import time
-from sklearn.ensemble import GradientBoostingClassifier
-from sklearn.preprocessing import StandardScaler
 import logging
-from typing import Dict, List, Tuple, Optional, Any
+from typing import Dict, List, Tuple, Optional, Any, Sequence
 import asyncio
-from dataclasses import dataclass
+import copy
+import os
+import joblib
+import sklearn
+from dataclasses import dataclass, asdict
+from pathlib import Path
 from .signal_processor import EEGProcessor, SignalConfig
 from .feature_extractor import EEGFeatureExtractor
+from .training import (
+    extract_feature_matrix, fit_classifier, feature_importance,
+    ProgressCallback, CLASSIFIER_BACKENDS, DEFAULT_MODEL_PARAMS, check_model_params
+)
+from .feature_store import FeatureStore
+from .model_registry import ModelRegistry, ModelVersion
+from .inference import InferenceBatcher
+from .tree_ensemble import CompiledEnsemble
+from .adaptation import SubjectAdapter
+from .evaluation import cross_validate
+from .edf_reader import EDFEpochs
+from concurrent.futures import ProcessPoolExecutor
 
 logger = logging.getLogger(__name__)
 
+# Versão do formato do artefato salvo por AttentionBCI.save
+MODEL_FORMAT_VERSION = 1
+
 @dataclass
 class BCIConfig:
     """Configurações para o sistema BCI"""
@@ -18,7 +36,18 @@ class BCIConfig:
     window_size: int = 128  # 1 segundo
     overlap: float = 0.5
     channels: List[str] = None
+    classifier: str = 'gradient_boosting'  # ver training.CLASSIFIER_BACKENDS
     model_params: Dict = None
+    dtype: str = 'float64'  # 'float32' para processamento em precisão simples
+    n_jobs: int = 1  # processos na extração de características do treino (-1 = todos)
+    chunk_size: int = 32  # épocas por bloco enviado aos workers
+    feature_store_path: Optional[str] = None  # cache em disco das características
+    fit_in_process: bool = True  # ajusta o classificador fora do processo da API
+    max_model_versions: int = 5  # versões mantidas para rollback
+    inference_max_wait_ms: float = 2.0  # espera máxima para formar um lote de predição
+    inference_max_batch: int = 64  # linhas que disparam o lote imediatamente
+    compile_model: bool = True  # exporta o ensemble para o avaliador vetorizado
+    adaptation_prior_weight: float = 30.0  # peso (em épocas) da normalização populacional
     
     def __post_init__(self):
         if self.channels is None:
@@ -26,13 +55,12 @@ class BCIConfig:
                 'AF3', 'F7', 'F3', 'FC5', 'T7', 'P7', 'O1',
                 'O2', 'P8', 'T8', 'FC6', 'F4', 'F8', 'AF4'
             ]
+        if self.classifier not in CLASSIFIER_BACKENDS:
+            raise ValueError(
+                f"Classificador desconhecido: {self.classifier} (opções: {list(CLASSIFIER_BACKENDS)})"
+            )
         if self.model_params is None:
-            self.model_params = {
-                'n_estimators': 100,
-                'learning_rate': 0.1,
-                'max_depth': 3,
-                'random_state': 42
-            }
+            self.model_params = dict(DEFAULT_MODEL_PARAMS[self.classifier])
 
 class AttentionBCI:
     """Sistema BCI para detecção de estados de atenção"""
@@ -49,30 +77,89 @@ class AttentionBCI:
         signal_config = SignalConfig(
             sfreq=self.config.sfreq,
             window_size=self.config.window_size,
-            overlap=self.config.overlap
+            overlap=self.config.overlap,
+            dtype=self.config.dtype
         )
         self.processor = EEGProcessor(signal_config)
-        self.signal_processor = EEGProcessor(SignalConfig(sfreq=self.config.sfreq))
-        self.feature_extractor = EEGFeatureExtractor(self.config.sfreq)
+        self.signal_processor = EEGProcessor(
+            SignalConfig(sfreq=self.config.sfreq, dtype=self.config.dtype)
+        )
+        self.feature_extractor = EEGFeatureExtractor(self.config.sfreq, self.config.dtype)
+        
+        # Versões do modelo (scaler + classificador), trocadas atomicamente
+        self.registry = ModelRegistry(self.config.max_model_versions)
+        self._retrain_task: Optional[asyncio.Task] = None
+        self.batcher = InferenceBatcher(
+            self.config.inference_max_wait_ms,
+            self.config.inference_max_batch
+        )
         
-        # Inicializa classificador
-        self.classifier = GradientBoostingClassifier(**self.config.model_params)
-        self.scaler = StandardScaler()
+        # Estado adaptado por sujeito/sessão
+        self.adapters: Dict[str, SubjectAdapter] = {}
         
         # Estado do sistema
-        self.is_trained = False
-        self.training_stats = {}
+        self.feature_schema: List[str] = []  # ordem das colunas da última extração
+        self.feature_store = (
+            FeatureStore(self.config.feature_store_path)
+            if self.config.feature_store_path else None
+        )
+    
+    @property
+    def model(self) -> Optional[ModelVersion]:
+        """Versão do modelo usada nas predições"""
+        return self.registry.active
+    
+    @property
+    def is_trained(self) -> bool:
+        return self.registry.active is not None
+    
+    @property
+    def is_retraining(self) -> bool:
+        return self._retrain_task is not None and not self._retrain_task.done()
+    
+    @property
+    def scaler(self):
+        model = self.registry.active
+        return model.scaler if model else None
+    
+    @property
+    def classifier(self):
+        model = self.registry.active
+        return model.classifier if model else None
+    
+    @property
+    def training_stats(self) -> Dict[str, Any]:
+        model = self.registry.active
+        return model.training_stats if model else {}
+        
+    async def process_epoch(
+        self,
+        epoch: np.ndarray,
+        channel_mask: Optional[np.ndarray] = None
+    ) -> Dict[str, Any]:
+        """
+        Processa uma época e calcula métricas
         
-    async def process_epoch(self, epoch: np.ndarray) -> Dict[str, Any]:
+        Args:
+            epoch: Array com dados EEG brutos na taxa de análise (channels x samples)
+            channel_mask: Máscara dos canais válidos; canais ausentes são
+                excluídos de CAR, qualidade, poder, conectividade e características
+        """
         try:
-            processed_data = await self.processor.process_async(epoch)
-            quality = await self.processor.check_quality_async(processed_data)
+            processed_data = await self.processor.process_async(epoch, channel_mask)
+            valid_data = processed_data if channel_mask is None else processed_data[channel_mask]
+            quality = await self.processor.check_quality_async(valid_data)
+            
+            # Características do mesmo processamento único usado no treinamento
+            # (EpochFeaturePipeline); a remoção de ruído afeta só poder e conectividade
+            features = await self.feature_extractor.extract_async(processed_data, channel_mask)
             
             if not quality['amplitude_ok']:
                 processed_data = await self.processor.denoise_async(processed_data)
+                valid_data = processed_data if channel_mask is None else processed_data[channel_mask]
             
             # Usa get_band_power em vez de compute_band_power
-            powers = await self.processor.get_band_power(processed_data)
+            powers = await self.processor.get_band_power(valid_data)
             
             # Converte valores numpy para float
             band_powers = {
@@ -81,10 +168,13 @@ class AttentionBCI:
             }
             
             # Matriz de conectividade
-            connectivity = await self.processor.compute_connectivity(processed_data, method='plv')
+            connectivity = await self.processor.compute_connectivity(
+                processed_data,
+                method='plv',
+                channel_mask=channel_mask
+            )
             
-            # Extrai características e métricas
-            features = await self.feature_extractor.extract_async(processed_data)
+            # Métricas de atenção
             attention_metrics = await self.feature_extractor.compute_attention_metrics_async(features)
 
             return {
@@ -92,116 +182,516 @@ class AttentionBCI:
                 'attention_metrics': attention_metrics,
                 'band_powers': band_powers,
                 'connectivity': connectivity.tolist(),
-                'quality': quality
+                'quality': quality,
+                'features': features
             }
         except Exception as e:
             logger.error(f"Erro no processamento: {str(e)}")
             raise
     
-    async def train(self, X: np.ndarray, y: np.ndarray) -> Dict[str, float]:
+    async def extract_features(
+        self,
+        X: np.ndarray,
+        progress_callback: Optional[ProgressCallback] = None
+    ) -> np.ndarray:
         """
-        Treina o sistema BCI
+        Processa épocas e extrai a matriz de características
+        
+        Args:
+            X: Épocas (epochs x channels x samples); pode ser um np.memmap
+            progress_callback: Chamado com (épocas concluídas, total)
+            
+        Returns:
+            Matriz (epochs x features) nas colunas de feature_schema
+        """
+        if self.feature_store is None:
+            features, schema = await extract_feature_matrix(
+                X,
+                sfreq=self.config.sfreq,
+                dtype=self.config.dtype,
+                schema=self.feature_schema or None,
+                n_jobs=self.config.n_jobs,
+                chunk_size=self.config.chunk_size,
+                progress_callback=progress_callback
+            )
+            self.feature_schema = schema
+            return features
+        
+        # Reutiliza linhas já armazenadas e extrai apenas as que faltam
+        keys = await asyncio.to_thread(FeatureStore.epoch_keys, X)
+        namespace = FeatureStore.namespace(
+            self.signal_processor.config,
+            X.shape[1:],
+            EEGFeatureExtractor.VERSION
+        )
+        schema, cached, found = self.feature_store.get(namespace, keys)
+        missing = np.flatnonzero(~found)
+        logger.info(f"FeatureStore: {found.sum()} épocas em cache, {len(missing)} a extrair")
+        
+        if schema is None:
+            schema = self.feature_schema or None
+        computed = None
+        if len(missing):
+            computed, schema = await extract_feature_matrix(
+                X,
+                sfreq=self.config.sfreq,
+                dtype=self.config.dtype,
+                schema=schema,
+                n_jobs=self.config.n_jobs,
+                chunk_size=self.config.chunk_size,
+                progress_callback=progress_callback,
+                indices=missing
+            )
+            self.feature_store.put(namespace, [keys[i] for i in missing], computed, schema)
+        
+        features = np.empty((len(X), len(schema)), dtype=np.float64)
+        if found.any():
+            features[found] = cached
+        if computed is not None:
+            features[missing] = computed
+        self.feature_schema = schema
+        return features
+    
+    async def train(
+        self,
+        X: np.ndarray,
+        y: np.ndarray,
+        progress_callback: Optional[ProgressCallback] = None
+    ) -> Dict[str, float]:
+        """
+        Treina uma nova versão do modelo e a ativa
+        
+        Trabalha sobre uma cópia de X e y, ajusta o classificador em um
+        processo separado (fit_in_process) e só então troca a versão
+        ativa; predições em andamento continuam usando a versão anterior.
         
         Args:
             X: Dados de treino (epochs x channels x samples)
             y: Rótulos (0: baixa atenção, 1: alta atenção)
+            progress_callback: Chamado com (épocas concluídas, total)
             
         Returns:
             Dicionário com métricas de treino
         """
+        # Falha antes da extração, não ao servir predições
+        check_model_params(self.config.classifier, self.config.model_params)
+        
         try:
-            # Processa todas as épocas
-            processed_epochs = []
-            for epoch in X:
-                processed = await self.signal_processor.process_async(epoch)
-                processed_epochs.append(processed)
-            
-            # Extrai características
-            features_list = []
-            for processed in processed_epochs:
-                features = await self.feature_extractor.extract_async(processed)
-                features_list.append(self._prepare_features(features))
-            
-            # Prepara dados para treino
-            X_features = np.vstack(features_list)
-            X_scaled = self.scaler.fit_transform(X_features)
-            
-            # Treina classificador
-            self.classifier.fit(X_scaled, y)
-            self.is_trained = True
-            
-            # Calcula métricas
-            train_score = self.classifier.score(X_scaled, y)
-            feature_importance = dict(zip(
-                self.feature_extractor.feature_names,
-                self.classifier.feature_importances_
-            ))
+            # Snapshot dos dados (memmaps e EDFEpochs são lidos sob demanda, sem cópia)
+            if not isinstance(X, (np.memmap, EDFEpochs)):
+                X = np.array(X, copy=True)
+            y = np.array(y, copy=True)
             
-            self.training_stats = {
+            # Processa épocas em blocos e extrai características em paralelo
+            start_time = time.perf_counter()
+            self.feature_schema = []
+            X_features = await self.extract_features(X, progress_callback)
+            schema = tuple(self.feature_schema)
+            extraction_time = time.perf_counter() - start_time
+            
+            # Ajusta scaler e classificador sem bloquear o event loop
+            start_time = time.perf_counter()
+            if self.config.fit_in_process:
+                loop = asyncio.get_running_loop()
+                with ProcessPoolExecutor(max_workers=1) as pool:
+                    scaler, classifier, train_score = await loop.run_in_executor(
+                        pool, fit_classifier, X_features, y,
+                        self.config.model_params, self.config.classifier
+                    )
+            else:
+                scaler, classifier, train_score = await asyncio.to_thread(
+                    fit_classifier, X_features, y,
+                    self.config.model_params, self.config.classifier
+                )
+            fit_time = time.perf_counter() - start_time
+            
+            importance = feature_importance(classifier)
+            version = self.registry.next_version()
+            training_stats = {
+                'model_version': version,
+                'classifier': self.config.classifier,
                 'train_score': train_score,
-                'feature_importance': feature_importance,
+                'feature_importance': dict(zip(schema, importance)) if importance is not None else {},
                 'n_epochs': len(X),
-                'n_features': X_scaled.shape[1]
+                'n_features': X_features.shape[1],
+                'extraction_time': extraction_time,
+                'epochs_per_second': len(X) / max(extraction_time, 1e-9),
+                'fit_time': fit_time
             }
             
-            return self.training_stats
+            self.registry.publish(ModelVersion(
+                version=version,
+                scaler=scaler,
+                classifier=classifier,
+                feature_schema=schema,
+                training_stats=training_stats,
+                compiled=self._compile(classifier)
+            ))
+            return training_stats
             
         except Exception as e:
             logger.error(f"Erro no treinamento: {str(e)}")
             raise
     
-    async def predict(self, epoch: np.ndarray) -> Dict[str, Any]:
+    def start_retraining(
+        self,
+        X: np.ndarray,
+        y: np.ndarray,
+        progress_callback: Optional[ProgressCallback] = None
+    ) -> asyncio.Task:
+        """
+        Inicia o retreino em segundo plano
+        
+        Returns:
+            Tarefa que resolve nas métricas de treino da nova versão
+        """
+        if self.is_retraining:
+            raise RuntimeError("Retreino já em andamento")
+        self._retrain_task = asyncio.create_task(self.train(X, y, progress_callback))
+        return self._retrain_task
+    
+    async def partial_fit(self, X: np.ndarray, y: np.ndarray) -> Dict[str, Any]:
+        """
+        Atualiza incrementalmente o modelo ativo (backends com partial_fit)
+        
+        O classificador é copiado, atualizado com as novas épocas e
+        publicado como uma nova versão; o scaler e o schema são mantidos.
+        
+        Args:
+            X: Novas épocas (epochs x channels x samples)
+            y: Rótulos das épocas
+            
+        Returns:
+            Métricas da nova versão
+        """
+        model = self.registry.active
+        if model is None:
+            raise RuntimeError("Modelo não treinado")
+        if not hasattr(model.classifier, 'partial_fit'):
+            raise ValueError(f"Classificador {self.config.classifier} não suporta partial_fit")
+        
+        try:
+            self.feature_schema = list(model.feature_schema)
+            X_scaled = model.scaler.transform(await self.extract_features(X))
+            
+            classifier = copy.deepcopy(model.classifier)
+            await asyncio.to_thread(classifier.partial_fit, X_scaled, np.asarray(y))
+            
+            version = self.registry.next_version()
+            training_stats = {
+                **model.training_stats,
+                'model_version': version,
+                'n_epochs': model.training_stats.get('n_epochs', 0) + len(X),
+                'n_updates': model.training_stats.get('n_updates', 0) + 1
+            }
+            self.registry.publish(ModelVersion(
+                version=version,
+                scaler=model.scaler,
+                classifier=classifier,
+                feature_schema=model.feature_schema,
+                training_stats=training_stats,
+                compiled=self._compile(classifier)
+            ))
+            return training_stats
+        except Exception as e:
+            logger.error(f"Erro na atualização incremental: {str(e)}")
+            raise
+    
+    async def evaluate(
+        self,
+        X: np.ndarray,
+        y: np.ndarray,
+        groups: Sequence,
+        param_grid: Optional[Any] = None,
+        n_splits: int = 5,
+        progress_callback: Optional[ProgressCallback] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Avalia e ajusta model_params por validação cruzada agrupada
+        
+        As características são extraídas uma única vez (reaproveitando o
+        FeatureStore, se configurado) e compartilhadas entre folds e
+        combinações; o modelo ativo não é alterado.
+        
+        Args:
+            X: Épocas (epochs x channels x samples)
+            y: Rótulos
+            groups: Sessão/sujeito de cada época
+            param_grid: Grade de parâmetros (None = apenas model_params)
+            n_splits: Número de folds
+            progress_callback: Progresso da extração de características
+            
+        Returns:
+            Tabela ordenada (rank, params, scores e tempos)
+        """
+        try:
+            features = await self.extract_features(X, progress_callback)
+            results = await cross_validate(
+                features,
+                y,
+                groups,
+                param_grid or {},
+                backend=self.config.classifier,
+                base_params=self.config.model_params,
+                n_splits=n_splits,
+                n_jobs=self.config.n_jobs
+            )
+            return [result.as_dict() for result in results]
+        except Exception as e:
+            logger.error(f"Erro na validação cruzada: {str(e)}")
+            raise
+    
+    def rollback(self, version: Optional[int] = None) -> int:
+        """
+        Reativa uma versão anterior do modelo
+        
+        Args:
+            version: Versão a reativar (None = anterior à ativa)
+            
+        Returns:
+            Versão ativa após o rollback
+        """
+        return self.registry.rollback(version).version
+    
+    async def predict(self, epoch: np.ndarray, subject_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Realiza predição para uma época
         
         Args:
             epoch: Array com dados EEG
+            subject_id: Sujeito/sessão com adaptação online; a época
+                também atualiza a normalização desse sujeito
             
         Returns:
             Dicionário com predições e métricas
         """
-        if not self.is_trained:
+        # Uma única leitura: trocas de versão não afetam esta predição
+        model = self.registry.active
+        if model is None:
             raise RuntimeError("Modelo não treinado")
         
         try:
             # Processa época
             result = await self.process_epoch(epoch)
-            
-            # Prepara características
-            features = self._prepare_features(result['features'])
-            features_scaled = self.scaler.transform(features.reshape(1, -1))
-            
-            # Realiza predição
-            probs = self.classifier.predict_proba(features_scaled)
-            pred = self.classifier.predict(features_scaled)
-            
-            result.update({
-                'prediction': int(pred[0]),
-                'probability': float(probs[0, 1]),
-                'confidence': float(max(probs[0]))
-            })
-            
+            result.update(await self.predict_features(result['features'], subject_id, model))
             return result
             
         except Exception as e:
             logger.error(f"Erro na predição: {str(e)}")
             raise
     
-    def _prepare_features(self, features: Dict) -> np.ndarray:
-        """Prepara características para classificação"""
+    async def predict_features(
+        self,
+        features: Dict,
+        subject_id: Optional[str] = None,
+        model: Optional[ModelVersion] = None
+    ) -> Dict[str, Any]:
+        """
+        Classifica as características de uma época já processada
+        
+        Sem subject_id, a linha entra no micro-lote compartilhado com as
+        demais sessões concorrentes (InferenceBatcher).
+        
+        Args:
+            features: Características de process_epoch
+            subject_id: Sujeito/sessão com adaptação online
+            model: Versão a usar (None = ativa)
+            
+        Returns:
+            Dicionário com prediction, probability (classe 1),
+            probabilities, confidence e model_version
+        """
+        model = model or self.registry.active
+        if model is None:
+            raise RuntimeError("Modelo não treinado")
+        row = self._prepare_features(features, model.feature_schema)
+        
+        if subject_id is None:
+            # Predição em lote com as demais sessões concorrentes
+            pred, probs = await self.batcher.predict_proba(model, row)
+        else:
+            adapter = self.get_adapter(subject_id)
+            pred, probs = adapter.predict_proba(row)
+            adapter.observe(row)
+        
+        return {
+            'prediction': int(pred),
+            'probability': float(probs[1]),
+            'probabilities': [float(p) for p in probs],
+            'confidence': float(max(probs)),
+            'model_version': model.version
+        }
+    
+    def get_adapter(self, subject_id: str) -> SubjectAdapter:
+        """Retorna o adaptador do sujeito, criado a partir do modelo ativo"""
+        model = self.registry.active
+        if model is None:
+            raise RuntimeError("Modelo não treinado")
+        adapter = self.adapters.get(subject_id)
+        if adapter is None or adapter.feature_schema != model.feature_schema:
+            adapter = SubjectAdapter(model, self.config.adaptation_prior_weight)
+            self.adapters[subject_id] = adapter
+        return adapter
+    
+    async def adapt(self, subject_id: str, epoch: np.ndarray, label: int) -> Dict[str, Any]:
+        """
+        Atualiza a adaptação de um sujeito com uma época rotulada
+        
+        Args:
+            subject_id: Sujeito/sessão
+            epoch: Array com dados EEG
+            label: Rótulo de feedback ou evento (ex.: olho fechado)
+            
+        Returns:
+            Estatísticas do adaptador
+        """
+        adapter = self.get_adapter(subject_id)
+        try:
+            result = await self.process_epoch(epoch)
+            features = self._prepare_features(result['features'], adapter.feature_schema)
+            adapter.update(features, label)
+            return adapter.get_stats()
+        except Exception as e:
+            logger.error(f"Erro na adaptação: {str(e)}")
+            raise
+    
+    def save_adapter(self, subject_id: str, path: str) -> Path:
+        """Salva o checkpoint do estado adaptado de um sujeito"""
+        if subject_id not in self.adapters:
+            raise KeyError(f"Sujeito sem adaptação: {subject_id}")
+        return self.adapters[subject_id].save(path)
+    
+    def load_adapter(self, subject_id: str, path: str) -> SubjectAdapter:
+        """Restaura o estado adaptado de um sujeito sobre o modelo ativo"""
+        model = self.registry.active
+        if model is None:
+            raise RuntimeError("Modelo não treinado")
+        adapter = SubjectAdapter.load(path, model)
+        self.adapters[subject_id] = adapter
+        return adapter
+    
+    def _compile(self, classifier) -> Optional[CompiledEnsemble]:
+        """Exporta o classificador para o avaliador vetorizado, se suportado"""
+        if not self.config.compile_model:
+            return None
+        try:
+            return CompiledEnsemble.from_sklearn(classifier)
+        except ValueError as e:
+            logger.info(f"Inferência pelo classificador original: {str(e)}")
+            return None
+    
+    def _prepare_features(self, features: Dict, schema: Sequence[str]) -> np.ndarray:
+        """Prepara características para classificação (ausentes viram 0)"""
         return np.array([
-            features[name] for name in self.feature_extractor.feature_names
+            features.get(name, 0.0) for name in schema
         ])
 
     def get_model_info(self) -> Dict[str, Any]:
         """Retorna informações sobre o modelo"""
         return {
             'is_trained': self.is_trained,
+            'model_version': self.model.version if self.model else None,
+            'available_versions': self.registry.versions(),
+            'is_retraining': self.is_retraining,
+            'inference': self.batcher.get_stats(),
+            'adapters': {sid: a.get_stats() for sid, a in self.adapters.items()},
             'training_stats': self.training_stats,
             'config': {
                 'sfreq': self.config.sfreq,
                 'window_size': self.config.window_size,
                 'channels': self.config.channels,
-                'model_params': self.config.model_params
+                'classifier': self.config.classifier,
+                'model_params': self.config.model_params,
+                'dtype': self.config.dtype
             }
-        }
\ No newline at end of file
+        }
+    
+    def save(self, path: str) -> Path:
+        """
+        Salva o modelo treinado em um artefato versionado
+        
+        O artefato (joblib comprimido) contém scaler, classificador, schema
+        de características, configuração e estatísticas de treino. A escrita
+        é atômica: leitores nunca veem um arquivo parcial.
+        
+        Args:
+            path: Caminho do artefato
+            
+        Returns:
+            Caminho salvo
+        """
+        model = self.registry.active
+        if model is None:
+            raise RuntimeError("Modelo não treinado")
+        
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        artifact = {
+            'format_version': MODEL_FORMAT_VERSION,
+            'sklearn_version': sklearn.__version__,
+            'saved_at': time.time(),
+            'config': asdict(self.config),
+            'model_version': model.version,
+            'feature_schema': list(model.feature_schema),
+            'scaler': model.scaler,
+            'classifier': model.classifier,
+            'training_stats': model.training_stats
+        }
+        
+        try:
+            tmp_path = path.with_name(path.name + '.tmp')
+            joblib.dump(artifact, tmp_path, compress=('zlib', 3))
+            os.replace(tmp_path, path)
+            logger.info(f"Modelo salvo em {path}")
+            return path
+        except Exception as e:
+            logger.error(f"Erro ao salvar modelo: {str(e)}")
+            raise
+    
+    @classmethod
+    def load(cls, path: str, **overrides) -> 'AttentionBCI':
+        """
+        Carrega um modelo salvo por save()
+        
+        Args:
+            path: Caminho do artefato
+            **overrides: Campos de BCIConfig de execução a substituir
+                (ex.: n_jobs, inference_max_wait_ms)
+            
+        Returns:
+            Sistema BCI pronto para predição
+        """
+        try:
+            start_time = time.perf_counter()
+            artifact = joblib.load(path)
+            
+            version = artifact.get('format_version')
+            if version != MODEL_FORMAT_VERSION:
+                raise ValueError(
+                    f"Versão de artefato não suportada: {version} (esperada {MODEL_FORMAT_VERSION})"
+                )
+            if artifact['sklearn_version'] != sklearn.__version__:
+                logger.warning(
+                    f"Modelo salvo com scikit-learn {artifact['sklearn_version']}, "
+                    f"carregado com {sklearn.__version__}"
+                )
+            
+            bci = cls(BCIConfig(**{**artifact['config'], **overrides}))
+            bci.feature_schema = list(artifact['feature_schema'])
+            bci.registry.publish(ModelVersion(
+                version=artifact.get('model_version', 1),
+                scaler=artifact['scaler'],
+                classifier=artifact['classifier'],
+                feature_schema=tuple(artifact['feature_schema']),
+                training_stats=artifact['training_stats'],
+                compiled=bci._compile(artifact['classifier'])
+            ))
+            
+            logger.info(
+                f"Modelo carregado de {path} em "
+                f"{(time.perf_counter() - start_time) * 1000:.1f} ms"
+            )
+            return bci
+        except Exception as e:
+            logger.error(f"Erro ao carregar modelo: {str(e)}")
+            raise
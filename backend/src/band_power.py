@@ -0,0 +1,172 @@
+import numpy as np
+import logging
+from dataclasses import dataclass
+from functools import lru_cache
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy import signal
+from typing import Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+FREQUENCY_BANDS: Dict[str, Tuple[float, float]] = {
+    'delta': (0.5, 4),
+    'theta': (4, 8),
+    'alpha': (8, 13),
+    'beta': (13, 30),
+    'gamma': (30, 45)
+}
+
+@dataclass
+class BandPowers:
+    """Poder por banda para todos os canais (eixo final = bandas)"""
+    bands: Tuple[str, ...]
+    absolute: np.ndarray  # média da PSD na banda
+    relative: np.ndarray  # absoluto / poder total da PSD
+    peak_freq: np.ndarray  # frequência de pico dentro da banda
+    total: np.ndarray  # soma da PSD em todas as frequências
+
+    def as_dict(self, values: np.ndarray) -> Dict[str, np.ndarray]:
+        """Separa um array (..., bandas) em um dicionário por banda"""
+        return {band: values[..., i] for i, band in enumerate(self.bands)}
+
+class BandPowerEngine:
+    """
+    Motor de poder espectral por banda
+
+    Calcula a PSD de Welch (janela Hann, 50% de sobreposição, remoção de
+    média por segmento, densidade unilateral) de todos os canais com uma
+    única FFT, e projeta nas bandas com uma multiplicação pela matriz de
+    pesos banda x frequência. Janela, frequências e pesos são
+    pré-calculados por configuração (sfreq, n_samples, nperseg); use
+    get_band_power_engine para reutilizar instâncias.
+    """
+
+    def __init__(
+        self,
+        sfreq: float,
+        n_samples: int,
+        nperseg: int,
+        bands: Tuple[Tuple[str, Tuple[float, float]], ...] = tuple(FREQUENCY_BANDS.items()),
+        dtype: str = 'float64'
+    ):
+        """
+        Inicializa o motor
+
+        Args:
+            sfreq: Frequência de amostragem
+            n_samples: Número de amostras por canal dos sinais de entrada
+            nperseg: Tamanho do segmento de Welch (limitado a n_samples)
+            bands: Pares (nome, (fmin, fmax)) das bandas
+            dtype: Precisão da PSD
+        """
+        self.sfreq = sfreq
+        self.n_samples = n_samples
+        self.nperseg = min(nperseg, n_samples)
+        self.step = self.nperseg - self.nperseg // 2
+        self.dtype = np.dtype(dtype)
+        self.bands = tuple(name for name, _ in bands)
+
+        window = signal.get_window('hann', self.nperseg)
+        self.window = _readonly(window.astype(self.dtype))
+        self.scale = 1.0 / (sfreq * np.sum(window ** 2))
+        self.freqs = _readonly(np.fft.rfftfreq(self.nperseg, 1.0 / sfreq))
+
+        # Máscaras e pesos de média por banda (bandas vazias ficam zeradas)
+        masks = np.array([
+            (self.freqs >= fmin) & (self.freqs <= fmax)
+            for _, (fmin, fmax) in bands
+        ])
+        counts = masks.sum(axis=1, keepdims=True)
+        self.band_masks = _readonly(masks)
+        self.band_weights = _readonly(
+            (masks / np.maximum(counts, 1)).astype(self.dtype)
+        )
+        self.empty_bands = _readonly(counts[:, 0] == 0)
+
+        # Fator unilateral: dobra tudo exceto DC (e Nyquist, se par)
+        onesided = np.full(len(self.freqs), 2.0)
+        onesided[0] = 1.0
+        if self.nperseg % 2 == 0:
+            onesided[-1] = 1.0
+        self._psd_scale = _readonly((onesided * self.scale).astype(self.dtype))
+
+    def psd(self, data: np.ndarray) -> np.ndarray:
+        """
+        Calcula a PSD de Welch
+
+        Args:
+            data: Array (..., samples) com n_samples amostras
+
+        Returns:
+            PSD (..., freqs)
+        """
+        return self._segment_psd(data, self.step).mean(axis=-2)
+
+    def frame_psd(self, data: np.ndarray, hop: int) -> np.ndarray:
+        """
+        Calcula a PSD de cada janela de nperseg amostras (STFT)
+
+        Cada quadro equivale à PSD de Welch de uma janela com tamanho
+        nperseg, o que permite calcular linhas do tempo em uma única FFT.
+
+        Args:
+            data: Array (..., samples) de qualquer comprimento
+            hop: Passo entre janelas consecutivas
+
+        Returns:
+            PSD (..., frames, freqs)
+        """
+        return self._segment_psd(data, hop)
+
+    def band_powers(self, data: np.ndarray) -> BandPowers:
+        """
+        Calcula poder absoluto, relativo e frequência de pico por banda
+
+        Args:
+            data: Array (..., samples) com n_samples amostras
+
+        Returns:
+            BandPowers com arrays (..., bandas)
+        """
+        return self.project(self.psd(data))
+
+    def project(self, psd: np.ndarray) -> BandPowers:
+        """Projeta uma PSD (..., freqs) nas bandas"""
+        absolute = psd @ self.band_weights.T
+        total = np.maximum(psd.sum(axis=-1, keepdims=True), 1e-10)
+
+        # Frequência de pico: argmax da PSD restrita a cada banda
+        masked = np.where(self.band_masks, psd[..., None, :], -np.inf)
+        peak_freq = np.where(self.empty_bands, 0.0, self.freqs[np.argmax(masked, axis=-1)])
+
+        return BandPowers(
+            bands=self.bands,
+            absolute=absolute,
+            relative=absolute / total,
+            peak_freq=peak_freq,
+            total=total[..., 0]
+        )
+
+    def _segment_psd(self, data: np.ndarray, step: int) -> np.ndarray:
+        """PSD de cada segmento de nperseg amostras, com passo step"""
+        data = np.asarray(data, dtype=self.dtype)
+        segments = sliding_window_view(data, self.nperseg, axis=-1)[..., ::step, :]
+        segments = (segments - segments.mean(axis=-1, keepdims=True)) * self.window
+        spectrum = np.fft.rfft(segments, axis=-1)
+        return (spectrum.real ** 2 + spectrum.imag ** 2) * self._psd_scale
+
+@lru_cache(maxsize=32)
+def get_band_power_engine(
+    sfreq: float,
+    n_samples: int,
+    nperseg: int,
+    dtype: str = 'float64'
+) -> BandPowerEngine:
+    """Retorna o motor compartilhado para uma configuração"""
+    logger.debug(f"Criando motor de poder espectral (sfreq={sfreq}, n={n_samples}, nperseg={nperseg})")
+    return BandPowerEngine(sfreq, n_samples, nperseg, dtype=str(np.dtype(dtype)))
+
+def _readonly(array: np.ndarray) -> np.ndarray:
+    """Marca arrays compartilhados entre chamadas como somente leitura"""
+    array.setflags(write=False)
+    return array
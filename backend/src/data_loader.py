@@ -1,7 +1,134 @@
 import numpy as np
 import pandas as pd
 from collections import deque
-from typing import Dict, List
+from numpy.lib.stride_tricks import sliding_window_view
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+DEFAULT_CHANNELS = ['AF3', 'F7', 'F3', 'FC5', 'T7', 'P7', 'O1',
+                    'O2', 'P8', 'T8', 'FC6', 'F4', 'F8', 'AF4']
+
+# Nomes alternativos de canais em cabeçalhos de arquivos
+# (o eeg-eye-state.csv usa 'P' para o canal P7)
+CHANNEL_ALIASES: Dict[str, Tuple[str, ...]] = {
+    'P7': ('P', 'T5'),
+    'P8': ('T6',),
+    'T7': ('T3',),
+    'T8': ('T4',)
+}
+
+LABEL_AGGREGATIONS = ('majority', 'center', 'last', 'pure')
+
+def resolve_columns(
+    columns: Sequence[str],
+    channels: Sequence[str],
+    aliases: Dict[str, Tuple[str, ...]] = CHANNEL_ALIASES
+) -> List[str]:
+    """
+    Mapeia canais para colunas de um arquivo pelo nome
+
+    A comparação ignora maiúsculas e espaços e aceita os nomes
+    alternativos de CHANNEL_ALIASES.
+
+    Args:
+        columns: Colunas disponíveis
+        channels: Canais desejados
+        aliases: Nomes alternativos por canal
+
+    Returns:
+        Nome da coluna de cada canal, na ordem de channels
+    """
+    lookup = {str(col).strip().upper(): col for col in columns}
+    resolved = []
+    for channel in channels:
+        candidates = (channel,) + aliases.get(channel, ())
+        match = next((lookup[c.upper()] for c in candidates if c.upper() in lookup), None)
+        if match is None:
+            raise KeyError(f"Canal {channel} não encontrado nas colunas {list(columns)}")
+        resolved.append(match)
+    return resolved
+
+class EyeStateDataset:
+    """
+    Épocas rotuladas do conjunto eeg-eye-state
+
+    O CSV é lido uma única vez para um array contíguo (channels x samples);
+    as épocas são views 3-D obtidas com sliding_window_view, sem cópia,
+    de modo que diferentes janelas/passos custam apenas a agregação dos
+    rótulos.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path] = 'data/eeg-eye-state.csv',
+        channels: Optional[List[str]] = None,
+        label_column: str = 'class',
+        sfreq: float = 128.0,
+        dtype: str = 'float64'
+    ):
+        """
+        Carrega o conjunto de dados
+
+        Args:
+            path: Caminho do CSV
+            channels: Canais na ordem desejada (padrão: 14 canais do Emotiv)
+            label_column: Coluna com o estado do olho (1 = fechado)
+            sfreq: Frequência de amostragem do arquivo
+            dtype: Precisão dos sinais
+        """
+        self.channels = list(channels or DEFAULT_CHANNELS)
+        self.sfreq = sfreq
+
+        data = pd.read_csv(path)
+        self.columns = resolve_columns(data.columns, self.channels)
+        self.signals = np.ascontiguousarray(data[self.columns].to_numpy(dtype=dtype).T)
+        self.labels = data[label_column].to_numpy(dtype=np.int64)
+
+    def __len__(self) -> int:
+        return self.signals.shape[1]
+
+    def epochs(
+        self,
+        window: int = 128,
+        hop: int = 64,
+        label: str = 'majority'
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Gera épocas rotuladas com janela deslizante
+
+        Args:
+            window: Amostras por época
+            hop: Passo entre épocas
+            label: Agregação do rótulo na janela: 'majority', 'center',
+                'last' ou 'pure' (descarta janelas com transição; neste
+                caso X é uma cópia)
+
+        Returns:
+            Tupla (X, y): X é uma view (epochs x channels x window)
+            somente leitura sobre os sinais
+        """
+        if label not in LABEL_AGGREGATIONS:
+            raise ValueError(f"Agregação desconhecida: {label} (opções: {LABEL_AGGREGATIONS})")
+        if window > len(self):
+            raise ValueError(f"Janela de {window} amostras maior que o registro ({len(self)})")
+
+        X = sliding_window_view(self.signals, window, axis=1)[:, ::hop, :].transpose(1, 0, 2)
+        labels = sliding_window_view(self.labels, window)[::hop]
+
+        if label == 'center':
+            y = labels[:, window // 2]
+        elif label == 'last':
+            y = labels[:, -1]
+        else:
+            y = (labels.mean(axis=1) >= 0.5).astype(np.int64)
+            if label == 'pure':
+                keep = (labels == labels[:, :1]).all(axis=1)
+                X, y = X[keep], y[keep]
+        return X, y
+
+    def epoch_starts(self, window: int = 128, hop: int = 64) -> np.ndarray:
+        """Índice da primeira amostra de cada época de epochs()"""
+        return np.arange(0, len(self) - window + 1, hop)
 
 class EEGDataLoader:
     def __init__(self, buffer_size: int = 1000):
@@ -9,9 +136,9 @@ class EEGDataLoader:
         self.current_index = 0
         self.buffer_size = buffer_size
         self.data_buffer = deque(maxlen=buffer_size)
-        self.channels = ['AF3', 'F7', 'F3', 'FC5', 'T7', 'P7', 'O1',
-                        'O2', 'P8', 'T8', 'FC6', 'F4', 'F8', 'AF4']
-        
+        self.channels = list(DEFAULT_CHANNELS)
+        self.columns = resolve_columns(self.data.columns, self.channels)
+
     def get_next_sample(self, window_size: int = 128) -> Dict:
         """Retorna a próxima janela de amostras"""
         if self.current_index + window_size > len(self.data):
@@ -22,8 +149,8 @@ class EEGDataLoader:
         
         # Organiza os dados por canal
         channels_data = {}
-        for i, channel in enumerate(self.channels):
-            channels_data[channel] = sample_data.iloc[:, i].tolist()
+        for channel, column in zip(self.channels, self.columns):
+            channels_data[channel] = sample_data[column].tolist()
             
         sample = {
             'timestamp': pd.Timestamp.now().timestamp(),
@@ -0,0 +1,244 @@
+import numpy as np
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple, Union
+from .data_loader import DEFAULT_CHANNELS, resolve_columns
+from .streaming import SOURCE_READERS, Window
+
+logger = logging.getLogger(__name__)
+
+# Fator para converter a unidade física de cada canal para µV
+_UNIT_SCALE = {'uv': 1.0, 'µv': 1.0, 'mv': 1e3, 'v': 1e6, 'nv': 1e-3}
+
+@dataclass
+class EDFSignal:
+    """Cabeçalho de um sinal do arquivo"""
+    label: str
+    unit: str
+    physical_min: float
+    physical_max: float
+    digital_min: int
+    digital_max: int
+    samples_per_record: int
+    offset: int  # posição (em amostras) do sinal dentro do registro
+
+    @property
+    def gain(self) -> float:
+        return (self.physical_max - self.physical_min) / max(self.digital_max - self.digital_min, 1)
+
+class EDFReader:
+    """
+    Leitor de gravações EDF/EDF+/BDF em blocos via memory-map
+
+    Apenas o cabeçalho é lido na abertura; os registros de dados são
+    acessados por np.memmap e decodificados sob demanda, de modo que
+    gravações de várias horas nunca são carregadas inteiras na memória.
+    Os canais são mapeados pelo nome (ignorando prefixos como 'EEG ' e
+    sufixos de referência como '-REF') para a ordem de channels.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        channels: Optional[List[str]] = None,
+        dtype: str = 'float64'
+    ):
+        """
+        Abre a gravação
+
+        Args:
+            path: Caminho do arquivo .edf ou .bdf
+            channels: Canais na ordem de saída (padrão: 14 canais do Emotiv)
+            dtype: Precisão dos sinais decodificados (em µV)
+        """
+        self.path = Path(path)
+        self.channels = list(channels or DEFAULT_CHANNELS)
+        self.dtype = np.dtype(dtype)
+
+        with open(self.path, 'rb') as f:
+            header = f.read(256)
+            self.is_bdf = header[:1] == b'\xff'
+            self.sample_bytes = 3 if self.is_bdf else 2
+            header_bytes = int(header[184:192])
+            n_records = int(header[236:244])
+            self.record_duration = float(header[244:252])
+            n_signals = int(header[252:256])
+            self.signals = self._parse_signals(f.read(n_signals * 256), n_signals)
+
+        self.record_samples = sum(s.samples_per_record for s in self.signals)
+        record_bytes = self.record_samples * self.sample_bytes
+        if n_records < 0:
+            n_records = (self.path.stat().st_size - header_bytes) // record_bytes
+        self.n_records = n_records
+
+        # Seleção dos canais pelo nome
+        labels = [_normalize_label(s.label) for s in self.signals]
+        selected = [labels.index(name) for name in resolve_columns(labels, self.channels)]
+        self._selected = [self.signals[i] for i in selected]
+        rates = {s.samples_per_record for s in self._selected}
+        if len(rates) > 1:
+            raise ValueError(f"Canais selecionados com taxas diferentes: {sorted(rates)}")
+        self.samples_per_record = rates.pop()
+        self.sfreq = self.samples_per_record / self.record_duration
+        self.n_samples = self.n_records * self.samples_per_record
+
+        self._scale = np.array([
+            s.gain * _UNIT_SCALE.get(s.unit.strip().lower(), 1.0) for s in self._selected
+        ])
+        self._shift = np.array([
+            (s.physical_min - s.digital_min * s.gain) * _UNIT_SCALE.get(s.unit.strip().lower(), 1.0)
+            for s in self._selected
+        ])
+
+        # Registros como matriz de bytes (registros x bytes por registro)
+        self._records = np.memmap(
+            self.path, dtype=np.uint8, mode='r', offset=header_bytes,
+            shape=(self.n_records, record_bytes)
+        )
+
+    def __len__(self) -> int:
+        return self.n_samples
+
+    @property
+    def duration(self) -> float:
+        return self.n_samples / self.sfreq
+
+    def read(self, start: int, stop: int) -> np.ndarray:
+        """
+        Decodifica um intervalo de amostras
+
+        Args:
+            start: Primeira amostra
+            stop: Amostra final (exclusiva)
+
+        Returns:
+            Array (channels x samples) em µV
+        """
+        start = max(0, start)
+        stop = min(stop, self.n_samples)
+        if stop <= start:
+            return np.empty((len(self.channels), 0), dtype=self.dtype)
+
+        spr = self.samples_per_record
+        first_record = start // spr
+        last_record = (stop - 1) // spr + 1
+        records = self._records[first_record:last_record]
+
+        out = np.empty((len(self._selected), (last_record - first_record) * spr), dtype=np.float64)
+        for i, sig in enumerate(self._selected):
+            raw = records[:, sig.offset * self.sample_bytes:(sig.offset + spr) * self.sample_bytes]
+            out[i] = self._decode(raw).ravel()
+
+        out = out * self._scale[:, None] + self._shift[:, None]
+        skip = start - first_record * spr
+        return out[:, skip:skip + (stop - start)].astype(self.dtype, copy=False)
+
+    def chunks(self, chunk_samples: int) -> Iterator[Tuple[int, np.ndarray]]:
+        """Gera (início, bloco) sequenciais de chunk_samples amostras"""
+        for start in range(0, self.n_samples, chunk_samples):
+            yield start, self.read(start, start + chunk_samples)
+
+    def windows(self, window: int, hop: int) -> Iterator[Window]:
+        """Gera janelas para PrefetchingLoader lendo só o necessário"""
+        for start in range(0, self.n_samples - window + 1, hop):
+            yield Window(
+                source=str(self.path),
+                start=start,
+                data=self.read(start, start + window),
+                channels=self.channels,
+                sfreq=self.sfreq
+            )
+
+    def epochs(self, window: int, hop: int) -> 'EDFEpochs':
+        """Épocas para treino/processamento em lote, lidas sob demanda"""
+        return EDFEpochs(self, window, hop)
+
+    def _decode(self, raw: np.ndarray) -> np.ndarray:
+        """Converte bytes little-endian (16 ou 24 bits) em inteiros"""
+        if not self.is_bdf:
+            return np.ascontiguousarray(raw).view('<i2').astype(np.int32)
+        triplets = raw.reshape(raw.shape[0], -1, 3).astype(np.int32)
+        values = triplets[..., 0] | (triplets[..., 1] << 8) | (triplets[..., 2] << 16)
+        return np.where(values >= 1 << 23, values - (1 << 24), values)
+
+    @staticmethod
+    def _parse_signals(block: bytes, n: int) -> List[EDFSignal]:
+        """Lê os campos por sinal do cabeçalho (armazenados campo a campo)"""
+        def fields(start: int, width: int) -> List[str]:
+            base = start * n
+            return [
+                block[base + i * width:base + (i + 1) * width].decode('latin-1').strip()
+                for i in range(n)
+            ]
+
+        labels = fields(0, 16)
+        units = fields(16 + 80, 8)
+        pmin = fields(16 + 80 + 8, 8)
+        pmax = fields(16 + 80 + 16, 8)
+        dmin = fields(16 + 80 + 24, 8)
+        dmax = fields(16 + 80 + 32, 8)
+        spr = fields(16 + 80 + 40 + 80, 8)
+
+        signals, offset = [], 0
+        for i in range(n):
+            signals.append(EDFSignal(
+                label=labels[i],
+                unit=units[i],
+                physical_min=float(pmin[i]),
+                physical_max=float(pmax[i]),
+                digital_min=int(dmin[i]),
+                digital_max=int(dmax[i]),
+                samples_per_record=int(spr[i]),
+                offset=offset
+            ))
+            offset += int(spr[i])
+        return signals
+
+class EDFEpochs:
+    """
+    Sequência de épocas (epochs x channels x window) de um EDFReader
+
+    Suporta len(), índice inteiro, fatia e array de índices, como um
+    np.ndarray/np.memmap; cada acesso decodifica apenas as épocas pedidas.
+    """
+
+    def __init__(self, reader: EDFReader, window: int, hop: int, batch_size: int = 256):
+        self.reader = reader
+        self.window = window
+        self.hop = hop
+        self.batch_size = batch_size
+        self.starts = np.arange(0, reader.n_samples - window + 1, hop)
+        self.shape = (len(self.starts), len(reader.channels), window)
+        self.dtype = reader.dtype
+        self.ndim = 3
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        # Lê em blocos contíguos em vez de época por época
+        for first in range(0, len(self), self.batch_size):
+            yield from self[first:first + self.batch_size]
+
+    def __getitem__(self, index) -> np.ndarray:
+        if isinstance(index, (int, np.integer)):
+            start = self.starts[index]
+            return self.reader.read(start, start + self.window)
+
+        starts = self.starts[index]
+        if len(starts) == 0:
+            return np.empty((0,) + self.shape[1:], dtype=self.dtype)
+        # Uma leitura contínua cobrindo todas as épocas pedidas
+        first, last = starts.min(), starts.max() + self.window
+        block = self.reader.read(first, last)
+        return np.stack([block[:, s - first:s - first + self.window] for s in starts])
+
+def _normalize_label(label: str) -> str:
+    """'EEG AF3-REF' -> 'AF3'"""
+    label = label.strip()
+    if label.upper().startswith('EEG '):
+        label = label[4:]
+    return label.split('-')[0].strip()
+
+SOURCE_READERS.update({'.edf': EDFReader, '.bdf': EDFReader})
@@ -1,7 +1,8 @@
 import numpy as np
 from dataclasses import dataclass
 from typing import Dict, List, Optional, Tuple
-from scipy import signal
+from numpy.lib.stride_tricks import sliding_window_view
+from .band_power import FREQUENCY_BANDS, get_band_power_engine
 
 @dataclass
 class AttentionMetrics:
@@ -13,6 +14,19 @@ class AttentionMetrics:
     alpha_beta_ratio: float  # Razão alfa/beta
     theta_beta_ratio: float  # Razão teta/beta
     meditation_score: float  # Pontuação de meditação
+
+@dataclass
+class RecordingAnalysis:
+    """Linhas do tempo por janela de uma gravação completa"""
+    times: np.ndarray  # Início de cada janela (s)
+    attention: np.ndarray  # Atenção por janela
+    engagement: np.ndarray  # Índice de engajamento por janela
+    meditation: np.ndarray  # Pontuação de meditação por janela
+    dominant_frequency: np.ndarray  # Frequência dominante por janela (Hz)
+    theta_beta_ratio: np.ndarray  # Razão teta/beta por janela
+    alpha_beta_ratio: np.ndarray  # Razão alfa/beta por janela
+    band_powers: Dict[str, np.ndarray]  # Poder absoluto por banda e janela
+    attention_variance: float  # Variância da atenção entre janelas
     
 class EEGAnalyzer:
     def __init__(self, sampling_rate: float = 128.0):
@@ -24,13 +38,7 @@ class EEGAnalyzer:
         """
         self.sampling_rate = sampling_rate
         self.previous_attention = 0.5  # Inicializa com valor médio
-        self.frequency_bands = {
-            'delta': (0.5, 4),
-            'theta': (4, 8),
-            'alpha': (8, 13),
-            'beta': (13, 30),
-            'gamma': (30, 45)
-        }
+        self.frequency_bands = dict(FREQUENCY_BANDS)
     
     def analyze_attention(self, eeg_data: np.ndarray, window_size: int = 128) -> AttentionMetrics:
         """
@@ -66,8 +74,9 @@ class EEGAnalyzer:
         trend = self._calculate_trend(attention)
         
         # Encontra frequência dominante
-        freqs, psd = signal.welch(np.mean(eeg_data, axis=0), fs=self.sampling_rate)
-        dominant_freq = freqs[np.argmax(psd)]
+        engine = get_band_power_engine(self.sampling_rate, eeg_data.shape[1], 256)
+        psd = engine.psd(np.mean(eeg_data, axis=0))
+        dominant_freq = engine.freqs[np.argmax(psd)]
         
         # Calcula variância da atenção usando janelas sobrepostas
         attention_var = self._calculate_attention_variance(eeg_data, window_size)
@@ -85,32 +94,81 @@ class EEGAnalyzer:
     
     def _compute_band_powers(self, eeg_data: np.ndarray) -> Dict[str, float]:
         """Calcula o poder em diferentes bandas de frequência"""
-        nperseg = min(128, eeg_data.shape[1])
-        freqs, psd = signal.welch(np.mean(eeg_data, axis=0), fs=self.sampling_rate, nperseg=nperseg)
+        engine = get_band_power_engine(self.sampling_rate, eeg_data.shape[1], 128)
+        absolute = engine.band_powers(np.mean(eeg_data, axis=0)).absolute
+        return dict(zip(engine.bands, absolute))
+    
+    def analyze_recording(
+        self,
+        eeg_data: np.ndarray,
+        window_size: int = 128,
+        hop: Optional[int] = None
+    ) -> RecordingAnalysis:
+        """
+        Analisa uma gravação completa em janelas deslizantes
+        
+        Calcula a STFT da média entre canais (um segmento de Welch por
+        janela, como em _compute_band_powers) em uma única FFT e deriva
+        as métricas de todas as janelas de forma vetorizada.
         
-        powers = {}
-        for band, (low, high) in self.frequency_bands.items():
-            mask = (freqs >= low) & (freqs <= high)
-            powers[band] = np.mean(psd[mask]) if np.any(mask) else 0.0
+        Args:
+            eeg_data: Array de forma (canais, amostras)
+            window_size: Tamanho da janela de análise
+            hop: Passo entre janelas (padrão: window_size // 2)
             
-        return powers
+        Returns:
+            RecordingAnalysis com as linhas do tempo
+        """
+        if len(eeg_data.shape) != 2:
+            raise ValueError("Dados EEG devem ser array 2D (canais x amostras)")
+        
+        hop = hop or max(window_size // 2, 1)
+        mean_signal = np.mean(eeg_data, axis=0)
+        engine = get_band_power_engine(self.sampling_rate, window_size, 128)
+        
+        if len(mean_signal) < window_size:
+            psd = np.zeros((0, len(engine.freqs)))
+        else:
+            # Janelas como views (sem cópia) e PSD de todas de uma vez
+            windows = sliding_window_view(mean_signal, window_size)[::hop]
+            psd = engine.psd(windows)
+        
+        powers = engine.project(psd)
+        band_powers = powers.as_dict(powers.absolute)
+        theta, alpha, beta = band_powers['theta'], band_powers['alpha'], band_powers['beta']
+        
+        theta_beta = theta / (beta + 1e-10)
+        attention = 1 / (1 + theta_beta)
+        attention_variance = float(np.var(attention)) if len(attention) else 0.0
+        
+        return RecordingAnalysis(
+            times=np.arange(len(psd)) * hop / self.sampling_rate,
+            attention=attention,
+            engagement=beta / (alpha + theta + 1e-10),
+            meditation=self._meditation_scores(alpha, theta),
+            dominant_frequency=engine.freqs[np.argmax(psd, axis=-1)],
+            theta_beta_ratio=theta_beta,
+            alpha_beta_ratio=alpha / (beta + 1e-10),
+            band_powers=band_powers,
+            attention_variance=attention_variance
+        )
     
     def _calculate_meditation_score(self, band_powers: Dict[str, float]) -> float:
         """Calcula pontuação de meditação baseada no poder alfa e razão alfa/teta"""
-        alpha_power = band_powers['alpha']
-        theta_power = band_powers['theta']
-        
+        return float(self._meditation_scores(band_powers['alpha'], band_powers['theta']))
+    
+    def _meditation_scores(self, alpha_power: np.ndarray, theta_power: np.ndarray) -> np.ndarray:
+        """Versão vetorizada da pontuação de meditação"""
         # Normaliza poder alfa
         max_alpha = 100  # Poder alfa máximo típico
-        norm_alpha = min(alpha_power / max_alpha, 1.0)
+        norm_alpha = np.minimum(alpha_power / max_alpha, 1.0)
         
         # Calcula contribuição da razão alfa/teta
         alpha_theta_ratio = alpha_power / (theta_power + 1e-10)
         ratio_score = 1 / (1 + np.exp(-alpha_theta_ratio + 2))
         
         # Combina métricas
-        meditation_score = 0.6 * norm_alpha + 0.4 * ratio_score
-        return float(meditation_score)
+        return 0.6 * norm_alpha + 0.4 * ratio_score
     
     def _calculate_trend(self, current_attention: float, threshold: float = 0.1) -> str:
         """Determina tendência da atenção"""
@@ -126,17 +184,7 @@ class EEGAnalyzer:
     
     def _calculate_attention_variance(self, eeg_data: np.ndarray, window_size: int) -> float:
         """Calcula variância da atenção usando janelas sobrepostas"""
-        n_samples = eeg_data.shape[1]
-        attention_scores = []
-        
-        for i in range(0, n_samples - window_size + 1, window_size // 2):
-            window = eeg_data[:, i:i+window_size]
-            powers = self._compute_band_powers(window)
-            theta_beta = powers['theta'] / (powers['beta'] + 1e-10)
-            attention = 1 / (1 + theta_beta)
-            attention_scores.append(attention)
-            
-        return np.var(attention_scores) if attention_scores else 0.0
+        return self.analyze_recording(eeg_data, window_size).attention_variance
 
 # Exemplo de uso
 if __name__ == "__main__":
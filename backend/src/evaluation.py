@@ -0,0 +1,162 @@
+import numpy as np
+import os
+import time
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from sklearn.model_selection import GroupKFold, ParameterGrid
+from sklearn.preprocessing import StandardScaler
+from .training import make_classifier
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class CVResult:
+    """Resultado da validação cruzada de uma combinação de parâmetros"""
+    params: Dict[str, Any]
+    mean_score: float
+    std_score: float
+    fold_scores: List[float]
+    mean_fit_time: float
+    mean_score_time: float
+    rank: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'rank': self.rank,
+            'params': self.params,
+            'mean_score': self.mean_score,
+            'std_score': self.std_score,
+            'fold_scores': self.fold_scores,
+            'mean_fit_time': self.mean_fit_time,
+            'mean_score_time': self.mean_score_time
+        }
+
+# Dados compartilhados de cada processo worker, anexados no initializer
+_worker_data: Dict[str, Any] = {}
+
+def _attach_shared(name: str, shape: Tuple[int, ...], dtype: str, y: np.ndarray):
+    shm = shared_memory.SharedMemory(name=name)
+    _worker_data['shm'] = shm  # mantém o segmento aberto enquanto o worker vive
+    _worker_data['features'] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    _worker_data['y'] = y
+
+def _fit_and_score(
+    features: np.ndarray,
+    y: np.ndarray,
+    train_idx: np.ndarray,
+    test_idx: np.ndarray,
+    backend: str,
+    params: Dict[str, Any]
+) -> Tuple[float, float, float]:
+    """Ajusta scaler + classificador em um fold e mede a acurácia no teste"""
+    start = time.perf_counter()
+    scaler = StandardScaler()
+    X_train = scaler.fit_transform(features[train_idx])
+    classifier = make_classifier(backend, params)
+    classifier.fit(X_train, y[train_idx])
+    fit_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    score = classifier.score(scaler.transform(features[test_idx]), y[test_idx])
+    return float(score), fit_time, time.perf_counter() - start
+
+def _shared_fit_and_score(train_idx, test_idx, backend, params):
+    return _fit_and_score(
+        _worker_data['features'], _worker_data['y'], train_idx, test_idx, backend, params
+    )
+
+async def cross_validate(
+    features: np.ndarray,
+    y: np.ndarray,
+    groups: Sequence,
+    param_grid: Any,
+    backend: str = 'gradient_boosting',
+    base_params: Optional[Dict[str, Any]] = None,
+    n_splits: int = 5,
+    n_jobs: int = 1
+) -> List[CVResult]:
+    """
+    Validação cruzada agrupada sobre uma grade de parâmetros
+
+    A matriz de características é copiada uma única vez para memória
+    compartilhada; cada tarefa (combinação x fold) recebe apenas os
+    índices do fold, de modo que nenhum worker copia ou recalcula as
+    características.
+
+    Args:
+        features: Matriz (épocas x características) já extraída
+        y: Rótulos
+        groups: Grupo de cada época (ex.: sessão); épocas de um mesmo
+            grupo nunca ficam em treino e teste ao mesmo tempo
+        param_grid: Grade no formato de sklearn.model_selection.ParameterGrid
+        backend: Classificador (ver training.CLASSIFIER_BACKENDS)
+        base_params: Parâmetros fixos, sobrescritos pela grade
+        n_splits: Número de folds
+        n_jobs: Número de processos (1 = thread única, -1 = todos os núcleos)
+
+    Returns:
+        Resultados ordenados pela acurácia média (rank 1 = melhor)
+    """
+    features = np.ascontiguousarray(features, dtype=np.float64)
+    y = np.asarray(y)
+    groups = np.asarray(groups)
+    if n_jobs < 0:
+        n_jobs = os.cpu_count() or 1
+    n_groups = len(np.unique(groups))
+    if n_groups < n_splits:
+        raise ValueError(f"{n_groups} grupos não bastam para {n_splits} folds")
+
+    candidates = [{**(base_params or {}), **params} for params in ParameterGrid(param_grid)]
+    folds = list(GroupKFold(n_splits=n_splits).split(features, y, groups))
+    tasks = [(c, f) for c in range(len(candidates)) for f in range(len(folds))]
+    logger.info(f"Validação cruzada: {len(candidates)} combinações x {len(folds)} folds")
+
+    outputs: Dict[Tuple[int, int], Tuple[float, float, float]] = {}
+    if n_jobs == 1:
+        for c, f in tasks:
+            train_idx, test_idx = folds[f]
+            outputs[c, f] = await asyncio.to_thread(
+                _fit_and_score, features, y, train_idx, test_idx, backend, candidates[c]
+            )
+    else:
+        shm = shared_memory.SharedMemory(create=True, size=max(features.nbytes, 1))
+        try:
+            np.ndarray(features.shape, dtype=features.dtype, buffer=shm.buf)[:] = features
+            loop = asyncio.get_running_loop()
+            with ProcessPoolExecutor(
+                max_workers=n_jobs,
+                initializer=_attach_shared,
+                initargs=(shm.name, features.shape, features.dtype.str, y)
+            ) as pool:
+                futures = {
+                    (c, f): loop.run_in_executor(
+                        pool, _shared_fit_and_score, *folds[f], backend, candidates[c]
+                    )
+                    for c, f in tasks
+                }
+                for key, future in futures.items():
+                    outputs[key] = await future
+        finally:
+            shm.close()
+            shm.unlink()
+
+    results = []
+    for c, params in enumerate(candidates):
+        scores, fit_times, score_times = zip(*(outputs[c, f] for f in range(len(folds))))
+        results.append(CVResult(
+            params=params,
+            mean_score=float(np.mean(scores)),
+            std_score=float(np.std(scores)),
+            fold_scores=list(scores),
+            mean_fit_time=float(np.mean(fit_times)),
+            mean_score_time=float(np.mean(score_times))
+        ))
+
+    results.sort(key=lambda r: (-r.mean_score, r.mean_fit_time))
+    for rank, result in enumerate(results, start=1):
+        result.rank = rank
+    return results
@@ -2,22 +2,29 @@ import numpy as np
 from scipy import signal, stats
 import pywt
 import logging
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Sequence
 import asyncio
+from .band_power import get_band_power_engine
 
 logger = logging.getLogger(__name__)
 
 class EEGFeatureExtractor:
     """Extrator de características para sinais EEG"""
     
-    def __init__(self, sfreq: float = 128.0):
+    # Incrementar sempre que o cálculo de alguma característica mudar
+    # (invalida linhas do FeatureStore)
+    VERSION = '1'
+    
+    def __init__(self, sfreq: float = 128.0, dtype: str = 'float64'):
         """
         Inicializa o extrator
         
         Args:
             sfreq: Frequência de amostragem
+            dtype: Precisão numérica usada nos cálculos ('float32' ou 'float64')
         """
         self.sfreq = sfreq
+        self.dtype = np.dtype(dtype)
         self.feature_names = []
         self._initialize_feature_names()
     
@@ -39,29 +46,41 @@ class EEGFeatureExtractor:
         
         self.feature_names = temporal + spectral + connectivity + nonlinear
     
-    async def extract_async(self, epoch: np.ndarray) -> Dict[str, float]:
+    async def extract_async(
+        self,
+        epoch: np.ndarray,
+        channel_mask: Optional[np.ndarray] = None
+    ) -> Dict[str, float]:
         """
         Extrai características de forma assíncrona
         
         Args:
             epoch: Época EEG (channels x samples)
+            channel_mask: Máscara dos canais válidos; canais ausentes não
+                geram características (os índices nos nomes são mantidos)
             
         Returns:
             Dicionário com características
         """
         try:
+            epoch = np.asarray(epoch, dtype=self.dtype)
+            channel_ids = None
+            if channel_mask is not None:
+                channel_ids = np.flatnonzero(channel_mask)
+                epoch = epoch[channel_ids]
+            
             # Executa extrações em paralelo
             temporal = asyncio.create_task(
-                self._extract_temporal_features_async(epoch)
+                self._extract_temporal_features_async(epoch, channel_ids)
             )
             spectral = asyncio.create_task(
-                self._extract_spectral_features_async(epoch)
+                self._extract_spectral_features_async(epoch, channel_ids)
             )
             connectivity = asyncio.create_task(
-                self._extract_connectivity_features_async(epoch)
+                self._extract_connectivity_features_async(epoch, channel_ids)
             )
             nonlinear = asyncio.create_task(
-                self._extract_nonlinear_features_async(epoch)
+                self._extract_nonlinear_features_async(epoch, channel_ids)
             )
             
             # Aguarda resultados
@@ -80,41 +99,54 @@ class EEGFeatureExtractor:
             logger.error(f"Erro na extração de características: {str(e)}")
             raise
     
-    def _compute_spectral_features(self, epoch: np.ndarray) -> Dict[str, float]:
+    def extract(
+        self,
+        epoch: np.ndarray,
+        channel_mask: Optional[np.ndarray] = None
+    ) -> Dict[str, float]:
+        """
+        Versão síncrona de extract_async (para threads e processos worker)
+        
+        Args:
+            epoch: Época EEG (channels x samples)
+            channel_mask: Máscara dos canais válidos
+            
+        Returns:
+            Dicionário com características
+        """
+        epoch = np.asarray(epoch, dtype=self.dtype)
+        channel_ids = None
+        if channel_mask is not None:
+            channel_ids = np.flatnonzero(channel_mask)
+            epoch = epoch[channel_ids]
+        
+        features = {}
+        features.update(self._compute_temporal_features(epoch, channel_ids))
+        features.update(self._compute_spectral_features(epoch, channel_ids))
+        features.update(self._compute_connectivity_features(epoch, channel_ids))
+        features.update(self._compute_nonlinear_features(epoch, channel_ids))
+        return features
+    
+    def _compute_spectral_features(
+        self,
+        epoch: np.ndarray,
+        channel_ids: Optional[Sequence[int]] = None
+    ) -> Dict[str, float]:
         """Calcula características espectrais"""
         features = {}
+        channel_ids = self._channel_ids(epoch, channel_ids)
+        
+        # PSD de todos os canais e projeção nas bandas de uma vez
+        engine = get_band_power_engine(self.sfreq, epoch.shape[1], 64, self.dtype.name)
+        band_powers = engine.band_powers(epoch)
         
         for ch in range(epoch.shape[0]):
-            # Ajusta tamanho da janela
-            nperseg = min(64, epoch.shape[1])
-            freqs, psd = signal.welch(epoch[ch], fs=self.sfreq, nperseg=nperseg)
-            
-            # Evita divisão por zero
-            total_power = max(np.sum(psd), 1e-10)
-            
-            # Poder nas bandas
-            for band_name, (fmin, fmax) in [
-                ('delta', (0.5, 4)),
-                ('theta', (4, 8)),
-                ('alpha', (8, 13)),
-                ('beta', (13, 30)),
-                ('gamma', (30, 45))
-            ]:
-                mask = (freqs >= fmin) & (freqs <= fmax)
-                if np.any(mask):
-                    power = np.mean(psd[mask])
-                    rel_power = power / total_power
-                    peak_freq = freqs[mask][np.argmax(psd[mask])] if len(psd[mask]) > 0 else 0
-                else:
-                    power = 0
-                    rel_power = 0
-                    peak_freq = 0
-                
-                prefix = f'ch{ch}_{band_name}_'
+            for b, band_name in enumerate(engine.bands):
+                prefix = f'ch{channel_ids[ch]}_{band_name}_'
                 features.update({
-                    prefix + 'power': float(power),
-                    prefix + 'rel_power': float(rel_power),
-                    prefix + 'peak_freq': float(peak_freq)
+                    prefix + 'power': float(band_powers.absolute[ch, b]),
+                    prefix + 'rel_power': float(band_powers.relative[ch, b]),
+                    prefix + 'peak_freq': float(band_powers.peak_freq[ch, b])
                 })
         
         return features
@@ -203,38 +235,47 @@ class EEGFeatureExtractor:
     
     async def _extract_temporal_features_async(
         self, 
-        epoch: np.ndarray
+        epoch: np.ndarray,
+        channel_ids: Optional[Sequence[int]] = None
     ) -> Dict[str, float]:
         """Extrai características temporais de forma assíncrona"""
-        return await asyncio.to_thread(self._compute_temporal_features, epoch)
+        return await asyncio.to_thread(self._compute_temporal_features, epoch, channel_ids)
     
     async def _extract_spectral_features_async(
         self, 
-        epoch: np.ndarray
+        epoch: np.ndarray,
+        channel_ids: Optional[Sequence[int]] = None
     ) -> Dict[str, float]:
         """Extrai características espectrais de forma assíncrona"""
-        return await asyncio.to_thread(self._compute_spectral_features, epoch)
+        return await asyncio.to_thread(self._compute_spectral_features, epoch, channel_ids)
     
     async def _extract_connectivity_features_async(
         self, 
-        epoch: np.ndarray
+        epoch: np.ndarray,
+        channel_ids: Optional[Sequence[int]] = None
     ) -> Dict[str, float]:
         """Extrai características de conectividade de forma assíncrona"""
-        return await asyncio.to_thread(self._compute_connectivity_features, epoch)
+        return await asyncio.to_thread(self._compute_connectivity_features, epoch, channel_ids)
     
     async def _extract_nonlinear_features_async(
         self, 
-        epoch: np.ndarray
+        epoch: np.ndarray,
+        channel_ids: Optional[Sequence[int]] = None
     ) -> Dict[str, float]:
         """Extrai características não-lineares de forma assíncrona"""
-        return await asyncio.to_thread(self._compute_nonlinear_features, epoch)
+        return await asyncio.to_thread(self._compute_nonlinear_features, epoch, channel_ids)
     
-    def _compute_temporal_features(self, epoch: np.ndarray) -> Dict[str, float]:
+    def _compute_temporal_features(
+        self,
+        epoch: np.ndarray,
+        channel_ids: Optional[Sequence[int]] = None
+    ) -> Dict[str, float]:
         """Calcula características temporais"""
         features = {}
+        channel_ids = self._channel_ids(epoch, channel_ids)
         
         for ch in range(epoch.shape[0]):
-            prefix = f'ch{ch}_'
+            prefix = f'ch{channel_ids[ch]}_'
             features.update({
                 prefix + 'mean': np.mean(epoch[ch]),
                 prefix + 'std': np.std(epoch[ch]),
@@ -246,10 +287,15 @@ class EEGFeatureExtractor:
         
         return features
     
-    def _compute_connectivity_features(self, epoch: np.ndarray) -> Dict[str, float]:
+    def _compute_connectivity_features(
+        self,
+        epoch: np.ndarray,
+        channel_ids: Optional[Sequence[int]] = None
+    ) -> Dict[str, float]:
         """Calcula características de conectividade"""
         features = {}
         n_channels = epoch.shape[0]
+        channel_ids = self._channel_ids(epoch, channel_ids)
         # Coerência entre pares de canais
         
         for i in range(n_channels):
@@ -264,25 +310,30 @@ class EEGFeatureExtractor:
                 ]:
                     mask = (f >= fmin) & (f <= fmax)
                     mean_coh = np.mean(coh[mask])
-                    features[f'coherence_{band_name}_ch{i}{j}'] = mean_coh
+                    features[f'coherence_{band_name}_ch{channel_ids[i]}{channel_ids[j]}'] = mean_coh
                 
                 # Phase Locking Value (PLV)
                 plv = self._compute_plv(epoch[i], epoch[j])
-                features[f'plv_ch{i}{j}'] = plv
+                features[f'plv_ch{channel_ids[i]}{channel_ids[j]}'] = plv
                 
                 # Phase Lag Index (PLI)
                 pli = self._compute_pli(epoch[i], epoch[j])
-                features[f'pli_ch{i}{j}'] = pli
+                features[f'pli_ch{channel_ids[i]}{channel_ids[j]}'] = pli
         
         return features
     
-    def _compute_nonlinear_features(self, epoch: np.ndarray) -> Dict[str, float]:
+    def _compute_nonlinear_features(
+        self,
+        epoch: np.ndarray,
+        channel_ids: Optional[Sequence[int]] = None
+    ) -> Dict[str, float]:
         """Calcula características não-lineares"""
         features = {}
+        channel_ids = self._channel_ids(epoch, channel_ids)
         
         for ch in range(epoch.shape[0]):
             signal = epoch[ch]
-            prefix = f'ch{ch}_'
+            prefix = f'ch{channel_ids[ch]}_'
             
             # Sample Entropy
             features[prefix + 'sample_entropy'] = self._sample_entropy(signal)
@@ -301,6 +352,14 @@ class EEGFeatureExtractor:
         
         return features
     
+    def _channel_ids(
+        self,
+        epoch: np.ndarray,
+        channel_ids: Optional[Sequence[int]]
+    ) -> Sequence[int]:
+        """Índices originais dos canais presentes na época"""
+        return range(epoch.shape[0]) if channel_ids is None else channel_ids
+    
     def _hjorth_mobility(self, signal: np.ndarray) -> float:
         """Calcula mobilidade de Hjorth"""
         diff = np.diff(signal)
@@ -0,0 +1,185 @@
+import numpy as np
+import os
+import json
+import hashlib
+import logging
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+from .signal_processor import SignalConfig
+
+logger = logging.getLogger(__name__)
+
+class FeatureStore:
+    """
+    Armazenamento persistente de linhas de características
+
+    Cada namespace (hash de SignalConfig, formato da época e versão do
+    extrator) é um diretório com blocos .npy lidos via memory-map e um
+    índice append-only (index.jsonl) que mapeia o hash de cada época
+    bruta para (bloco, linha). Pensado para um único processo escritor.
+    """
+
+    def __init__(self, root: Union[str, Path]):
+        """
+        Inicializa o armazenamento
+
+        Args:
+            root: Diretório raiz do armazenamento
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._indexes: Dict[str, Dict[str, Tuple[int, int]]] = {}
+        self._schemas: Dict[str, Optional[List[str]]] = {}
+        self._blocks: Dict[Tuple[str, int], np.ndarray] = {}
+
+    @staticmethod
+    def epoch_keys(epochs: np.ndarray) -> List[str]:
+        """Calcula o hash do conteúdo bruto de cada época"""
+        keys = []
+        for epoch in epochs:
+            epoch = np.ascontiguousarray(epoch)
+            digest = hashlib.sha1(f"{epoch.dtype.str}{epoch.shape}".encode())
+            digest.update(epoch.data)
+            keys.append(digest.hexdigest())
+        return keys
+
+    @staticmethod
+    def namespace(
+        config: SignalConfig,
+        epoch_shape: Sequence[int],
+        extractor_version: str
+    ) -> str:
+        """Identificador do namespace de uma configuração de extração"""
+        payload = json.dumps({
+            'signal_config': asdict(config),
+            'epoch_shape': list(epoch_shape),
+            'extractor_version': extractor_version
+        }, sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+    def get(
+        self,
+        namespace: str,
+        keys: Sequence[str]
+    ) -> Tuple[Optional[List[str]], np.ndarray, np.ndarray]:
+        """
+        Busca linhas armazenadas
+
+        Args:
+            namespace: Namespace retornado por namespace()
+            keys: Hashes das épocas
+
+        Returns:
+            Tupla (schema, linhas encontradas, máscara de encontrados);
+            as linhas seguem a ordem de keys[found]
+        """
+        index = self._load_index(namespace)
+        schema = self._schemas[namespace]
+        locations = [index.get(key) for key in keys]
+        found = np.array([loc is not None for loc in locations], dtype=bool)
+
+        n_features = len(schema) if schema else 0
+        rows = np.empty((int(found.sum()), n_features), dtype=np.float64)
+        if not found.any():
+            return schema, rows, found
+
+        # Agrupa leituras por bloco
+        hits = [loc for loc in locations if loc is not None]
+        blocks = np.array([block for block, _ in hits])
+        offsets = np.array([row for _, row in hits])
+        for block in np.unique(blocks):
+            selected = blocks == block
+            rows[selected] = self._load_block(namespace, int(block))[offsets[selected]]
+
+        return schema, rows, found
+
+    def put(
+        self,
+        namespace: str,
+        keys: Sequence[str],
+        rows: np.ndarray,
+        schema: List[str]
+    ) -> None:
+        """
+        Armazena um novo bloco de linhas
+
+        Args:
+            namespace: Namespace retornado por namespace()
+            keys: Hashes das épocas, na ordem das linhas
+            rows: Matriz (épocas x características)
+            schema: Ordem das colunas
+        """
+        if len(keys) == 0:
+            return
+        index = self._load_index(namespace)
+        directory = self.root / namespace
+        directory.mkdir(parents=True, exist_ok=True)
+
+        if self._schemas[namespace] is None:
+            _atomic_write(directory / 'schema.json', json.dumps(schema).encode())
+            self._schemas[namespace] = list(schema)
+        elif self._schemas[namespace] != list(schema):
+            raise ValueError("Schema diferente do armazenado no namespace")
+
+        block = 1 + max((b for b, _ in index.values()), default=-1)
+        block_path = directory / f'block_{block:06d}.npy'
+        tmp_path = block_path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            np.save(f, np.asarray(rows, dtype=np.float64))
+        os.replace(tmp_path, block_path)
+
+        # O índice só referencia o bloco depois que ele está completo
+        with open(directory / 'index.jsonl', 'a') as f:
+            f.write(json.dumps({'block': block, 'keys': list(keys)}) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+        for row, key in enumerate(keys):
+            index[key] = (block, row)
+        logger.info(f"Armazenadas {len(keys)} linhas no bloco {block} de {namespace}")
+
+    def __len__(self) -> int:
+        return sum(len(self._load_index(ns)) for ns in self._namespaces())
+
+    def _namespaces(self) -> List[str]:
+        return [p.name for p in self.root.iterdir() if p.is_dir()]
+
+    def _load_index(self, namespace: str) -> Dict[str, Tuple[int, int]]:
+        """Carrega (uma vez) o índice e o schema de um namespace"""
+        if namespace in self._indexes:
+            return self._indexes[namespace]
+
+        directory = self.root / namespace
+        index = {}
+        index_path = directory / 'index.jsonl'
+        if index_path.exists():
+            with open(index_path) as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        logger.warning(f"Entrada truncada ignorada em {index_path}")
+                        continue
+                    for row, key in enumerate(entry['keys']):
+                        index[key] = (entry['block'], row)
+
+        schema_path = directory / 'schema.json'
+        self._schemas[namespace] = json.loads(schema_path.read_text()) if schema_path.exists() else None
+        self._indexes[namespace] = index
+        return index
+
+    def _load_block(self, namespace: str, block: int) -> np.ndarray:
+        """Abre um bloco via memory-map (mantido aberto para reuso)"""
+        key = (namespace, block)
+        if key not in self._blocks:
+            path = self.root / namespace / f'block_{block:06d}.npy'
+            self._blocks[key] = np.load(path, mmap_mode='r')
+        return self._blocks[key]
+
+def _atomic_write(path: Path, content: bytes):
+    tmp_path = path.with_suffix('.tmp')
+    tmp_path.write_bytes(content)
+    os.replace(tmp_path, path)
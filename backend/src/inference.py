@@ -0,0 +1,125 @@
+import numpy as np
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+from .model_registry import ModelVersion
+
+logger = logging.getLogger(__name__)
+
+class InferenceBatcher:
+    """
+    Agrupa predições de sessões concorrentes em micro-lotes
+
+    Cada chamada enfileira uma linha de características; o lote é
+    executado quando atinge max_batch_size linhas ou quando a primeira
+    linha espera max_wait_ms, com um único scaler.transform e um único
+    predict_proba por versão de modelo presente no lote. Os rótulos são
+    derivados das probabilidades (argmax), sem uma chamada extra a
+    predict. Deve ser usado a partir de um único event loop.
+    """
+
+    def __init__(self, max_wait_ms: float = 2.0, max_batch_size: int = 64):
+        """
+        Inicializa o agrupador
+
+        Args:
+            max_wait_ms: Espera máxima da primeira linha do lote
+            max_batch_size: Linhas que disparam o lote imediatamente
+        """
+        self.max_wait_ms = max_wait_ms
+        self.max_batch_size = max_batch_size
+        self._pending: List[Tuple[ModelVersion, np.ndarray, asyncio.Future, float]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()  # referências aos lotes em execução
+
+        # Métricas
+        self.total_batches = 0
+        self.total_rows = 0
+        self.batch_sizes = deque(maxlen=1000)
+        self.latencies_ms = deque(maxlen=1000)  # enfileiramento -> resultado
+
+    async def predict_proba(self, model: ModelVersion, row: np.ndarray) -> Tuple[int, np.ndarray]:
+        """
+        Prediz uma linha de características
+
+        Args:
+            model: Versão do modelo a usar
+            row: Características (F,) na ordem de model.feature_schema
+
+        Returns:
+            Tupla (rótulo, probabilidades por classe)
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((model, np.asarray(row, dtype=np.float64), future, time.perf_counter()))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_ms / 1000.0, self._flush)
+
+        return await future
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna métricas de tamanho de lote e latência"""
+        latencies = np.array(self.latencies_ms) if self.latencies_ms else np.zeros(1)
+        sizes = np.array(self.batch_sizes) if self.batch_sizes else np.zeros(1)
+        return {
+            'max_wait_ms': self.max_wait_ms,
+            'max_batch_size': self.max_batch_size,
+            'total_batches': self.total_batches,
+            'total_rows': self.total_rows,
+            'mean_batch_size': float(sizes.mean()),
+            'latency_ms_p50': float(np.percentile(latencies, 50)),
+            'latency_ms_p95': float(np.percentile(latencies, 95)),
+            'latency_ms_max': float(latencies.max())
+        }
+
+    def _flush(self):
+        """Despacha as linhas pendentes como um lote"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: List[Tuple[ModelVersion, np.ndarray, asyncio.Future, float]]):
+        """Executa o lote, agrupado por versão de modelo"""
+        self.total_batches += 1
+        self.total_rows += len(batch)
+        self.batch_sizes.append(len(batch))
+
+        groups: Dict[int, List[int]] = {}
+        for i, (model, _, _, _) in enumerate(batch):
+            groups.setdefault(id(model), []).append(i)
+
+        for indices in groups.values():
+            model = batch[indices[0]][0]
+            rows = np.stack([batch[i][1] for i in indices])
+            try:
+                labels, probs = await asyncio.to_thread(_predict_rows, model, rows)
+            except Exception as e:
+                logger.error(f"Erro no lote de inferência: {str(e)}")
+                for i in indices:
+                    if not batch[i][2].done():
+                        batch[i][2].set_exception(e)
+                continue
+
+            now = time.perf_counter()
+            for j, i in enumerate(indices):
+                _, _, future, queued_at = batch[i]
+                self.latencies_ms.append((now - queued_at) * 1000.0)
+                if not future.done():
+                    future.set_result((int(labels[j]), probs[j]))
+
+def _predict_rows(model: ModelVersion, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Uma transformação e um predict_proba para todas as linhas"""
+    estimator = model.estimator
+    probs = estimator.predict_proba(model.scaler.transform(rows))
+    labels = estimator.classes_[np.argmax(probs, axis=1)]
+    return labels, probs
@@ -0,0 +1,69 @@
+import numpy as np
+import logging
+from collections import defaultdict
+from fractions import Fraction
+from scipy import signal
+from typing import Dict, List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+def align_channels(
+    channels_data: Dict[str, Sequence[float]],
+    channels: List[str],
+    target_length: int,
+    dtype: str = 'float64'
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Alinha os canais recebidos em um array (channels x samples)
+
+    Canais com o mesmo comprimento são reamostrados juntos, com um único
+    filtro polifásico por comprimento distinto. Canais ausentes ou vazios
+    ficam zerados e marcados como inválidos na máscara, para serem
+    excluídos do processamento em vez de preenchidos com ruído.
+
+    Args:
+        channels_data: Dados por canal, como recebidos do dispositivo
+        channels: Ordem dos canais no array de saída
+        target_length: Número de amostras por canal na saída
+        dtype: Precisão do array de saída
+
+    Returns:
+        Tupla (dados, máscara), com máscara True nos canais válidos
+    """
+    aligned = np.zeros((len(channels), target_length), dtype=dtype)
+    mask = np.zeros(len(channels), dtype=bool)
+
+    # Agrupa canais por comprimento
+    groups = defaultdict(list)
+    for idx, ch in enumerate(channels):
+        values = channels_data.get(ch)
+        if values is not None and len(values) > 0:
+            groups[len(values)].append(idx)
+
+    for length, indices in groups.items():
+        block = np.array([channels_data[channels[i]] for i in indices], dtype=np.float64)
+        aligned[indices] = _resample_block(block, target_length)
+        mask[indices] = True
+
+    missing = [ch for ch, ok in zip(channels, mask) if not ok]
+    if missing:
+        logger.warning(f"Canais ausentes mascarados: {missing}")
+
+    return aligned, mask
+
+def _resample_block(block: np.ndarray, target_length: int) -> np.ndarray:
+    """Reamostra um bloco (channels x samples) para target_length amostras"""
+    length = block.shape[1]
+    if length == target_length:
+        return block
+    if length == 1:
+        return np.repeat(block, target_length, axis=1)
+
+    ratio = Fraction(target_length, length)
+    return signal.resample_poly(
+        block,
+        ratio.numerator,
+        ratio.denominator,
+        axis=1,
+        padtype='line'
+    )
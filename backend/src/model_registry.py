@@ -0,0 +1,96 @@
+import threading
+import time
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class ModelVersion:
+    """Modelo treinado imutável (scaler + classificador + schema)"""
+    version: int
+    scaler: Any
+    classifier: Any
+    feature_schema: Tuple[str, ...]
+    training_stats: Dict[str, Any] = field(default_factory=dict)
+    created_at: float = field(default_factory=time.time)
+    compiled: Optional[Any] = None  # avaliador vetorizado equivalente ao classificador
+
+    @property
+    def estimator(self) -> Any:
+        """Avaliador usado na inferência (compilado, se disponível)"""
+        return self.compiled if self.compiled is not None else self.classifier
+
+class ModelRegistry:
+    """
+    Histórico de versões do modelo com troca atômica
+
+    A versão ativa é uma única referência a um ModelVersion imutável:
+    quem faz predição lê a referência uma vez e usa aquele modelo até o
+    fim, enquanto publish/rollback apenas trocam a referência. Nenhum
+    modelo em uso é alterado no lugar.
+    """
+
+    def __init__(self, max_versions: int = 5):
+        """
+        Inicializa o registro
+
+        Args:
+            max_versions: Número de versões mantidas para rollback
+        """
+        self._lock = threading.Lock()
+        self._history: deque = deque(maxlen=max_versions)
+        self._active: Optional[ModelVersion] = None
+        self._last_version = 0
+
+    @property
+    def active(self) -> Optional[ModelVersion]:
+        """Versão usada nas predições (None se nenhuma foi publicada)"""
+        return self._active
+
+    def next_version(self) -> int:
+        """Reserva o próximo número de versão"""
+        with self._lock:
+            self._last_version += 1
+            return self._last_version
+
+    def publish(self, model: ModelVersion) -> ModelVersion:
+        """Adiciona uma versão ao histórico e a torna ativa"""
+        with self._lock:
+            self._last_version = max(self._last_version, model.version)
+            self._history.append(model)
+            self._active = model
+        logger.info(f"Modelo versão {model.version} ativado")
+        return model
+
+    def rollback(self, version: Optional[int] = None) -> ModelVersion:
+        """
+        Reativa uma versão anterior
+
+        Args:
+            version: Versão a reativar (None = anterior à ativa)
+
+        Returns:
+            Versão ativada
+        """
+        with self._lock:
+            history = list(self._history)
+            if version is None:
+                older = [m for m in history if self._active is None or m.version < self._active.version]
+                if not older:
+                    raise ValueError("Nenhuma versão anterior disponível")
+                target = max(older, key=lambda m: m.version)
+            else:
+                matches = [m for m in history if m.version == version]
+                if not matches:
+                    raise ValueError(f"Versão {version} não está no histórico")
+                target = matches[0]
+            self._active = target
+        logger.info(f"Rollback para o modelo versão {target.version}")
+        return target
+
+    def versions(self) -> List[int]:
+        """Versões disponíveis para rollback"""
+        return [m.version for m in self._history]
@@ -0,0 +1,123 @@
+import numpy as np
+import copy
+import threading
+import logging
+from fractions import Fraction
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy import signal
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class PolyphaseResampler:
+    """
+    Reamostrador polifásico com filtro anti-aliasing e estado entre blocos
+
+    Converte um fluxo multicanal da taxa do dispositivo para a taxa de
+    análise (razão racional up/down). O histórico do filtro e a fase são
+    mantidos entre chamadas, de modo que processar o sinal em blocos
+    produz o mesmo resultado que processá-lo de uma vez.
+    """
+
+    def __init__(
+        self,
+        input_sfreq: float,
+        output_sfreq: float,
+        dtype: str = 'float64',
+        max_denominator: int = 1000,
+        window: Tuple = ('kaiser', 5.0)
+    ):
+        """
+        Inicializa o reamostrador
+
+        Args:
+            input_sfreq: Taxa de amostragem do dispositivo
+            output_sfreq: Taxa de amostragem de análise
+            dtype: Precisão da saída
+            max_denominator: Maior denominador aceito na razão up/down
+            window: Janela usada no projeto do filtro FIR
+        """
+        ratio = Fraction(output_sfreq / input_sfreq).limit_denominator(max_denominator)
+        self.input_sfreq = input_sfreq
+        self.output_sfreq = output_sfreq
+        self.up = ratio.numerator
+        self.down = ratio.denominator
+        self.dtype = np.dtype(dtype)
+
+        # Mesmo projeto de filtro de scipy.signal.resample_poly
+        max_rate = max(self.up, self.down)
+        half_len = 10 * max_rate
+        taps = signal.firwin(2 * half_len + 1, 1.0 / max_rate, window=window) * self.up
+
+        # Decomposição polifásica: fase p usa h[p], h[p + up], h[p + 2up], ...
+        n_taps = -(-len(taps) // self.up) * self.up
+        taps = np.pad(taps, (0, n_taps - len(taps)))
+        self.n_phase_taps = n_taps // self.up
+
+        # Invertido para casar com janelas em ordem crescente de tempo
+        self._phases = taps.reshape(-1, self.up).T[:, ::-1].astype(self.dtype)
+
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Descarta histórico e fase (início de um novo fluxo)"""
+        self._history: Optional[np.ndarray] = None
+        self._n_in = 0  # amostras de entrada consumidas
+        self._n_out = 0  # amostras de saída produzidas
+
+    def copy(self) -> 'PolyphaseResampler':
+        """Reamostrador com o mesmo filtro (sem reprojetá-lo) e estado zerado"""
+        clone = copy.copy(self)
+        clone._lock = threading.Lock()
+        clone.reset()
+        return clone
+
+    def output_length(self, n_samples: int) -> int:
+        """Número aproximado de amostras de saída para um bloco de entrada"""
+        return int(round(n_samples * self.up / self.down))
+
+    def process(self, data: np.ndarray) -> np.ndarray:
+        """
+        Reamostra o próximo bloco do fluxo
+
+        Args:
+            data: Bloco com sinais EEG (channels x samples) na taxa do dispositivo
+
+        Returns:
+            Bloco reamostrado (channels x samples) na taxa de análise
+        """
+        data = np.asarray(data, dtype=self.dtype)
+
+        with self._lock:
+            n_channels, n_samples = data.shape
+            if self._history is None:
+                self._history = np.zeros((n_channels, self.n_phase_taps - 1), dtype=self.dtype)
+            elif self._history.shape[0] != n_channels:
+                raise ValueError(
+                    f"Número de canais mudou durante o fluxo ({self._history.shape[0]} -> {n_channels})"
+                )
+
+            extended = np.concatenate([self._history, data], axis=1)
+
+            # Saídas cuja última amostra de entrada necessária está no bloco
+            last_input = self._n_in + n_samples - 1
+            n_available = (last_input * self.up) // self.down + 1
+            outputs = np.arange(self._n_out, n_available)
+
+            positions = outputs * self.down
+            bases = positions // self.up - self._n_in
+            phases = positions % self.up
+
+            windows = sliding_window_view(extended, self.n_phase_taps, axis=1)
+            resampled = np.einsum(
+                'mk,cmk->cm',
+                self._phases[phases],
+                windows[:, bases, :]
+            )
+
+            self._history = extended[:, extended.shape[1] - (self.n_phase_taps - 1):]
+            self._n_in += n_samples
+            self._n_out = n_available
+
+        return resampled.astype(self.dtype, copy=False)
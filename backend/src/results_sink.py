@@ -0,0 +1,320 @@
+import numpy as np
+import io
+import os
+import re
+import time
+import queue
+import logging
+import zipfile
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Union
+
+logger = logging.getLogger(__name__)
+
+RESULT_FORMATS = ('npz', 'parquet')
+
+# Grupos do resultado de AttentionBCI.process_epoch gravados como colunas
+RESULT_GROUPS = ('attention_metrics', 'band_powers', 'quality')
+
+# results-<primeiro instante>-<último instante>-<sequência>.<formato>
+_PART_PATTERN = re.compile(r'^results-(\d+\.\d+)-(\d+\.\d+)-(\d+)\.(npz|parquet)$')
+
+def flatten_result(result: Dict, channels: Sequence[str]) -> Dict[str, Union[float, str]]:
+    """
+    Converte um resultado por época em uma linha de colunas escalares
+
+    As colunas são '<grupo>.<chave>' para métricas de atenção, poder
+    por banda e qualidade, e 'connectivity.<canal>-<canal>' para o
+    triângulo superior da matriz de conectividade.
+    """
+    row: Dict[str, Union[float, str]] = {}
+    for group in RESULT_GROUPS:
+        for key, value in result.get(group, {}).items():
+            row[f'{group}.{key}'] = value if isinstance(value, str) else float(value)
+
+    connectivity = result.get('connectivity')
+    if connectivity is not None:
+        matrix = np.asarray(connectivity, dtype=np.float64)
+        rows, cols = np.triu_indices(min(len(channels), matrix.shape[0]), k=1)
+        for i, j in zip(rows, cols):
+            row[f'connectivity.{channels[i]}-{channels[j]}'] = float(matrix[i, j])
+    return row
+
+class ResultsSink:
+    """
+    Acumula resultados por época em lotes colunares gravados em disco
+
+    Cada coluna é um array pré-alocado do lote (float32, ou texto para
+    campos como eye_state; o instante é float64). Quando o lote enche,
+    ou a cada flush_interval segundos, ele é entregue a uma thread de
+    fundo que grava um arquivo de partição (NPZ, ou Parquet com pyarrow)
+    de forma atômica, sem I/O no caminho de processamento. O nome de
+    cada partição traz o intervalo de tempo coberto, de modo que
+    consultas por período abrem apenas as partições relevantes.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        channels: Sequence[str],
+        batch_size: int = 1024,
+        flush_interval: float = 10.0,
+        format: str = 'npz',
+        max_pending: int = 8
+    ):
+        """
+        Inicializa o coletor
+
+        Args:
+            directory: Diretório das partições
+            channels: Canais, para nomear as colunas de conectividade
+            batch_size: Linhas por lote
+            flush_interval: Segundos máximos de um lote parcial em memória
+            format: 'npz' ou 'parquet' (requer pyarrow)
+            max_pending: Lotes aguardando gravação antes de bloquear
+        """
+        if format not in RESULT_FORMATS:
+            raise ValueError(f"Formato desconhecido: {format} (opções: {RESULT_FORMATS})")
+        if format == 'parquet':
+            import pyarrow  # noqa: F401  (falha cedo se não estiver instalado)
+        self.directory = Path(directory)
+        self.channels = list(channels)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.format = format
+
+        self.columns: Optional[Dict[str, np.ndarray]] = None  # lote atual
+        self.n_rows = 0
+        self.rows_written = 0
+        self.parts_written = 0
+        self._batch_started = 0.0
+        self._sequence = self._last_sequence()
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def append(self, timestamp: float, result: Dict) -> None:
+        """Adiciona o resultado de uma época ao lote atual"""
+        row = flatten_result(result, self.channels)
+        with self._lock:
+            if self.columns is None:
+                self.columns = self._allocate(row)
+            if self.n_rows == 0:
+                self._batch_started = time.monotonic()
+            self.columns['timestamp'][self.n_rows] = timestamp
+            for name, column in self.columns.items():
+                if name != 'timestamp':
+                    column[self.n_rows] = row.get(name, '' if column.dtype.kind == 'U' else np.nan)
+            self.n_rows += 1
+            due = (
+                self.n_rows >= self.batch_size
+                or time.monotonic() - self._batch_started >= self.flush_interval
+            )
+        if due:
+            self._submit()
+
+    def flush(self) -> None:
+        """Grava o lote parcial e espera todas as gravações pendentes"""
+        self._submit()
+        self._queue.join()
+
+    def close(self) -> None:
+        """Grava o que falta e encerra a thread de gravação"""
+        self.flush()
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def parts(self, start_time: Optional[float] = None, end_time: Optional[float] = None) -> List[Path]:
+        """Partições com resultados em [start_time, end_time), em ordem de gravação"""
+        found = []
+        if not self.directory.exists():
+            return found
+        for path in self.directory.iterdir():
+            match = _PART_PATTERN.match(path.name)
+            if not match:
+                continue
+            first, last, sequence = float(match[1]), float(match[2]), int(match[3])
+            if (start_time is None or last >= start_time) and (end_time is None or first < end_time):
+                found.append((sequence, path))
+        return [path for _, path in sorted(found)]
+
+    def read(
+        self,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+        columns: Optional[Sequence[str]] = None
+    ) -> Dict[str, np.ndarray]:
+        """Colunas dos resultados gravados em [start_time, end_time)"""
+        batches = list(self.iter_batches(start_time, end_time, columns))
+        if not batches:
+            return {}
+        return {name: np.concatenate([b[name] for b in batches]) for name in batches[0]}
+
+    def iter_batches(
+        self,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+        columns: Optional[Sequence[str]] = None
+    ) -> Iterator[Dict[str, np.ndarray]]:
+        """Gera uma partição por vez, filtrada pelo período e pelas colunas (timestamp sempre incluído)"""
+        if columns is not None:
+            columns = ['timestamp'] + [c for c in columns if c != 'timestamp']
+        for path in self.parts(start_time, end_time):
+            batch = read_part(path, columns)
+            timestamps = batch['timestamp']
+            keep = np.ones(len(timestamps), dtype=bool)
+            if start_time is not None:
+                keep &= timestamps >= start_time
+            if end_time is not None:
+                keep &= timestamps < end_time
+            if keep.any():
+                yield {name: values[keep] for name, values in batch.items()}
+
+    def iter_csv(
+        self,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+        columns: Optional[Sequence[str]] = None
+    ) -> Iterator[bytes]:
+        """Exporta os resultados como CSV, uma partição por vez"""
+        header_written = False
+        for batch in self.iter_batches(start_time, end_time, columns):
+            names = list(batch)
+            if not header_written:
+                yield (','.join(names) + '\n').encode()
+                header_written = True
+            text = io.StringIO()
+            for row in zip(*(batch[name].tolist() for name in names)):
+                text.write(','.join(_csv_value(v) for v in row) + '\n')
+            yield text.getvalue().encode()
+
+    def iter_zip(
+        self,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None
+    ) -> Iterator[bytes]:
+        """Exporta as partições do período, como estão, em um ZIP transmitido em blocos"""
+        buffer = _StreamBuffer()
+        with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_STORED) as archive:
+            for path in self.parts(start_time, end_time):
+                with open(path, 'rb') as source, archive.open(path.name, 'w') as target:
+                    while True:
+                        block = source.read(1 << 20)
+                        if not block:
+                            break
+                        target.write(block)
+                        yield buffer.drain()
+        yield buffer.drain()
+
+    def _allocate(self, row: Dict) -> Dict[str, np.ndarray]:
+        """Define o esquema pelo primeiro resultado (colunas em ordem estável)"""
+        columns = {'timestamp': np.empty(self.batch_size, dtype=np.float64)}
+        for name, value in row.items():
+            dtype = '<U32' if isinstance(value, str) else np.float32
+            columns[name] = np.empty(self.batch_size, dtype=dtype)
+        return columns
+
+    def _submit(self):
+        """Entrega o lote atual à thread de gravação e começa um novo"""
+        with self._lock:
+            if not self.n_rows:
+                return
+            batch = {name: column[:self.n_rows].copy() for name, column in self.columns.items()}
+            self.n_rows = 0
+            self._sequence += 1
+            sequence = self._sequence
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._write_loop, name='results-sink', daemon=True)
+            self._thread.start()
+        self._queue.put((sequence, batch))
+
+    def _write_loop(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                self._write(*item)
+            except Exception as e:
+                logger.error(f"Erro ao gravar resultados: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    def _write(self, sequence: int, batch: Dict[str, np.ndarray]):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        timestamps = batch['timestamp']
+        # Intervalo arredondado para fora: parts() nunca descarta uma
+        # partição que contém instantes do período pedido
+        first = np.floor(timestamps.min() * 1000) / 1000
+        last = np.ceil(timestamps.max() * 1000) / 1000
+        name = f'results-{first:.3f}-{last:.3f}-{sequence:08d}.{self.format}'
+        tmp = self.directory / (name + '.tmp')
+        with open(tmp, 'wb') as f:
+            if self.format == 'npz':
+                np.savez(f, **batch)
+            else:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+                pq.write_table(pa.table(batch), f)
+        os.replace(tmp, self.directory / name)
+        self.rows_written += len(timestamps)
+        self.parts_written += 1
+
+    def _last_sequence(self) -> int:
+        """Continua a numeração de partições já existentes no diretório"""
+        if not self.directory.exists():
+            return 0
+        sequences = [
+            int(match[3]) for match in map(_PART_PATTERN.match, os.listdir(self.directory)) if match
+        ]
+        return max(sequences, default=0)
+
+    def get_stats(self) -> Dict:
+        return {
+            'format': self.format,
+            'pending_rows': self.n_rows,
+            'rows_written': self.rows_written,
+            'parts_written': self.parts_written
+        }
+
+def read_part(path: Union[str, Path], columns: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+    """Lê (apenas as colunas pedidas de) uma partição"""
+    path = Path(path)
+    if path.suffix == '.npz':
+        with np.load(path) as data:
+            names = data.files if columns is None else [c for c in columns if c in data.files]
+            return {name: data[name] for name in names}
+    import pyarrow.parquet as pq
+    table = pq.read_table(path, columns=None if columns is None else list(columns))
+    return {name: table[name].to_numpy() for name in table.column_names}
+
+def _csv_value(value) -> str:
+    if isinstance(value, float):
+        return '' if np.isnan(value) else repr(value)
+    return str(value)
+
+class _StreamBuffer(io.RawIOBase):
+    """Destino não pesquisável do ZipFile; drain() devolve o que foi escrito"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
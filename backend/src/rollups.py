@@ -0,0 +1,241 @@
+import numpy as np
+import logging
+from typing import Dict, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Métricas agregadas de cada resultado por época (eye_closed: 1 = fechado)
+ROLLUP_METRICS = (
+    'attention_score', 'engagement_index', 'theta_beta_ratio', 'eye_closed',
+    'delta', 'theta', 'alpha', 'beta', 'gamma',
+    'overall_score', 'artifact_ratio'
+)
+BANDS = ('delta', 'theta', 'alpha', 'beta', 'gamma')
+
+# (resolução em segundos, buckets retidos): 1 h, 1 dia, 1 semana, 30 dias
+DEFAULT_RESOLUTIONS: Tuple[Tuple[float, int], ...] = (
+    (1.0, 3600),
+    (10.0, 8640),
+    (60.0, 10080),
+    (600.0, 4320)
+)
+
+def rollup_values(result: Dict) -> np.ndarray:
+    """Extrai ROLLUP_METRICS de um resultado de process_epoch (NaN se ausente)"""
+    attention = result.get('attention_metrics', {})
+    bands = result.get('band_powers', {})
+    quality = result.get('quality', result.get('quality_metrics', {}))
+    eye_state = attention.get('eye_state')
+    source = {
+        **{k: attention.get(k) for k in ('attention_score', 'engagement_index', 'theta_beta_ratio')},
+        'eye_closed': None if eye_state is None else float(eye_state == 'closed'),
+        **{band: bands.get(band) for band in BANDS},
+        'overall_score': quality.get('overall_score'),
+        'artifact_ratio': quality.get('artifact_ratio')
+    }
+    return np.array([np.nan if source[m] is None else float(source[m]) for m in ROLLUP_METRICS])
+
+class RollupLevel:
+    """
+    Agregados de uma resolução em buffers circulares (estilo RRD)
+
+    O bucket de um instante t é floor(t / resolution) e ocupa a posição
+    bucket % capacity; quando a posição é reutilizada por um bucket mais
+    novo, o antigo é descartado. Cada posição guarda contagem, soma,
+    soma dos quadrados, mínimo e máximo por métrica.
+    """
+
+    def __init__(self, resolution: float, capacity: int, n_metrics: int):
+        self.resolution = resolution
+        self.capacity = capacity
+        self.buckets = np.full(capacity, -1, dtype=np.int64)
+        self.count = np.zeros((capacity, n_metrics), dtype=np.int64)
+        self.sum = np.zeros((capacity, n_metrics))
+        self.sumsq = np.zeros((capacity, n_metrics))
+        self.min = np.full((capacity, n_metrics), np.inf)
+        self.max = np.full((capacity, n_metrics), -np.inf)
+        self.latest = -1  # bucket mais recente
+
+    def add(self, timestamp: float, values: np.ndarray) -> None:
+        bucket = int(np.floor(timestamp / self.resolution))
+        slot = bucket % self.capacity
+        if self.buckets[slot] != bucket:
+            if self.buckets[slot] > bucket:
+                return  # mais antigo que a retenção desta resolução
+            self.buckets[slot] = bucket
+            self.count[slot] = 0
+            self.sum[slot] = 0.0
+            self.sumsq[slot] = 0.0
+            self.min[slot] = np.inf
+            self.max[slot] = -np.inf
+        valid = ~np.isnan(values)
+        clean = np.where(valid, values, 0.0)
+        self.count[slot] += valid
+        self.sum[slot] += clean
+        self.sumsq[slot] += clean * clean
+        self.min[slot] = np.where(valid, np.minimum(self.min[slot], clean), self.min[slot])
+        self.max[slot] = np.where(valid, np.maximum(self.max[slot], clean), self.max[slot])
+        self.latest = max(self.latest, bucket)
+
+    @property
+    def oldest(self) -> int:
+        """Primeiro bucket ainda retido"""
+        return max(self.latest - self.capacity + 1, 0)
+
+    def n_buckets(self, start: float, end: float) -> int:
+        return int(np.floor(end / self.resolution)) - int(np.floor(start / self.resolution)) + 1
+
+    def covers(self, start: float) -> bool:
+        return int(np.floor(start / self.resolution)) >= self.oldest
+
+    def read(self, start: float, end: float) -> Dict[str, np.ndarray]:
+        """Buckets existentes entre start e end, em ordem temporal"""
+        first = max(int(np.floor(start / self.resolution)), self.oldest)
+        last = min(int(np.floor(end / self.resolution)), self.latest)
+        ids = np.arange(first, last + 1, dtype=np.int64)
+        slots = ids % self.capacity
+        present = self.buckets[slots] == ids
+        ids, slots = ids[present], slots[present]
+        return {
+            'time': ids * self.resolution,
+            'count': self.count[slots],
+            'sum': self.sum[slots],
+            'sumsq': self.sumsq[slots],
+            'min': self.min[slots],
+            'max': self.max[slots]
+        }
+
+class RollupStore:
+    """
+    Agregados incrementais dos resultados por época em várias resoluções
+
+    Cada resultado atualiza um bucket por resolução (custo constante),
+    e consultas de resumo ou tendência leem a resolução mais fina que
+    cubra o período com até max_points buckets, sem reprocessar o
+    histórico. A memória é fixa, definida pelas capacidades.
+    """
+
+    def __init__(self, resolutions: Sequence[Tuple[float, int]] = DEFAULT_RESOLUTIONS):
+        """
+        Inicializa os níveis
+
+        Args:
+            resolutions: Pares (segundos por bucket, buckets retidos),
+                da resolução mais fina para a mais grossa
+        """
+        self.levels = [
+            RollupLevel(resolution, capacity, len(ROLLUP_METRICS))
+            for resolution, capacity in sorted(resolutions)
+        ]
+        self.first_time: Optional[float] = None
+        self.last_time: Optional[float] = None
+        self.n_results = 0
+
+    def add(self, timestamp: float, result: Dict) -> None:
+        """Incorpora o resultado de uma época"""
+        values = rollup_values(result)
+        for level in self.levels:
+            level.add(timestamp, values)
+        self.first_time = timestamp if self.first_time is None else min(self.first_time, timestamp)
+        self.last_time = timestamp if self.last_time is None else max(self.last_time, timestamp)
+        self.n_results += 1
+
+    def select_level(self, start: float, end: float, max_points: int = 300) -> RollupLevel:
+        """Resolução mais fina que cobre [start, end] com até max_points buckets"""
+        for level in self.levels:
+            if level.n_buckets(start, end) <= max_points and level.covers(start):
+                return level
+        return self.levels[-1]
+
+    def trends(
+        self,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+        max_points: int = 300,
+        metrics: Optional[Sequence[str]] = None
+    ) -> Dict:
+        """
+        Série agregada de cada métrica no período
+
+        Returns:
+            Dicionário com resolution, time (início de cada bucket), count
+            e, por métrica, listas mean/min/max (None em buckets sem valor)
+        """
+        start, end = self._range(start_time, end_time)
+        metrics = list(metrics or ROLLUP_METRICS)
+        unknown = set(metrics) - set(ROLLUP_METRICS)
+        if unknown:
+            raise ValueError(f"Métricas desconhecidas: {sorted(unknown)} (opções: {ROLLUP_METRICS})")
+
+        level = self.select_level(start, end, max_points)
+        data = level.read(start, end)
+        out = {
+            'resolution': level.resolution,
+            'time': data['time'].tolist(),
+            'count': data['count'].max(axis=1).tolist() if len(data['time']) else []
+        }
+        for metric in metrics:
+            i = ROLLUP_METRICS.index(metric)
+            count = data['count'][:, i]
+            has = count > 0
+            mean = np.divide(data['sum'][:, i], count, out=np.zeros(len(count)), where=has)
+            out[metric] = {
+                'mean': _nullable(mean, has),
+                'min': _nullable(data['min'][:, i], has),
+                'max': _nullable(data['max'][:, i], has)
+            }
+        return out
+
+    def summary(
+        self,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+        max_points: int = 300
+    ) -> Optional[Dict]:
+        """
+        Resumo do período no formato de AnalysisSummary
+
+        Returns:
+            Dicionário com mean_attention, attention_variance,
+            dominant_eye_state, band_power_trends e quality_metrics,
+            ou None se não houver resultados no período
+        """
+        start, end = self._range(start_time, end_time)
+        level = self.select_level(start, end, max_points)
+        data = level.read(start, end)
+        count = data['count'].sum(axis=0)
+        if not len(data['time']) or count.max() == 0:
+            return None
+
+        total = np.maximum(count, 1)
+        mean = data['sum'].sum(axis=0) / total
+        variance = np.maximum(data['sumsq'].sum(axis=0) / total - mean ** 2, 0.0)
+        index = {metric: i for i, metric in enumerate(ROLLUP_METRICS)}
+
+        has = data['count'] > 0
+        bucket_mean = np.divide(data['sum'], data['count'], out=np.zeros_like(data['sum']), where=has)
+        return {
+            'mean_attention': float(mean[index['attention_score']]),
+            'attention_variance': float(variance[index['attention_score']]),
+            'dominant_eye_state': 'closed' if mean[index['eye_closed']] > 0.5 else 'open',
+            'band_power_trends': {
+                band: bucket_mean[has[:, index[band]], index[band]].tolist() for band in BANDS
+            },
+            'quality_metrics': {
+                'overall_score': float(mean[index['overall_score']]),
+                'artifact_ratio': float(mean[index['artifact_ratio']]),
+                'epochs': float(count.max()),
+                'resolution': float(level.resolution)
+            }
+        }
+
+    def _range(self, start_time: Optional[float], end_time: Optional[float]) -> Tuple[float, float]:
+        """Período padrão: todo o histórico retido"""
+        if end_time is None:
+            end_time = self.last_time if self.last_time is not None else 0.0
+        if start_time is None:
+            start_time = self.first_time if self.first_time is not None else end_time
+        return start_time, end_time
+
+def _nullable(values: np.ndarray, has: np.ndarray) -> list:
+    return [float(v) if h else None for v, h in zip(values, has)]
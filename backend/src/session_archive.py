@@ -0,0 +1,258 @@
+import numpy as np
+import os
+import json
+import zlib
+import shutil
+import logging
+from pathlib import Path
+from typing import Optional, Tuple, Union
+from .session_recorder import (
+    SessionRecording, read_meta, _memmap,
+    META_FILE, CHUNK_INDEX_FILE, RESULTS_FILE, RESULT_INDEX_FILE
+)
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_ENCODING = 'delta-zlib'
+BLOCKS_FILE = 'signals.dz'
+BLOCK_INDEX_FILE = 'blocks.idx'
+
+# Um registro por bloco comprimido; width é o tamanho em bytes dos
+# deltas inteiros (2, 4 ou 8) ou 0 quando o bloco não é quantizável
+# e foi guardado como float32
+BLOCK_INDEX_DTYPE = np.dtype([
+    ('first_sample', '<i8'),
+    ('n_samples', '<i8'),
+    ('offset', '<i8'),
+    ('length', '<i8'),
+    ('width', '<i8')
+])
+
+def compress_session(
+    source: SessionRecording,
+    path: Union[str, Path],
+    resolution: float = 20 / 39,
+    decimals: Optional[int] = 2,
+    block_samples: int = 1024,
+    level: int = 6
+) -> 'CompressedSession':
+    """
+    Grava uma sessão no formato comprimido
+
+    Cada bloco de block_samples amostras é quantizado em inteiros de
+    `resolution` µV (o LSB do conversor), codificado como a primeira
+    amostra mais as diferenças entre amostras consecutivas de cada canal
+    (em zigzag, 16 bits quando cabem), com os bytes agrupados por significância e
+    comprimido com zlib. A conversão é verificada valor a valor e o que
+    não for reproduzido exatamente é guardado à parte, então o formato é
+    sempre sem perda. Blocos são independentes e indexados em
+    blocks.idx, permitindo acesso aleatório.
+
+    Args:
+        source: Sessão de origem
+        path: Diretório de destino (não pode existir)
+        resolution: LSB do dispositivo em µV (Emotiv EPOC: 20/39 ≈ 0.513)
+        decimals: Casas decimais com que o dispositivo exporta os valores
+            (None = sem arredondamento)
+        block_samples: Amostras por bloco comprimido
+        level: Nível de compressão do zlib
+
+    Returns:
+        Sessão comprimida aberta
+    """
+    path = Path(path)
+    if path.exists():
+        raise FileExistsError(f"Sessão já existe: {path}")
+    tmp = path.with_name(path.name + '.tmp')
+    if tmp.exists():
+        shutil.rmtree(tmp)
+    tmp.mkdir(parents=True)
+
+    try:
+        index = []
+        offset = 0
+        with open(tmp / BLOCKS_FILE, 'wb') as f:
+            for start in range(0, len(source), block_samples):
+                block = source.read_samples(start, min(start + block_samples, len(source)))
+                payload, width = _encode_block(block, resolution, decimals)
+                payload = zlib.compress(payload, level)
+                f.write(payload)
+                index.append((start, block.shape[1], offset, len(payload), width))
+                offset += len(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        np.array(index, dtype=BLOCK_INDEX_DTYPE).tofile(tmp / BLOCK_INDEX_FILE)
+
+        # Índices de blocos/resultados e resultados são copiados como estão
+        np.ascontiguousarray(source.chunks).tofile(tmp / CHUNK_INDEX_FILE)
+        np.ascontiguousarray(source.result_index).tofile(tmp / RESULT_INDEX_FILE)
+        shutil.copyfile(source.path / RESULTS_FILE, tmp / RESULTS_FILE)
+
+        meta = {
+            **source.meta,
+            'encoding': ARCHIVE_ENCODING,
+            'resolution': resolution,
+            'decimals': decimals,
+            'n_samples': len(source)
+        }
+        (tmp / META_FILE).write_text(json.dumps(meta, indent=2))
+        os.replace(tmp, path)
+    except Exception as e:
+        logger.error(f"Erro ao comprimir sessão: {str(e)}")
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+    archive = CompressedSession(path)
+    logger.info(f"Sessão comprimida em {path} (razão {archive.compression_ratio:.1f}x)")
+    return archive
+
+class CompressedSession(SessionRecording):
+    """
+    Sessão no formato comprimido, com a mesma interface de leitura
+
+    blocks.idx é mapeado em memória; uma leitura descomprime apenas os
+    blocos que cobrem o intervalo pedido. O último bloco decodificado é
+    mantido, de modo que janelas sequenciais (reprodução) descomprimem
+    cada bloco uma única vez.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.meta = read_meta(self.path)
+        if self.meta.get('encoding') != ARCHIVE_ENCODING:
+            raise ValueError(f"Sessão {self.path} não está comprimida")
+        self.channels = self.meta['channels']
+        self.sfreq = self.meta['sfreq']
+        self.created_at = self.meta.get('created_at', 0.0)
+        self.resolution = self.meta['resolution']
+        self.decimals = self.meta.get('decimals')
+
+        self.blocks = _memmap(self.path / BLOCK_INDEX_FILE, BLOCK_INDEX_DTYPE)
+        self._data = _memmap(self.path / BLOCKS_FILE, np.dtype(np.uint8))
+        self._cached: Tuple[int, Optional[np.ndarray]] = (-1, None)
+        self._load_indexes(self.meta['n_samples'])
+
+    @property
+    def compressed_bytes(self) -> int:
+        return int(self.blocks['length'].sum())
+
+    @property
+    def compression_ratio(self) -> float:
+        """Tamanho em float32 dividido pelo tamanho comprimido"""
+        return len(self) * len(self.channels) * 4 / max(self.compressed_bytes, 1)
+
+    def read_samples(self, start: int, stop: int, channels=None) -> np.ndarray:
+        stop = min(stop, len(self))
+        rows = slice(None) if channels is None else [self.channels.index(ch) for ch in channels]
+        n_rows = len(self.channels) if channels is None else len(rows)
+        if stop <= start:
+            return np.empty((n_rows, 0), dtype=np.float32)
+
+        first = int(np.searchsorted(self.blocks['first_sample'], start, side='right')) - 1
+        last = int(np.searchsorted(self.blocks['first_sample'], stop, side='left'))
+        parts = []
+        for i in range(first, last):
+            block_start = int(self.blocks['first_sample'][i])
+            block = self._decode(i)
+            lo = max(start - block_start, 0)
+            hi = min(stop - block_start, block.shape[1])
+            parts.append(block[rows, lo:hi])
+        return np.ascontiguousarray(np.concatenate(parts, axis=1))
+
+    def _decode(self, i: int) -> np.ndarray:
+        """Descomprime o bloco i (channels x samples, float32)"""
+        if self._cached[0] == i:
+            return self._cached[1]
+        entry = self.blocks[i]
+        raw = zlib.decompress(self._data[entry['offset']:entry['offset'] + entry['length']])
+        block = _decode_block(
+            raw, len(self.channels), int(entry['n_samples']), int(entry['width']),
+            self.resolution, self.decimals
+        )
+        self._cached = (i, block)
+        return block
+
+def open_session(path: Union[str, Path]) -> SessionRecording:
+    """Abre uma sessão gravada, comprimida ou não"""
+    meta = read_meta(Path(path))
+    if meta.get('encoding') == ARCHIVE_ENCODING:
+        return CompressedSession(path)
+    return SessionRecording(path)
+
+def is_session(path: Union[str, Path]) -> bool:
+    return (Path(path) / META_FILE).is_file()
+
+def _dequantize(q: np.ndarray, resolution: float, decimals: Optional[int]) -> np.ndarray:
+    """Inteiros -> µV, com o arredondamento aplicado pelo dispositivo na exportação"""
+    values = q * resolution
+    if decimals is not None:
+        values = np.round(values, decimals)
+    return values.astype(np.float32)
+
+def _encode_block(block: np.ndarray, resolution: float, decimals: Optional[int]) -> Tuple[bytes, int]:
+    """
+    Quantiza e aplica delta por canal
+
+    Valores que a quantização não reproduz exatamente são guardados à
+    parte como exceções (posição, float32); se o bloco não for
+    quantizável (não finito, fora da faixa ou com muitas exceções), vai
+    inteiro como float32.
+    """
+    block = np.asarray(block, dtype=np.float32)
+    q = np.rint(block.astype(np.float64) / resolution)
+    if not (np.all(np.isfinite(q)) and np.all(np.abs(q) < 2 ** 52)):
+        return _shuffle(block.astype('<f4')), 0
+
+    q = q.astype(np.int64)
+    exceptions = np.flatnonzero(_dequantize(q, resolution, decimals) != block)
+    if len(exceptions) > block.size // 4:
+        # Sinal sem a grade do dispositivo (ex.: já filtrado): float32 é menor
+        return _shuffle(block.astype('<f4')), 0
+    # Zigzag: deltas pequenos, positivos ou negativos, viram inteiros
+    # sem sinal pequenos (bytes altos zerados comprimem melhor)
+    deltas = np.diff(q, axis=1)
+    deltas = (deltas << 1) ^ (deltas >> 63)
+    width = 8
+    for candidate in (2, 4):
+        if deltas.size == 0 or deltas.max() < 1 << (8 * candidate):
+            width = candidate
+            break
+    header = np.concatenate([[len(exceptions)], q[:, 0], exceptions]).astype('<i8').tobytes()
+    patches = block.ravel()[exceptions].astype('<f4').tobytes()
+    return header + patches + _shuffle(deltas.astype(f'<u{width}')), width
+
+def _decode_block(
+    raw: bytes,
+    n_channels: int,
+    n_samples: int,
+    width: int,
+    resolution: float,
+    decimals: Optional[int]
+) -> np.ndarray:
+    if width == 0:
+        return _unshuffle(raw, np.dtype('<f4')).reshape(n_channels, n_samples)
+    n_exceptions = int(np.frombuffer(raw[:8], dtype='<i8')[0])
+    header = np.frombuffer(raw[8:8 * (1 + n_channels + n_exceptions)], dtype='<i8')
+    first, exceptions = header[:n_channels], header[n_channels:]
+    pos = 8 * (1 + n_channels + n_exceptions)
+    patches = np.frombuffer(raw[pos:pos + 4 * n_exceptions], dtype='<f4')
+    zigzag = _unshuffle(raw[pos + 4 * n_exceptions:], np.dtype(f'<u{width}')).astype(np.int64)
+    deltas = (zigzag >> 1) ^ -(zigzag & 1)
+    deltas = deltas.reshape(n_channels, n_samples - 1)
+
+    q = np.empty((n_channels, n_samples), dtype=np.int64)
+    q[:, 0] = first
+    np.cumsum(deltas, axis=1, out=q[:, 1:])
+    q[:, 1:] += first[:, None]
+    block = _dequantize(q, resolution, decimals)
+    block.ravel()[exceptions] = patches
+    return block
+
+def _shuffle(values: np.ndarray) -> bytes:
+    """Agrupa os bytes por significância (bytes altos, quase sempre 0, juntos)"""
+    values = np.ascontiguousarray(values)
+    return values.view(np.uint8).reshape(-1, values.itemsize).T.tobytes()
+
+def _unshuffle(raw: bytes, dtype: np.dtype) -> np.ndarray:
+    planes = np.frombuffer(raw, dtype=np.uint8).reshape(dtype.itemsize, -1)
+    return np.ascontiguousarray(planes.T).view(dtype).ravel()
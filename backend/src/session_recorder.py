@@ -0,0 +1,342 @@
+import numpy as np
+import os
+import json
+import time
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+from .streaming import Window
+
+logger = logging.getLogger(__name__)
+
+SESSION_FORMAT_VERSION = 1
+
+# Um registro por bloco gravado: instante da primeira amostra, posição
+# (em amostras) em signals.f32, número de amostras e canais válidos (bits)
+CHUNK_INDEX_DTYPE = np.dtype([
+    ('timestamp', '<f8'),
+    ('offset', '<i8'),
+    ('n_samples', '<i8'),
+    ('channel_mask', '<u8')
+])
+# Um registro por resultado: instante, posição e tamanho da linha em results.jsonl
+RESULT_INDEX_DTYPE = np.dtype([
+    ('timestamp', '<f8'),
+    ('offset', '<i8'),
+    ('length', '<i8')
+])
+
+SIGNALS_FILE = 'signals.f32'
+CHUNK_INDEX_FILE = 'chunks.idx'
+RESULTS_FILE = 'results.jsonl'
+RESULT_INDEX_FILE = 'results.idx'
+META_FILE = 'meta.json'
+
+class SessionRecorder:
+    """
+    Gravação incremental de uma sessão em disco
+
+    Cada bloco de sinal é anexado como float32 (amostras x canais) a
+    signals.f32 e indexado em chunks.idx; cada resultado por época é uma
+    linha de results.jsonl indexada em results.idx. Os arquivos só
+    crescem, então a memória não depende da duração da sessão, e um
+    fsync periódico limita o que se perde em uma queda. Os arquivos são
+    criados apenas no primeiro bloco. As escritas são serializadas por
+    um lock, então o gravador pode ser usado a partir de threads (ex.:
+    asyncio.to_thread); blocos recebidos após close() são descartados.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        channels: Sequence[str],
+        sfreq: float,
+        fsync_interval: float = 1.0
+    ):
+        """
+        Inicializa o gravador
+
+        Args:
+            path: Diretório da sessão (não pode existir)
+            channels: Canais na ordem das linhas dos blocos
+            sfreq: Frequência de amostragem dos blocos
+            fsync_interval: Segundos entre sincronizações com o disco
+        """
+        self.path = Path(path)
+        if self.path.exists():
+            raise FileExistsError(f"Sessão já existe: {self.path}")
+        self.channels = list(channels)
+        self.sfreq = float(sfreq)
+        self.fsync_interval = fsync_interval
+
+        self.n_samples = 0
+        self.n_chunks = 0
+        self.n_results = 0
+        self._files: Dict[str, object] = {}
+        self._results_size = 0
+        self._last_sync = time.monotonic()
+        self._lock = threading.RLock()
+        self.closed = False
+
+    def __len__(self) -> int:
+        return self.n_samples
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def append(
+        self,
+        timestamp: float,
+        block: np.ndarray,
+        result: Optional[Dict] = None,
+        channel_mask: Optional[np.ndarray] = None
+    ) -> None:
+        """
+        Anexa um bloco de sinal e, opcionalmente, o resultado da época
+
+        Args:
+            timestamp: Instante da primeira amostra do bloco
+            block: Sinal (channels x samples)
+            result: Resultado do processamento do bloco
+            channel_mask: Canais válidos (None = todos)
+        """
+        block = np.asarray(block)
+        if block.ndim != 2 or block.shape[0] != len(self.channels):
+            raise ValueError(f"Bloco com shape {block.shape}; esperado ({len(self.channels)}, n)")
+        mask = np.ones(len(self.channels), dtype=bool) if channel_mask is None else channel_mask
+        samples = np.ascontiguousarray(block.T, dtype='<f4').tobytes()
+
+        with self._lock:
+            if self.closed:
+                logger.warning(f"Bloco recebido após o fim da gravação em {self.path} descartado")
+                return
+            if not self._files:
+                self._open()
+            entry = np.array(
+                [(timestamp, self.n_samples, block.shape[1], _pack_mask(mask))],
+                dtype=CHUNK_INDEX_DTYPE
+            )
+            # Dados antes do índice: um índice nunca aponta para dados ausentes
+            self._files['signals'].write(samples)
+            self._files['chunks'].write(entry.tobytes())
+            self.n_samples += block.shape[1]
+            self.n_chunks += 1
+
+            if result is not None:
+                self.append_result(timestamp, result)
+            else:
+                self.flush()
+
+    def append_result(self, timestamp: float, result: Dict) -> None:
+        """Anexa um resultado por época"""
+        line = (json.dumps(result, default=_to_builtin) + '\n').encode('utf-8')
+        with self._lock:
+            if self.closed:
+                return
+            if not self._files:
+                self._open()
+            entry = np.array([(timestamp, self._results_size, len(line))], dtype=RESULT_INDEX_DTYPE)
+            self._files['results'].write(line)
+            self._files['result_index'].write(entry.tobytes())
+            self._results_size += len(line)
+            self.n_results += 1
+            self.flush()
+
+    def flush(self, sync: bool = False) -> None:
+        """Esvazia os buffers; sincroniza com o disco se sync ou se venceu o intervalo"""
+        with self._lock:
+            for f in self._files.values():
+                f.flush()
+            if self._files and (sync or time.monotonic() - self._last_sync >= self.fsync_interval):
+                for f in self._files.values():
+                    os.fsync(f.fileno())
+                self._last_sync = time.monotonic()
+
+    def close(self) -> None:
+        """Sincroniza e fecha os arquivos"""
+        with self._lock:
+            self.closed = True
+            if self._files:
+                self.flush(sync=True)
+                for f in self._files.values():
+                    f.close()
+                self._files = {}
+
+    def _open(self):
+        self.path.mkdir(parents=True)
+        meta = {
+            'format_version': SESSION_FORMAT_VERSION,
+            'channels': self.channels,
+            'sfreq': self.sfreq,
+            'created_at': time.time()
+        }
+        (self.path / META_FILE).write_text(json.dumps(meta, indent=2))
+        self._files = {
+            'signals': open(self.path / SIGNALS_FILE, 'ab'),
+            'chunks': open(self.path / CHUNK_INDEX_FILE, 'ab'),
+            'results': open(self.path / RESULTS_FILE, 'ab'),
+            'result_index': open(self.path / RESULT_INDEX_FILE, 'ab')
+        }
+
+class SessionRecording:
+    """
+    Sessão gravada, acessada via memory-map
+
+    Abrir a sessão lê apenas meta.json; sinais e índices são mapeados
+    em memória e leituras por intervalo de tempo copiam só as amostras
+    pedidas. Pode ser aberta enquanto a gravação continua (vê os dados
+    até o momento da abertura); registros incompletos no fim dos
+    arquivos, como após uma queda, são ignorados.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.meta = read_meta(self.path)
+        self.channels: List[str] = self.meta['channels']
+        self.sfreq: float = self.meta['sfreq']
+        self.created_at: float = self.meta.get('created_at', 0.0)
+
+        n_channels = len(self.channels)
+        n_samples = _file_records(self.path / SIGNALS_FILE, 4 * n_channels)
+        self.signals = _memmap(self.path / SIGNALS_FILE, np.dtype('<f4'), (n_samples, n_channels))
+        self._load_indexes(n_samples)
+
+    def _load_indexes(self, n_samples: int):
+        """Mapeia os índices, descartando entradas além dos dados disponíveis"""
+        chunks = _memmap(self.path / CHUNK_INDEX_FILE, CHUNK_INDEX_DTYPE)
+        valid = int(np.sum(chunks['offset'] + chunks['n_samples'] <= n_samples))
+        self.chunks = chunks[:valid]
+
+        results_size = (self.path / RESULTS_FILE).stat().st_size
+        result_index = _memmap(self.path / RESULT_INDEX_FILE, RESULT_INDEX_DTYPE)
+        valid = int(np.sum(result_index['offset'] + result_index['length'] <= results_size))
+        self.result_index = result_index[:valid]
+
+    def __len__(self) -> int:
+        return int(self.chunks['offset'][-1] + self.chunks['n_samples'][-1]) if len(self.chunks) else 0
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        """Instante da primeira amostra de cada bloco"""
+        return self.chunks['timestamp']
+
+    @property
+    def start_time(self) -> Optional[float]:
+        return float(self.chunks['timestamp'][0]) if len(self.chunks) else None
+
+    @property
+    def end_time(self) -> Optional[float]:
+        if not len(self.chunks):
+            return None
+        last = self.chunks[-1]
+        return float(last['timestamp'] + last['n_samples'] / self.sfreq)
+
+    def sample_at(self, timestamp: float) -> int:
+        """Índice da amostra gravada no instante timestamp (limitado à sessão)"""
+        if not len(self.chunks):
+            return 0
+        i = max(int(np.searchsorted(self.chunks['timestamp'], timestamp, side='right')) - 1, 0)
+        chunk = self.chunks[i]
+        within = int(np.floor((timestamp - chunk['timestamp']) * self.sfreq))
+        return int(chunk['offset'] + np.clip(within, 0, chunk['n_samples']))
+
+    def read(
+        self,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+        channels: Optional[Sequence[str]] = None
+    ) -> np.ndarray:
+        """
+        Sinal entre dois instantes
+
+        Args:
+            start_time: Início (None = início da sessão)
+            end_time: Fim, exclusivo (None = fim da sessão)
+            channels: Subconjunto de canais (None = todos)
+
+        Returns:
+            Array float32 (channels x samples)
+        """
+        start = 0 if start_time is None else self.sample_at(start_time)
+        stop = len(self) if end_time is None else self.sample_at(end_time)
+        return self.read_samples(start, max(start, stop), channels)
+
+    def read_samples(self, start: int, stop: int, channels: Optional[Sequence[str]] = None) -> np.ndarray:
+        """Sinal entre dois índices de amostra (channels x samples)"""
+        columns = slice(None) if channels is None else [self.channels.index(ch) for ch in channels]
+        return np.ascontiguousarray(self.signals[start:stop, columns].T)
+
+    def iter_chunks(self) -> Iterator[Tuple[float, np.ndarray]]:
+        """Gera (instante, bloco channels x samples) na ordem de gravação"""
+        for chunk in self.chunks:
+            start = int(chunk['offset'])
+            yield float(chunk['timestamp']), self.read_samples(start, start + int(chunk['n_samples']))
+
+    def windows(self, window: int, hop: int) -> Iterator[Window]:
+        """Gera janelas para PrefetchingLoader (reprodução da sessão)"""
+        for start in range(0, len(self) - window + 1, hop):
+            yield Window(
+                source=str(self.path),
+                start=start,
+                data=self.read_samples(start, start + window).astype(np.float64),
+                channels=self.channels,
+                sfreq=self.sfreq
+            )
+
+    def results(
+        self,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None
+    ) -> Iterator[Dict]:
+        """Gera os resultados por época com instante em [start_time, end_time)"""
+        timestamps = self.result_index['timestamp']
+        first = 0 if start_time is None else int(np.searchsorted(timestamps, start_time, side='left'))
+        last = len(timestamps) if end_time is None else int(np.searchsorted(timestamps, end_time, side='left'))
+        if first >= last:
+            return
+        with open(self.path / RESULTS_FILE, 'rb') as f:
+            for entry in self.result_index[first:last]:
+                f.seek(int(entry['offset']))
+                yield json.loads(f.read(int(entry['length'])))
+
+    @property
+    def n_results(self) -> int:
+        return len(self.result_index)
+
+def read_meta(path: Path) -> Dict:
+    """Lê e valida o meta.json de uma sessão"""
+    meta = json.loads((Path(path) / META_FILE).read_text())
+    if meta.get('format_version') != SESSION_FORMAT_VERSION:
+        raise ValueError(f"Formato de sessão não suportado: {meta.get('format_version')}")
+    return meta
+
+def _file_records(path: Path, record_size: int) -> int:
+    return path.stat().st_size // record_size if path.exists() else 0
+
+def _memmap(path: Path, dtype: np.dtype, shape: Optional[Tuple[int, ...]] = None) -> np.ndarray:
+    """Memory-map somente leitura dos registros completos do arquivo"""
+    if shape is None:
+        shape = (_file_records(path, dtype.itemsize),)
+    if shape[0] == 0:
+        # mmap não aceita arquivos/regiões vazias
+        return np.empty(shape, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r', shape=shape)
+
+def _pack_mask(mask: np.ndarray) -> int:
+    return sum(1 << int(i) for i in np.flatnonzero(mask))
+
+def unpack_mask(packed: int, n_channels: int) -> np.ndarray:
+    """Converte o campo channel_mask do índice em máscara booleana"""
+    return (int(packed) >> np.arange(n_channels)) & 1 == 1
+
+def _to_builtin(value):
+    """Serializa tipos numpy em JSON"""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Tipo não serializável: {type(value).__name__}")
@@ -4,16 +4,22 @@ import logging
 from dataclasses import dataclass, field
 from scipy import signal
 import pywt
-from typing import Dict, Optional, List, Tuple
+from typing import Dict, Optional, List, Tuple, Union
 import logging
 import asyncio
+import threading
+from collections import OrderedDict
+from .spatial_filter import SpatialFilter
+from .resampling import PolyphaseResampler
+from .band_power import get_band_power_engine
 
 logger = logging.getLogger(__name__)
 
 @dataclass
 class SignalConfig:
     """Configurações para processamento de sinais"""
-    sfreq: float = 128.0
+    sfreq: float = 128.0  # taxa de análise
+    input_sfreq: Optional[float] = None  # taxa do dispositivo (None = igual a sfreq)
     notch_freq: float = 60.0
     bandpass_low: float = 0.5
     bandpass_high: float = 45.0
@@ -25,6 +31,11 @@ class SignalConfig:
         'AF3', 'F7', 'F3', 'FC5', 'T7', 'P7', 'O1',
         'O2', 'P8', 'T8', 'FC6', 'F4', 'F8', 'AF4'
     ])
+    dtype: str = 'float64'  # 'float32' reduz memória e acelera FFTs/matmuls
+    reference: Optional[Union[str, List[str]]] = 'average'  # CAR, canais de referência ou None
+    bad_channels: List[str] = field(default_factory=list)  # canais interpolados
+    montage: Optional[Dict[str, Tuple[float, float, float]]] = None  # posições 3D dos canais
+    max_streams: int = 64  # fluxos com estado de reamostragem mantido
     
 class EEGProcessor:
     def __init__(self, config: Optional[SignalConfig] = None):
@@ -35,7 +46,71 @@ class EEGProcessor:
             config: Configurações do processador
         """
         self.config = config or SignalConfig()
+        self.dtype = np.dtype(self.config.dtype)
         self._init_filters()
+        self.spatial_filter = SpatialFilter(
+            self.config.channels,
+            reference=self.config.reference,
+            bad_channels=self.config.bad_channels,
+            montage=self.config.montage,
+            dtype=self.config.dtype
+        )
+        
+        # Decimação do dispositivo para a taxa de análise. O histórico do
+        # filtro é de cada fluxo (headset/sessão): cada um recebe uma cópia
+        # deste reamostrador, e o menos recente é descartado além de
+        # max_streams
+        self.resampler = None
+        if self.config.input_sfreq and self.config.input_sfreq != self.config.sfreq:
+            self.resampler = PolyphaseResampler(
+                self.config.input_sfreq,
+                self.config.sfreq,
+                dtype=self.config.dtype
+            )
+        self._streams: OrderedDict = OrderedDict()
+        self._streams_lock = threading.Lock()
+        
+    @property
+    def input_window_size(self) -> int:
+        """Tamanho da janela na taxa do dispositivo"""
+        if self.resampler is None:
+            return self.config.window_size
+        return int(round(self.config.window_size * self.config.input_sfreq / self.config.sfreq))
+    
+    def reset(self, stream: Optional[str] = None):
+        """Descarta o estado entre blocos do fluxo (início ou fim do fluxo)"""
+        if stream is None:
+            return  # blocos sem fluxo não guardam estado
+        with self._streams_lock:
+            self._streams.pop(stream, None)
+    
+    def stream_resampler(self, stream: Optional[str] = None) -> Optional[PolyphaseResampler]:
+        """
+        Reamostrador do fluxo, criado no primeiro bloco (None sem decimação)
+        
+        Sem fluxo (stream None), cada bloco recebe um reamostrador novo:
+        não há histórico entre blocos, então blocos de origens diferentes
+        nunca se misturam (ao custo do transiente do filtro em cada bloco).
+        """
+        if self.resampler is None:
+            return None
+        if stream is None:
+            return self.resampler.copy()
+        with self._streams_lock:
+            resampler = self._streams.get(stream)
+            if resampler is None:
+                resampler = self._streams[stream] = self.resampler.copy()
+                if len(self._streams) > self.config.max_streams:
+                    self._streams.popitem(last=False)
+            else:
+                self._streams.move_to_end(stream)
+            return resampler
+        
+    def resample(self, data: np.ndarray, stream: Optional[str] = None) -> np.ndarray:
+        """Decima um bloco para a taxa de análise com o estado do fluxo"""
+        data = np.asarray(data, dtype=self.dtype)
+        resampler = self.stream_resampler(stream)
+        return data if resampler is None else resampler.process(data)
         
     def _init_filters(self):
         """Inicializa filtros"""
@@ -56,6 +131,17 @@ class EEGProcessor:
             btype='band'
         )
         
+        # Seções de segunda ordem: estáveis também em float32, onde os
+        # coeficientes b/a de ordem 8 perdem precisão
+        self.notch_sos = signal.tf2sos(
+            self.notch_b, self.notch_a
+        ).astype(self.dtype)
+        self.bandpass_sos = signal.butter(
+            4, [low, high],
+            btype='band',
+            output='sos'
+        ).astype(self.dtype)
+        
         # Filtros para bandas específicas
         self.band_filters = {}
         for band, (low, high) in {
@@ -72,39 +158,36 @@ class EEGProcessor:
             )
             self.band_filters[band] = (b, a)
     
-    async def process_async(self, data: np.ndarray) -> np.ndarray:
+    async def process_async(
+        self,
+        data: np.ndarray,
+        channel_mask: Optional[np.ndarray] = None,
+        stream: Optional[str] = None
+    ) -> np.ndarray:
         """
         Versão assíncrona do processamento completo
         
         Args:
             data: Array com sinais EEG
+            channel_mask: Máscara dos canais válidos; canais ausentes são
+                excluídos da referência e da filtragem e retornam zerados
+            stream: Fluxo de origem, com estado de reamostragem próprio
             
         Returns:
             Array com sinais processados
         """
         try:
-            # Remove média em paralelo
-            data = await asyncio.to_thread(
-                lambda x: x - np.mean(x, axis=1, keepdims=True),
-                data
-            )
-            
-            # Aplica filtros
-            filtered = await asyncio.to_thread(
-                self.apply_filters,
-                data
-            )
-            
-            # Remove artefatos
-            clean = await asyncio.to_thread(
-                self.remove_artifacts,
-                filtered
-            )
+            # Decima para a taxa de análise
+            if self.resampler is not None:
+                data = await asyncio.to_thread(self.resample, data, stream)
+            else:
+                data = np.asarray(data, dtype=self.dtype)
             
-            # Aplica CAR
+            # Remove DC, filtra, remove artefatos e aplica o filtro espacial
             processed = await asyncio.to_thread(
-                self.apply_car,
-                clean
+                self._filter_pipeline,
+                data,
+                channel_mask
             )
             
             return processed
@@ -123,26 +206,73 @@ class EEGProcessor:
         Returns:
             Array com sinais filtrados
         """
-        filtered = data.copy()
+        filtered = np.asarray(data, dtype=self.dtype)
         
         # Aplica filtro notch
-        filtered = signal.filtfilt(
-            self.notch_b,
-            self.notch_a,
+        filtered = signal.sosfiltfilt(
+            self.notch_sos,
             filtered,
             axis=1
         )
         
         # Aplica filtro passa-banda
-        filtered = signal.filtfilt(
-            self.bandpass_b,
-            self.bandpass_a,
+        filtered = signal.sosfiltfilt(
+            self.bandpass_sos,
             filtered,
             axis=1
         )
         
         return filtered
     
+    def apply_spatial_filter(
+        self,
+        data: np.ndarray,
+        channel_mask: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Aplica o filtro espacial pré-compilado (remoção de DC, interpolação
+        de canais ruins e re-referência)
+        
+        Args:
+            data: Array com sinais EEG (channels x samples)
+            channel_mask: Máscara dos canais válidos (None = todos)
+            
+        Returns:
+            Array com sinais re-referenciados
+        """
+        return self.spatial_filter.apply(data, channel_mask=channel_mask)
+    
+    def set_bad_channels(self, bad_channels: List[str]) -> bool:
+        """
+        Define canais ruins a serem interpolados
+        
+        Returns:
+            True se a matriz espacial foi recompilada
+        """
+        self.config.bad_channels = list(bad_channels)
+        return self.spatial_filter.set_bad_channels(bad_channels)
+    
+    def _filter_pipeline(
+        self,
+        data: np.ndarray,
+        channel_mask: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Remove DC, aplica filtros temporais, remove artefatos e, por fim,
+        interpolação de canais ruins e CAR (matriz espacial pré-compilada)
+        
+        Canais ausentes são zerados e ficam fora da filtragem e da referência.
+        """
+        valid = slice(None) if channel_mask is None or np.all(channel_mask) else channel_mask
+        centered = np.zeros_like(data)
+        centered[valid] = data[valid] - np.mean(data[valid], axis=1, keepdims=True)
+        
+        filtered = np.zeros_like(centered)
+        filtered[valid] = self.apply_filters(centered[valid])
+        
+        clean = self.remove_artifacts(filtered)
+        return self.spatial_filter.apply(clean, channel_mask=channel_mask, center=False)
+    
     def remove_artifacts(self, data: np.ndarray) -> np.ndarray:
         """
         Remove artefatos do sinal
@@ -379,22 +509,28 @@ class EEGProcessor:
         # Usa MAD (Median Absolute Deviation) para estimativa robusta
         return np.median(np.abs(detail_coeffs - np.median(detail_coeffs))) / 0.6745
     
-    async def process(self, data: np.ndarray) -> np.ndarray:
-        """Versão síncrona do processamento"""
+    async def process(
+        self,
+        data: np.ndarray,
+        channel_mask: Optional[np.ndarray] = None,
+        stream: Optional[str] = None
+    ) -> np.ndarray:
+        """Processamento completo executado no próprio event loop"""
+        return self.process_sync(data, channel_mask, stream)
+    
+    def process_sync(
+        self,
+        data: np.ndarray,
+        channel_mask: Optional[np.ndarray] = None,
+        stream: Optional[str] = None
+    ) -> np.ndarray:
+        """Versão síncrona do processamento (para threads e processos worker)"""
         try:
-            # Remove média
-            data = data - np.mean(data, axis=1, keepdims=True)
-            
-            # Aplica filtros
-            filtered = self.apply_filters(data)
-            
-            # Remove artefatos
-            clean = self.remove_artifacts(filtered)
-            
-            # Aplica CAR
-            processed = self.apply_car(clean)
+            # Decima para a taxa de análise
+            data = self.resample(data, stream)
             
-            return processed
+            # Remove DC, filtra, remove artefatos e aplica o filtro espacial
+            return self._filter_pipeline(data, channel_mask)
         except Exception as e:
             logger.error(f"Erro no processamento: {str(e)}")
             raise
@@ -417,27 +553,15 @@ class EEGProcessor:
         # Converte NaN/Inf para números
         data = np.nan_to_num(data)
         
-        # Calcula PSD
-        nperseg = min(64, data.shape[1])
-        freqs, psd = signal.welch(data, fs=self.config.sfreq, nperseg=nperseg)
+        # PSD e projeção nas bandas (média entre canais)
+        engine = get_band_power_engine(self.config.sfreq, data.shape[1], 64, self.config.dtype)
+        band_powers = engine.band_powers(data).absolute.mean(axis=0)
         
-        # Calcula poder médio para cada banda
-        powers = {}
-        for band, (low, high) in {
-            'delta': (0.5, 4),
-            'theta': (4, 8),
-            'alpha': (8, 13),
-            'beta': (13, 30),
-            'gamma': (30, 45)
-        }.items():
-            mask = (freqs >= low) & (freqs <= high)
-            if np.any(mask):
-                # Média do PSD na banda de frequência
-                band_power = np.mean(psd[:, mask])
-                # Normaliza e converte para float
-                powers[band] = float(np.log1p(band_power))
-            else:
-                powers[band] = 0.0
+        # Normaliza e converte para float
+        powers = {
+            band: 0.0 if empty else float(np.log1p(power))
+            for band, power, empty in zip(engine.bands, band_powers, engine.empty_bands)
+        }
                 
         # Normaliza para soma = 1
         total = sum(powers.values()) + 1e-10
@@ -469,23 +593,31 @@ class EEGProcessor:
             logger.error(f"Erro na verificação de ruído: {str(e)}")
             return False
 
-    async def compute_connectivity(self, data: np.ndarray, method: str = 'plv') -> np.ndarray:
+    async def compute_connectivity(
+        self,
+        data: np.ndarray,
+        method: str = 'plv',
+        channel_mask: Optional[np.ndarray] = None
+    ) -> np.ndarray:
         """
         Calcula conectividade entre canais
         
         Args:
             data: Array com sinais EEG (channels x samples)
             method: Método de conectividade ('plv', 'coherence', ou 'pli')
+            channel_mask: Máscara dos canais válidos; pares com canais
+                ausentes não são calculados e ficam zerados
             
         Returns:
             Matriz de conectividade (channels x channels)
         """
         try:
             n_channels = data.shape[0]
-            connectivity = np.zeros((n_channels, n_channels))
+            connectivity = np.zeros((n_channels, n_channels), dtype=self.dtype)
+            valid = list(range(n_channels)) if channel_mask is None else list(np.flatnonzero(channel_mask))
             
-            for i in range(n_channels):
-                for j in range(i+1, n_channels):
+            for pos, i in enumerate(valid):
+                for j in valid[pos+1:]:
                     if method == 'plv':
                         # Phase Locking Value
                         analytic1 = signal.hilbert(data[i])
@@ -0,0 +1,267 @@
+import numpy as np
+import threading
+import logging
+from scipy.special import eval_legendre
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Posições (vetores unitários na esfera da cabeça) dos canais do headset
+# padrão, derivadas do sistema 10-20
+DEFAULT_MONTAGE: Dict[str, Tuple[float, float, float]] = {
+    'AF3': (-0.336, 0.910, 0.242),
+    'F7': (-0.766, 0.637, -0.085),
+    'F3': (-0.522, 0.713, 0.468),
+    'FC5': (-0.866, 0.391, 0.311),
+    'T7': (-0.998, 0.006, -0.068),
+    'P7': (-0.789, -0.614, 0.012),
+    'O1': (-0.297, -0.947, 0.122),
+    'O2': (0.289, -0.949, 0.123),
+    'P8': (0.788, -0.616, 0.011),
+    'T8': (0.997, 0.018, -0.070),
+    'FC6': (0.864, 0.400, 0.307),
+    'F4': (0.522, 0.723, 0.453),
+    'F8': (0.762, 0.642, -0.089),
+    'AF4': (0.337, 0.909, 0.246),
+}
+
+class SpatialFilter:
+    """
+    Filtro espacial pré-compilado
+
+    Combina interpolação de canais ruins (splines esféricas) e
+    re-referenciamento (CAR ou canais de referência) em uma única
+    matriz C x C, aplicada com uma única multiplicação.
+    Canais ausentes (máscara) são excluídos da referência e zerados; a
+    matriz de cada conjunto de canais excluídos é compilada uma única vez.
+    """
+
+    MAX_CACHED_MATRICES = 32
+
+    def __init__(
+        self,
+        channels: List[str],
+        reference: Optional[Union[str, List[str]]] = 'average',
+        bad_channels: Optional[Sequence[str]] = None,
+        montage: Optional[Dict[str, Tuple[float, float, float]]] = None,
+        dtype: str = 'float64'
+    ):
+        """
+        Inicializa o filtro espacial
+
+        Args:
+            channels: Nomes dos canais, na ordem das linhas dos dados
+            reference: 'average' (CAR), lista de canais de referência ou None
+            bad_channels: Canais a serem interpolados a partir dos vizinhos
+            montage: Posições 3D dos canais (usa DEFAULT_MONTAGE se None)
+            dtype: Precisão da matriz e do buffer de saída
+        """
+        self.channels = list(channels)
+        self.dtype = np.dtype(dtype)
+        self._reference = reference
+        self._bad_channels = frozenset(bad_channels or [])
+        self._montage = montage
+        self._buffers = threading.local()
+        self._matrices: Dict[frozenset, np.ndarray] = {}
+        self._validate()
+        self.matrix = self.matrix_for()
+
+    @property
+    def bad_channels(self) -> frozenset:
+        return self._bad_channels
+
+    def set_bad_channels(self, bad_channels: Sequence[str]) -> bool:
+        """
+        Atualiza os canais ruins, recompilando a matriz apenas se mudarem
+
+        Returns:
+            True se a matriz foi recompilada
+        """
+        bad_channels = frozenset(bad_channels)
+        if bad_channels == self._bad_channels:
+            return False
+        self._bad_channels = bad_channels
+        self._validate()
+        self._matrices.clear()
+        self.matrix = self.matrix_for()
+        return True
+
+    def set_montage(
+        self,
+        montage: Optional[Dict[str, Tuple[float, float, float]]],
+        reference: Optional[Union[str, List[str]]] = 'average'
+    ) -> None:
+        """Atualiza montagem/referência e recompila a matriz"""
+        self._montage = montage
+        self._reference = reference
+        self._validate()
+        self._matrices.clear()
+        self.matrix = self.matrix_for()
+
+    def matrix_for(self, excluded: frozenset = frozenset()) -> np.ndarray:
+        """
+        Retorna a matriz compilada para um conjunto de canais excluídos
+
+        Args:
+            excluded: Canais ausentes, removidos da referência e zerados
+        """
+        matrix = self._matrices.get(excluded)
+        if matrix is None:
+            if len(self._matrices) >= self.MAX_CACHED_MATRICES:
+                self._matrices = {frozenset(): self.matrix}
+            matrix = self._build_matrix(excluded)
+            self._matrices[excluded] = matrix
+        return matrix
+
+    def apply(
+        self,
+        data: np.ndarray,
+        out: Optional[np.ndarray] = None,
+        channel_mask: Optional[np.ndarray] = None,
+        center: bool = True
+    ) -> np.ndarray:
+        """
+        Remove o nível DC de cada canal e aplica o filtro espacial
+
+        A remoção da média é feita antes da multiplicação (preserva precisão
+        em float32 com offsets DC altos) em um buffer interno reutilizado
+        pela thread, e a matriz é aplicada com uma única multiplicação no
+        array de saída.
+
+        Args:
+            data: Array com sinais EEG (channels x samples)
+            out: Array de saída opcional (por padrão, um novo array)
+            channel_mask: Máscara booleana dos canais válidos (None = todos)
+            center: Remove a média de cada canal antes da matriz
+
+        Returns:
+            Array com sinais filtrados (channels x samples)
+        """
+        if data.shape[0] != len(self.channels):
+            raise ValueError(
+                f"Número de canais ({data.shape[0]}) não corresponde à montagem ({len(self.channels)})"
+            )
+
+        matrix = self.matrix
+        if channel_mask is not None and not np.all(channel_mask):
+            matrix = self.matrix_for(frozenset(
+                ch for ch, valid in zip(self.channels, channel_mask) if not valid
+            ))
+
+        if out is None:
+            out = np.empty(data.shape, dtype=self.dtype)
+        if center:
+            centered = self._get_buffer('centered', data.shape)
+            np.subtract(data, np.mean(data, axis=1, keepdims=True), out=centered)
+            data = centered
+        np.matmul(matrix, data.astype(self.dtype, copy=False), out=out)
+        return out
+
+    def _get_buffer(self, name: str, shape: Tuple[int, int]) -> np.ndarray:
+        """Retorna um buffer da thread atual, realocando se o shape mudar"""
+        buffer = getattr(self._buffers, name, None)
+        if buffer is None or buffer.shape != shape:
+            buffer = np.empty(shape, dtype=self.dtype)
+            setattr(self._buffers, name, buffer)
+        return buffer
+
+    def _validate(self):
+        """Valida canais ruins e de referência"""
+        unknown = self._bad_channels - set(self.channels)
+        if unknown:
+            raise ValueError(f"Canais ruins desconhecidos: {sorted(unknown)}")
+
+        if self._reference not in (None, 'average'):
+            unknown = set(self._reference) - set(self.channels)
+            if unknown:
+                raise ValueError(f"Canais de referência desconhecidos: {sorted(unknown)}")
+
+    def _build_matrix(self, excluded: frozenset = frozenset()) -> np.ndarray:
+        """Compila interpolação e re-referência em uma matriz C x C"""
+        n_channels = len(self.channels)
+        active_idx = [i for i, ch in enumerate(self.channels) if ch not in excluded]
+        excluded_idx = [i for i, ch in enumerate(self.channels) if ch in excluded]
+        if not active_idx:
+            raise ValueError("Todos os canais estão excluídos")
+
+        # Interpolação: identidade nos canais bons, splines nos ruins
+        interpolation = np.eye(n_channels)
+        interpolation[excluded_idx] = 0.0
+        bad_idx = [i for i in active_idx if self.channels[i] in self._bad_channels]
+        if bad_idx:
+            good_idx = [i for i in active_idx if self.channels[i] not in self._bad_channels]
+            if not good_idx:
+                raise ValueError("Não há canais bons para interpolação")
+
+            positions = self._channel_positions()
+            weights = _spherical_spline_matrix(positions[good_idx], positions[bad_idx])
+            interpolation[bad_idx] = 0.0
+            interpolation[np.ix_(bad_idx, good_idx)] = weights
+
+        # Re-referência: x - média dos canais de referência
+        reference = np.eye(n_channels)
+        if self._reference == 'average':
+            ref_idx = active_idx
+        elif self._reference is not None:
+            ref_idx = [self.channels.index(ch) for ch in self._reference if ch not in excluded]
+            if not ref_idx:
+                raise ValueError("Todos os canais de referência estão excluídos")
+        else:
+            ref_idx = []
+        if ref_idx:
+            reference[:, ref_idx] -= 1.0 / len(ref_idx)
+        reference[excluded_idx] = 0.0
+
+        logger.debug(
+            f"Matriz espacial compilada (ruins={sorted(self._bad_channels)}, "
+            f"excluídos={sorted(excluded)}, referência={self._reference})"
+        )
+        return (reference @ interpolation).astype(self.dtype)
+
+    def _channel_positions(self) -> np.ndarray:
+        """Retorna posições dos canais projetadas na esfera unitária"""
+        montage = self._montage or DEFAULT_MONTAGE
+        missing = [ch for ch in self.channels if ch not in montage]
+        if missing:
+            raise ValueError(f"Canais sem posição na montagem: {missing}")
+
+        positions = np.array([montage[ch] for ch in self.channels], dtype=np.float64)
+        return positions / np.linalg.norm(positions, axis=1, keepdims=True)
+
+def _legendre_g(cosang: np.ndarray, m: int = 4, n_terms: int = 7) -> np.ndarray:
+    """Função G das splines esféricas (Perrin et al., 1989)"""
+    cosang = np.clip(cosang, -1.0, 1.0)
+    g = np.zeros_like(cosang)
+    for n in range(1, n_terms + 1):
+        g += (2 * n + 1) / (n * (n + 1)) ** m * eval_legendre(n, cosang)
+    return g / (4 * np.pi)
+
+def _spherical_spline_matrix(
+    pos_from: np.ndarray,
+    pos_to: np.ndarray,
+    alpha: float = 1e-5
+) -> np.ndarray:
+    """
+    Calcula pesos de interpolação por splines esféricas
+
+    Args:
+        pos_from: Posições unitárias dos canais bons (n_from x 3)
+        pos_to: Posições unitárias dos canais a interpolar (n_to x 3)
+        alpha: Regularização da diagonal
+
+    Returns:
+        Matriz de pesos (n_to x n_from)
+    """
+    n_from = len(pos_from)
+    g_from = _legendre_g(pos_from @ pos_from.T)
+    g_from.flat[::n_from + 1] += alpha
+    g_to_from = _legendre_g(pos_to @ pos_from.T)
+
+    system = np.zeros((n_from + 1, n_from + 1))
+    system[:n_from, :n_from] = g_from
+    system[:n_from, -1] = 1.0
+    system[-1, :n_from] = 1.0
+    system_inv = np.linalg.pinv(system)
+
+    design = np.hstack([g_to_from, np.ones((len(pos_to), 1))])
+    return design @ system_inv[:, :n_from]
@@ -0,0 +1,262 @@
+import numpy as np
+import pandas as pd
+import time
+import queue
+import asyncio
+import logging
+import threading
+from dataclasses import dataclass
+from numpy.lib.stride_tricks import sliding_window_view
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Union
+from .data_loader import DEFAULT_CHANNELS, resolve_columns
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class Window:
+    """Janela de sinal decodificada de uma gravação"""
+    source: str
+    start: int  # índice da primeira amostra na gravação
+    data: np.ndarray  # (channels x samples)
+    channels: List[str]
+    sfreq: float
+    label: Optional[int] = None
+
+    def to_payload(self, timestamp: Optional[float] = None) -> Dict:
+        """Formato aceito por /eeg/process e GlobalState.process_data"""
+        return {
+            'timestamp': time.time() if timestamp is None else timestamp,
+            'channels': {ch: row.tolist() for ch, row in zip(self.channels, self.data)}
+        }
+
+class CSVRecordingSource:
+    """
+    Gravação CSV lida em blocos de linhas
+
+    Apenas chunk_rows linhas (mais a sobreposição entre janelas) ficam
+    em memória; colunas são mapeadas pelo nome dos canais.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        channels: Optional[List[str]] = None,
+        sfreq: float = 128.0,
+        label_column: Optional[str] = 'class',
+        chunk_rows: int = 4096
+    ):
+        self.path = Path(path)
+        self.channels = list(channels or DEFAULT_CHANNELS)
+        self.sfreq = sfreq
+        self.chunk_rows = chunk_rows
+
+        header = pd.read_csv(self.path, nrows=0).columns
+        self.columns = resolve_columns(header, self.channels)
+        self.label_column = label_column if label_column in header else None
+
+    def windows(self, window: int, hop: int) -> Iterator[Window]:
+        """Gera janelas (channels x window) com passo hop"""
+        usecols = self.columns + ([self.label_column] if self.label_column else [])
+        tail = np.empty((len(usecols), 0))
+        offset = 0  # índice da primeira amostra de tail na gravação
+        next_start = 0
+
+        for chunk in pd.read_csv(self.path, usecols=usecols, chunksize=self.chunk_rows):
+            block = chunk[usecols].to_numpy(dtype=np.float64).T
+            buffer = np.concatenate([tail, block], axis=1)
+
+            n_windows = (buffer.shape[1] - (next_start - offset) - window) // hop + 1
+            if n_windows > 0:
+                first = next_start - offset
+                views = sliding_window_view(buffer, window, axis=1)[:, first::hop][:, :n_windows]
+                for i in range(n_windows):
+                    yield self._make_window(next_start + i * hop, views[:, i])
+                next_start += n_windows * hop
+
+            # Mantém apenas as amostras ainda necessárias
+            keep_from = next_start - offset
+            tail = buffer[:, keep_from:]
+            offset = next_start
+
+    def _make_window(self, start: int, values: np.ndarray) -> Window:
+        n_channels = len(self.columns)
+        label = None
+        if self.label_column:
+            label = int(values[n_channels].mean() >= 0.5)
+        return Window(
+            source=str(self.path),
+            start=start,
+            data=np.ascontiguousarray(values[:n_channels]),
+            channels=self.channels,
+            sfreq=self.sfreq,
+            label=label
+        )
+
+# Leitores por extensão de arquivo (edf_reader registra '.edf' e '.bdf')
+SOURCE_READERS: Dict[str, Callable[..., object]] = {
+    '.csv': CSVRecordingSource
+}
+
+def discover_sources(paths: Sequence[Union[str, Path]]) -> List[Path]:
+    """Expande diretórios em arquivos de gravação suportados (ordem estável)"""
+    found = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            found.extend(sorted(
+                p for p in path.rglob('*') if p.suffix.lower() in SOURCE_READERS
+            ))
+        elif path.exists():
+            found.append(path)
+        else:
+            raise FileNotFoundError(f"Fonte não encontrada: {path}")
+    return found
+
+def open_source(path: Union[str, Path], channels: Optional[List[str]] = None, **kwargs):
+    """Abre uma gravação com o leitor da sua extensão"""
+    path = Path(path)
+    reader = SOURCE_READERS.get(path.suffix.lower())
+    if reader is None:
+        raise ValueError(f"Formato não suportado: {path.suffix}")
+    return reader(path, channels=channels, **kwargs)
+
+class PrefetchingLoader:
+    """
+    Carregador assíncrono de janelas de várias gravações
+
+    Uma thread de fundo lê e decodifica as próximas janelas e as coloca
+    em uma fila limitada; quando o consumidor é mais lento, a fila enche
+    e a thread bloqueia (backpressure), limitando a memória a
+    max_prefetch janelas. O consumo é feito com `async for`, sem I/O no
+    event loop.
+    """
+
+    def __init__(
+        self,
+        sources: Sequence[Union[str, Path, object]],
+        window: int = 128,
+        hop: Optional[int] = None,
+        channels: Optional[List[str]] = None,
+        max_prefetch: int = 32,
+        repeat: bool = False
+    ):
+        """
+        Inicializa o carregador
+
+        Args:
+            sources: Arquivos, diretórios ou objetos com windows(window, hop)
+            window: Amostras por janela
+            hop: Passo entre janelas (None = window, sem sobreposição)
+            channels: Canais na ordem de saída
+            max_prefetch: Janelas decodificadas aguardando consumo
+            repeat: Recomeça das primeiras fontes ao terminar
+        """
+        paths = [s for s in sources if isinstance(s, (str, Path))]
+        self.sources = [s for s in sources if not isinstance(s, (str, Path))]
+        self.sources += discover_sources(paths)
+        if not self.sources:
+            raise ValueError("Nenhuma fonte de dados")
+
+        self.window = window
+        self.hop = hop or window
+        self.channels = channels
+        self.repeat = repeat
+        self.max_prefetch = max_prefetch
+        self._queue: queue.Queue = queue.Queue(maxsize=max_prefetch)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.windows_produced = 0
+        self.producer_wait = 0.0  # segundos bloqueados por backpressure
+
+    def start(self):
+        """Inicia a thread de leitura"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._produce, name='eeg-prefetch', daemon=True)
+            self._thread.start()
+
+    def close(self):
+        """Interrompe a leitura e libera a thread"""
+        self._stop.set()
+        # Desbloqueia a thread caso esteja esperando espaço na fila
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    async def get(self) -> Optional[Window]:
+        """Próxima janela, ou None quando as fontes terminam"""
+        self.start()
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                # Espera sem bloquear o event loop
+                item = await asyncio.to_thread(self._blocking_get)
+                if item is _Empty:
+                    continue
+            if isinstance(item, Exception):
+                raise item
+            return None if item is _End else item
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Window:
+        item = await self.get()
+        if item is None:
+            raise StopAsyncIteration
+        return item
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+    @property
+    def queued(self) -> int:
+        return self._queue.qsize()
+
+    def _blocking_get(self):
+        try:
+            return self._queue.get(timeout=0.5)
+        except queue.Empty:
+            return _End if self._stop.is_set() else _Empty
+
+    def _put(self, item) -> bool:
+        """Coloca um item na fila, bloqueando enquanto estiver cheia"""
+        start = time.perf_counter()
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                self.producer_wait += time.perf_counter() - start
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self):
+        try:
+            while not self._stop.is_set():
+                for source in self.sources:
+                    reader = source if not isinstance(source, Path) else open_source(source, self.channels)
+                    for window in reader.windows(self.window, self.hop):
+                        if not self._put(window):
+                            return
+                        self.windows_produced += 1
+                if not self.repeat:
+                    break
+            self._put(_End)
+        except Exception as e:
+            logger.error(f"Erro na leitura antecipada: {str(e)}")
+            self._put(e)
+
+# Sentinelas da fila
+_End = object()
+_Empty = object()
@@ -0,0 +1,247 @@
+import numpy as np
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from scipy import signal
+from typing import Dict, Iterator, List, Optional, Sequence, Union
+from .data_loader import DEFAULT_CHANNELS
+from .streaming import Window
+from .session_archive import is_session, open_session
+from .session_recorder import SessionRecording
+
+logger = logging.getLogger(__name__)
+
+# Prefixo de fontes sintéticas em REPLAY_SOURCES (ex.: 'synthetic:7')
+SYNTHETIC_SCHEME = 'synthetic'
+
+# Filtro rosa (1/f) de 3 polos (aproximação de Paul Kellet)
+_PINK_B = np.array([0.049922035, -0.095993537, 0.050612699, -0.004408786])
+_PINK_A = np.array([1.0, -2.494956002, 2.017265875, -0.522189400])
+
+@dataclass
+class SyntheticConfig:
+    """Configurações do gerador de EEG sintético"""
+    channels: List[str] = field(default_factory=lambda: list(DEFAULT_CHANNELS))
+    sfreq: float = 128.0
+    dc_offset: float = 4200.0  # nível DC típico do Emotiv (µV)
+    background_uv: float = 10.0  # desvio do fundo 1/f
+    alpha_uv: float = 20.0  # amplitude dos surtos alfa (canais posteriores)
+    alpha_freq: float = 10.0
+    alpha_burst_rate: float = 0.3  # surtos por segundo
+    alpha_burst_duration: float = 1.5  # segundos
+    blink_uv: float = 150.0  # amplitude das piscadas (canais frontais)
+    blink_rate: float = 0.25  # piscadas por segundo
+    line_freq: float = 50.0
+    line_uv: float = 2.0
+    dropout_rate: float = 0.01  # perdas de contato por canal por segundo
+    dropout_duration: float = 2.0  # segundos
+    duration: Optional[float] = None  # segundos por headset (None = infinito)
+    seed: int = 0
+
+class SyntheticHeadset:
+    """
+    Headset virtual com sinal contínuo entre blocos
+
+    Soma fundo 1/f (filtro rosa com estado), surtos alfa nos canais
+    posteriores, piscadas nos canais frontais, ruído de rede e perdas
+    de contato (canal zerado). Eventos são sorteados em tempo absoluto,
+    então gerar em blocos de qualquer tamanho produz o mesmo sinal.
+    """
+
+    def __init__(self, config: Optional[SyntheticConfig] = None, headset_id: int = 0):
+        """
+        Inicializa o headset
+
+        Args:
+            config: Configurações do gerador
+            headset_id: Identificador (também desloca a semente)
+        """
+        self.config = config or SyntheticConfig()
+        self.headset_id = headset_id
+        self.channels = list(self.config.channels)
+        n_channels = len(self.channels)
+
+        # Fluxos aleatórios independentes para ruído e para cada tipo de evento
+        streams = np.random.SeedSequence([self.config.seed, headset_id]).spawn(3 + n_channels)
+        self.rng = np.random.default_rng(streams[0])
+
+        # Pesos espaciais por região do escalpo
+        names = [ch.upper() for ch in self.channels]
+        self.alpha_weights = np.array([1.0 if ch[0] in 'OP' else 0.2 for ch in names])
+        self.blink_weights = np.array([
+            1.0 if ch.startswith(('FP', 'AF')) else 0.6 if ch in ('F7', 'F8', 'F3', 'F4') else 0.05
+            for ch in names
+        ])
+        # Offsets e ganhos ligeiramente diferentes por canal
+        self.offsets = self.config.dc_offset + self.rng.normal(0, 150, n_channels)
+        self.gains = self.rng.uniform(0.8, 1.2, n_channels)
+
+        # Estado do filtro rosa, normalizado para desvio unitário
+        self._pink_zi = np.zeros((n_channels, len(_PINK_A) - 1))
+        impulse = np.zeros(4096)
+        impulse[0] = 1.0
+        self._pink_gain = 1.0 / np.sqrt(np.sum(signal.lfilter(_PINK_B, _PINK_A, impulse) ** 2))
+
+        self.position = 0  # amostras já geradas
+        self._alpha_events = _EventStream(np.random.default_rng(streams[1]), self.config.alpha_burst_rate)
+        self._blink_events = _EventStream(np.random.default_rng(streams[2]), self.config.blink_rate)
+        self._dropouts = [
+            _EventStream(np.random.default_rng(stream), self.config.dropout_rate)
+            for stream in streams[3:]
+        ]
+
+    @property
+    def finished(self) -> bool:
+        return self.config.duration is not None and self.position >= self.config.duration * self.config.sfreq
+
+    def next_block(self, n_samples: int) -> np.ndarray:
+        """
+        Gera as próximas amostras
+
+        Args:
+            n_samples: Amostras a gerar
+
+        Returns:
+            Array (channels x samples) em µV
+        """
+        cfg = self.config
+        t = (self.position + np.arange(n_samples)) / cfg.sfreq
+        n_channels = len(self.channels)
+
+        # Fundo 1/f com estado entre blocos (sorteio em ordem temporal)
+        white = self.rng.normal(0, 1, (n_samples, n_channels)).T
+        pink, self._pink_zi = signal.lfilter(_PINK_B, _PINK_A, white, axis=1, zi=self._pink_zi)
+        data = pink * (self._pink_gain * cfg.background_uv)
+
+        # Surtos alfa: envelope de Hann em cada evento
+        envelope = self._render_events(self._alpha_events, t, cfg.alpha_burst_duration, 'hann')
+        data += np.outer(self.alpha_weights, envelope * cfg.alpha_uv * np.sin(2 * np.pi * cfg.alpha_freq * t))
+
+        # Piscadas: pulsos gaussianos de ~300 ms
+        blinks = self._render_events(self._blink_events, t, 0.3, 'gaussian')
+        data += np.outer(self.blink_weights, blinks * cfg.blink_uv)
+
+        # Ruído de rede
+        data += cfg.line_uv * np.sin(2 * np.pi * cfg.line_freq * t)
+
+        data = data * self.gains[:, None] + self.offsets[:, None]
+
+        # Perdas de contato: canal zerado durante o intervalo
+        for ch, events in enumerate(self._dropouts):
+            active = self._render_events(events, t, cfg.dropout_duration, 'box') > 0
+            data[ch, active] = 0.0
+
+        self.position += n_samples
+        return data
+
+    def dropped_channels(self, block: np.ndarray) -> List[str]:
+        """Canais sem sinal em todo o bloco"""
+        return [ch for ch, row in zip(self.channels, block) if not np.any(row)]
+
+    def payload(self, n_samples: int, timestamp: float) -> Dict:
+        """
+        Próximo bloco no formato de /eeg/process
+
+        Canais em perda de contato durante todo o bloco são omitidos,
+        como faria um dispositivo real.
+        """
+        block = self.next_block(n_samples)
+        dropped = set(self.dropped_channels(block))
+        return {
+            'timestamp': timestamp,
+            'channels': {
+                ch: row.tolist() for ch, row in zip(self.channels, block) if ch not in dropped
+            }
+        }
+
+    def windows(self, window: int, hop: int) -> Iterator[Window]:
+        """Gera janelas para PrefetchingLoader (fonte possivelmente infinita)"""
+        buffer = self.next_block(window)
+        start = 0
+        while True:
+            yield Window(
+                source=f'{SYNTHETIC_SCHEME}:{self.headset_id}',
+                start=start,
+                data=buffer.copy(),
+                channels=self.channels,
+                sfreq=self.config.sfreq
+            )
+            if self.finished:
+                return
+            if hop >= window:
+                if hop > window:
+                    self.next_block(hop - window)  # descarta o intervalo entre janelas
+                buffer = self.next_block(window)
+            else:
+                buffer = np.concatenate([buffer[:, hop:], self.next_block(hop)], axis=1)
+            start += hop
+
+    def _render_events(self, events: '_EventStream', t: np.ndarray, duration: float, shape: str) -> np.ndarray:
+        """Soma os eventos que se sobrepõem ao bloco"""
+        out = np.zeros(len(t))
+        if events.rate <= 0:
+            return out
+        for onset in events.between(t[0] - duration, t[-1]):
+            phase = (t - onset) / duration
+            inside = (phase >= 0) & (phase < 1)
+            if shape == 'hann':
+                out[inside] += np.sin(np.pi * phase[inside]) ** 2
+            elif shape == 'gaussian':
+                out[inside] += np.exp(-0.5 * ((phase[inside] - 0.5) / 0.15) ** 2)
+            else:
+                out[inside] = 1.0
+        return out
+
+class _EventStream:
+    """Processo de Poisson com instantes gerados incrementalmente"""
+
+    def __init__(self, rng: np.random.Generator, rate: float):
+        self.rng = rng
+        self.rate = rate
+        self.onsets: List[float] = []
+        self._last = 0.0
+
+    def between(self, start: float, stop: float) -> List[float]:
+        """Eventos com início em [start, stop]; descarta os antigos"""
+        while self.rate > 0 and self._last <= stop:
+            self._last += self.rng.exponential(1.0 / self.rate)
+            self.onsets.append(self._last)
+        self.onsets = [o for o in self.onsets if o >= start - 60.0]
+        return [o for o in self.onsets if start <= o <= stop]
+
+class SyntheticFleet:
+    """Conjunto de headsets virtuais independentes"""
+
+    def __init__(self, n_headsets: int, config: Optional[SyntheticConfig] = None):
+        self.config = config or SyntheticConfig()
+        self.headsets = [SyntheticHeadset(self.config, i) for i in range(n_headsets)]
+
+    def __len__(self) -> int:
+        return len(self.headsets)
+
+    def __iter__(self):
+        return iter(self.headsets)
+
+def replay_sources(
+    specs: Sequence[str],
+    channels: Optional[List[str]] = None,
+    sfreq: float = 128.0
+) -> List[Union[Path, SyntheticHeadset, SessionRecording]]:
+    """
+    Converte especificações de REPLAY_SOURCES em fontes do PrefetchingLoader
+
+    'synthetic' ou 'synthetic:<semente>' criam um headset sintético;
+    diretórios de sessão gravada são reproduzidos com open_session;
+    qualquer outro valor é tratado como arquivo ou diretório.
+    """
+    sources = []
+    for spec in specs:
+        if spec == SYNTHETIC_SCHEME or spec.startswith(SYNTHETIC_SCHEME + ':'):
+            seed = int(spec.split(':', 1)[1]) if ':' in spec else 0
+            config = SyntheticConfig(channels=list(channels or DEFAULT_CHANNELS), sfreq=sfreq, seed=seed)
+            sources.append(SyntheticHeadset(config))
+        elif is_session(spec):
+            sources.append(open_session(spec))
+        else:
+            sources.append(Path(spec))
+    return sources
@@ -0,0 +1,258 @@
+import numpy as np
+import os
+import time
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from sklearn.ensemble import GradientBoostingClassifier, HistGradientBoostingClassifier
+from sklearn.linear_model import SGDClassifier
+from sklearn.preprocessing import StandardScaler
+from .signal_processor import EEGProcessor, SignalConfig
+from .feature_extractor import EEGFeatureExtractor
+
+logger = logging.getLogger(__name__)
+
+ProgressCallback = Callable[[int, int], None]
+
+# Classificadores disponíveis em BCIConfig.classifier
+CLASSIFIER_BACKENDS = {
+    'gradient_boosting': GradientBoostingClassifier,
+    'hist_gradient_boosting': HistGradientBoostingClassifier,
+    'sgd': SGDClassifier  # suporta partial_fit
+}
+
+DEFAULT_MODEL_PARAMS = {
+    'gradient_boosting': {
+        'n_estimators': 100,
+        'learning_rate': 0.1,
+        'max_depth': 3,
+        'random_state': 42
+    },
+    'hist_gradient_boosting': {
+        'max_iter': 100,
+        'learning_rate': 0.1,
+        'max_leaf_nodes': 31,
+        'random_state': 42
+    },
+    'sgd': {
+        'loss': 'log_loss',  # necessário para predict_proba
+        'alpha': 1e-4,
+        'random_state': 42
+    }
+}
+
+# Perdas do SGDClassifier que expõem predict_proba (usado na predição)
+PROBABILISTIC_SGD_LOSSES = ('log_loss', 'modified_huber')
+
+def check_model_params(backend: str, model_params: Dict[str, Any]) -> None:
+    """Rejeita parâmetros que resultariam em um classificador sem predict_proba"""
+    if backend == 'sgd':
+        loss = model_params.get('loss', 'hinge')  # padrão do SGDClassifier
+        if loss not in PROBABILISTIC_SGD_LOSSES:
+            raise ValueError(
+                f"Perda '{loss}' do SGD não fornece predict_proba (opções: {PROBABILISTIC_SGD_LOSSES})"
+            )
+
+class EpochFeaturePipeline:
+    """Processamento e extração síncronos de características por época"""
+
+    def __init__(self, sfreq: float = 128.0, dtype: str = 'float64'):
+        """
+        Inicializa o pipeline
+
+        Args:
+            sfreq: Frequência de amostragem
+            dtype: Precisão numérica do processamento
+        """
+        self.processor = EEGProcessor(SignalConfig(sfreq=sfreq, dtype=dtype))
+        self.feature_extractor = EEGFeatureExtractor(sfreq, dtype)
+
+    def features(self, epoch: np.ndarray) -> Dict[str, float]:
+        """Processa uma época e retorna o dicionário de características"""
+        processed = self.processor.process_sync(epoch)
+        return self.feature_extractor.extract(processed)
+
+    def transform(self, epochs: np.ndarray, schema: Sequence[str]) -> np.ndarray:
+        """
+        Processa um bloco de épocas e retorna a matriz de características
+
+        Args:
+            epochs: Bloco de épocas (epochs x channels x samples)
+            schema: Ordem das colunas; ausentes viram 0
+
+        Returns:
+            Matriz (epochs x features)
+        """
+        rows = np.empty((len(epochs), len(schema)), dtype=np.float64)
+        for i, epoch in enumerate(epochs):
+            features = self.features(epoch)
+            rows[i] = [features.get(name, 0.0) for name in schema]
+        return rows
+
+# Pipeline de cada processo worker, criado uma única vez no initializer
+_worker_pipeline: Optional[EpochFeaturePipeline] = None
+
+def _init_worker(sfreq: float, dtype: str):
+    global _worker_pipeline
+    _worker_pipeline = EpochFeaturePipeline(sfreq, dtype)
+
+def _transform_chunk(epochs: np.ndarray, schema: List[str]) -> np.ndarray:
+    return _worker_pipeline.transform(epochs, schema)
+
+async def extract_feature_matrix(
+    epochs: np.ndarray,
+    sfreq: float = 128.0,
+    dtype: str = 'float64',
+    schema: Optional[List[str]] = None,
+    n_jobs: int = 1,
+    chunk_size: int = 32,
+    progress_callback: Optional[ProgressCallback] = None,
+    indices: Optional[np.ndarray] = None
+) -> Tuple[np.ndarray, List[str]]:
+    """
+    Extrai a matriz de características de um conjunto de épocas
+
+    As épocas são enviadas em blocos para um pool de processos e cada
+    bloco devolve apenas suas linhas de características, escritas em uma
+    matriz pré-alocada. Os sinais processados nunca saem dos workers, e
+    no máximo 2 * n_jobs blocos ficam em trânsito, de modo que a memória
+    extra é limitada pelo tamanho do bloco (épocas podem vir de um
+    np.memmap).
+
+    Args:
+        epochs: Épocas (epochs x channels x samples)
+        sfreq: Frequência de amostragem
+        dtype: Precisão numérica do processamento
+        schema: Ordem das colunas; se None, é definida pela primeira época
+        n_jobs: Número de processos (1 = thread única, -1 = todos os núcleos)
+        chunk_size: Épocas por bloco
+        progress_callback: Chamado com (épocas concluídas, total)
+        indices: Subconjunto das épocas a extrair (None = todas)
+
+    Returns:
+        Tupla (matriz epochs x features, schema)
+    """
+    def select(start: int, stop: int) -> np.ndarray:
+        if indices is None:
+            return epochs[start:stop]
+        return epochs[indices[start:stop]]
+
+    n_epochs = len(epochs) if indices is None else len(indices)
+    if n_epochs == 0:
+        raise ValueError("Nenhuma época para extrair")
+    if n_jobs < 0:
+        n_jobs = os.cpu_count() or 1
+
+    features = None
+    first = 0
+    if schema is None:
+        # A primeira época define a ordem das colunas
+        pipeline = EpochFeaturePipeline(sfreq, dtype)
+        first_features = await asyncio.to_thread(pipeline.features, select(0, 1)[0])
+        schema = list(first_features)
+        features = np.empty((n_epochs, len(schema)), dtype=np.float64)
+        features[0] = [first_features[name] for name in schema]
+        first = 1
+    else:
+        features = np.empty((n_epochs, len(schema)), dtype=np.float64)
+
+    chunks = [
+        (start, min(start + chunk_size, n_epochs))
+        for start in range(first, n_epochs, chunk_size)
+    ]
+    progress = _ProgressReporter(n_epochs, first, progress_callback)
+
+    if n_jobs == 1:
+        pipeline = EpochFeaturePipeline(sfreq, dtype)
+        for start, stop in chunks:
+            features[start:stop] = await asyncio.to_thread(
+                pipeline.transform, select(start, stop), schema
+            )
+            progress.update(stop - start)
+        return features, schema
+
+    loop = asyncio.get_running_loop()
+    with ProcessPoolExecutor(
+        max_workers=n_jobs,
+        initializer=_init_worker,
+        initargs=(sfreq, dtype)
+    ) as pool:
+        pending = {}
+        next_chunk = 0
+        while next_chunk < len(chunks) or pending:
+            # Mantém no máximo 2 blocos por worker em trânsito
+            while next_chunk < len(chunks) and len(pending) < 2 * n_jobs:
+                start, stop = chunks[next_chunk]
+                future = loop.run_in_executor(
+                    pool,
+                    _transform_chunk,
+                    np.ascontiguousarray(select(start, stop)),
+                    schema
+                )
+                pending[future] = (start, stop)
+                next_chunk += 1
+
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                start, stop = pending.pop(future)
+                features[start:stop] = future.result()
+                progress.update(stop - start)
+
+    return features, schema
+
+def make_classifier(backend: str, model_params: Dict[str, Any]):
+    """Cria um classificador não treinado do backend escolhido"""
+    if backend not in CLASSIFIER_BACKENDS:
+        raise ValueError(
+            f"Classificador desconhecido: {backend} (opções: {list(CLASSIFIER_BACKENDS)})"
+        )
+    check_model_params(backend, model_params)
+    return CLASSIFIER_BACKENDS[backend](**model_params)
+
+def fit_classifier(
+    features: np.ndarray,
+    y: np.ndarray,
+    model_params: Dict[str, Any],
+    backend: str = 'gradient_boosting'
+) -> Tuple[StandardScaler, Any, float]:
+    """
+    Ajusta scaler e classificador sobre a matriz de características
+
+    Função de módulo para poder rodar em um processo separado.
+
+    Returns:
+        Tupla (scaler, classificador, acurácia no treino)
+    """
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(features)
+    classifier = make_classifier(backend, model_params)
+    classifier.fit(X_scaled, y)
+    return scaler, classifier, float(classifier.score(X_scaled, y))
+
+def feature_importance(classifier) -> Optional[np.ndarray]:
+    """Importância por característica (árvores) ou |coeficiente| (lineares)"""
+    if hasattr(classifier, 'feature_importances_'):
+        return classifier.feature_importances_
+    if hasattr(classifier, 'coef_'):
+        return np.abs(classifier.coef_).mean(axis=0)
+    return None
+
+class _ProgressReporter:
+    """Registra progresso e vazão da extração"""
+
+    def __init__(self, total: int, done: int, callback: Optional[ProgressCallback]):
+        self.total = total
+        self.done = done
+        self.callback = callback
+        self.start_time = time.perf_counter()
+
+    def update(self, n_done: int):
+        self.done += n_done
+        elapsed = max(time.perf_counter() - self.start_time, 1e-9)
+        logger.info(
+            f"Extração de características: {self.done}/{self.total} épocas "
+            f"({self.done / elapsed:.1f} épocas/s)"
+        )
+        if self.callback is not None:
+            self.callback(self.done, self.total)
@@ -0,0 +1,143 @@
+import numpy as np
+import logging
+from dataclasses import dataclass
+from scipy.special import expit, softmax
+from sklearn.ensemble import GradientBoostingClassifier
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class CompiledEnsemble:
+    """
+    GradientBoostingClassifier achatado em arrays NumPy contíguos
+
+    Todas as árvores ficam concatenadas em um único conjunto de nós
+    (feature, threshold, filho esquerdo, filho direito, valor). Folhas
+    apontam para si mesmas com threshold +inf, de modo que a travessia é
+    um laço de max_depth passos sobre todas as (linhas x árvores) de uma
+    vez, sem ramificações em Python por nó.
+    """
+    feature: np.ndarray  # (nós,) índice da característica testada
+    threshold: np.ndarray  # (nós,) vai à esquerda se x <= threshold
+    left: np.ndarray  # (nós,) índice global do filho esquerdo
+    right: np.ndarray  # (nós,) índice global do filho direito
+    value: np.ndarray  # (nós,) valor da folha já multiplicado pelo learning rate
+    roots: np.ndarray  # (árvores,) índice global da raiz de cada árvore
+    tree_class: np.ndarray  # (árvores,) coluna de saída de cada árvore
+    init_raw: np.ndarray  # (saídas,) predição bruta inicial
+    raw_scale: float  # binário: probabilidade = expit(raw_scale * raw), conforme a perda
+    max_depth: int
+    classes_: np.ndarray
+    n_features_in_: int
+
+    @classmethod
+    def from_sklearn(cls, classifier: GradientBoostingClassifier) -> 'CompiledEnsemble':
+        """
+        Exporta um GradientBoostingClassifier treinado
+
+        Args:
+            classifier: Classificador treinado com init constante
+                (padrão 'prior' ou 'zero') e perda 'log_loss' ou, em
+                problemas binários, 'exponential'
+
+        Returns:
+            Avaliador equivalente
+        """
+        if not isinstance(classifier, GradientBoostingClassifier):
+            raise ValueError(f"Classificador não suportado: {type(classifier).__name__}")
+        if classifier.init not in (None, 'zero'):
+            raise ValueError("Apenas init constante ('prior' ou 'zero') é suportado")
+        # Função de ligação de predict_proba de cada perda
+        n_outputs = classifier.estimators_.shape[1]
+        if classifier.loss == 'log_loss':
+            raw_scale = 1.0
+        elif classifier.loss == 'exponential' and n_outputs == 1:
+            raw_scale = 2.0
+        else:
+            raise ValueError(f"Perda não suportada: {classifier.loss}")
+
+        n_features = classifier.n_features_in_
+        # Predição inicial constante (não depende de X): decision_function
+        # menos a contribuição das árvores em um ponto qualquer
+        x0 = np.zeros((1, n_features))
+        trees_raw = np.zeros(n_outputs)
+        for stage in classifier.estimators_:
+            trees_raw += classifier.learning_rate * np.array([tree.predict(x0)[0] for tree in stage])
+        init_raw = np.reshape(classifier.decision_function(x0), n_outputs) - trees_raw
+
+        features, thresholds, lefts, rights, values = [], [], [], [], []
+        roots, tree_class = [], []
+        offset = 0
+        max_depth = 0
+        for stage in classifier.estimators_:
+            for k, estimator in enumerate(stage):
+                tree = estimator.tree_
+                n_nodes = tree.node_count
+                is_leaf = tree.children_left == -1
+                local = np.arange(n_nodes)
+
+                features.append(np.where(is_leaf, 0, tree.feature))
+                thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+                lefts.append(np.where(is_leaf, local, tree.children_left) + offset)
+                rights.append(np.where(is_leaf, local, tree.children_right) + offset)
+                values.append(tree.value[:, 0, 0] * classifier.learning_rate)
+
+                roots.append(offset)
+                tree_class.append(k)
+                max_depth = max(max_depth, tree.max_depth)
+                offset += n_nodes
+
+        ensemble = cls(
+            feature=np.ascontiguousarray(np.concatenate(features), dtype=np.intp),
+            threshold=np.ascontiguousarray(np.concatenate(thresholds), dtype=np.float64),
+            left=np.ascontiguousarray(np.concatenate(lefts), dtype=np.intp),
+            right=np.ascontiguousarray(np.concatenate(rights), dtype=np.intp),
+            value=np.ascontiguousarray(np.concatenate(values), dtype=np.float64),
+            roots=np.asarray(roots, dtype=np.intp),
+            tree_class=np.asarray(tree_class, dtype=np.intp),
+            init_raw=np.asarray(init_raw, dtype=np.float64),
+            raw_scale=raw_scale,
+            max_depth=int(max_depth),
+            classes_=np.asarray(classifier.classes_),
+            n_features_in_=int(n_features)
+        )
+        logger.info(f"Ensemble exportado: {len(roots)} árvores, {offset} nós")
+        return ensemble
+
+    def decision_function(self, X: np.ndarray) -> np.ndarray:
+        """
+        Calcula a predição bruta (log-odds) de um lote
+
+        Args:
+            X: Matriz (linhas x características)
+
+        Returns:
+            Array (linhas, saídas)
+        """
+        # As árvores do sklearn comparam em float32
+        X = np.asarray(X, dtype=np.float32).astype(np.float64)
+        n_rows = X.shape[0]
+        rows = np.arange(n_rows)[:, None]
+
+        nodes = np.broadcast_to(self.roots, (n_rows, len(self.roots))).copy()
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+
+        leaf_values = self.value[nodes]
+        raw = np.tile(self.init_raw, (n_rows, 1))
+        for k in range(len(self.init_raw)):
+            raw[:, k] += leaf_values[:, self.tree_class == k].sum(axis=1)
+        return raw
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Probabilidades por classe, como GradientBoostingClassifier.predict_proba"""
+        raw = self.decision_function(X)
+        if raw.shape[1] == 1:
+            proba = expit(self.raw_scale * raw[:, 0])
+            return np.column_stack([1.0 - proba, proba])
+        return softmax(raw, axis=1)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Classe de maior probabilidade"""
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
@@ -9,6 +9,8 @@ from .eeg_utils import (
 )
 
 from .visualization import (
+    lttb_indices,
+    minmax_envelope,
     prepare_eeg_visualization,
     prepare_band_powers_visualization,
     prepare_attention_metrics_visualization
@@ -18,6 +20,8 @@ __all__ = [
     'validate_eeg_data',
     'compute_band_power',
     'compute_coherence',
+    'lttb_indices',
+    'minmax_envelope',
     'prepare_eeg_visualization',
     'prepare_band_powers_visualization',
     'prepare_attention_metrics_visualization'
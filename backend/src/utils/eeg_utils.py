@@ -6,6 +6,7 @@ import numpy as np
 from scipy import signal
 from typing import Dict, List, Tuple
 import logging
+from ..band_power import get_band_power_engine
 
 logger = logging.getLogger(__name__)
 
@@ -35,22 +36,10 @@ async def validate_eeg_data(data: np.ndarray, sfreq: float, channel_names: List[
 async def compute_band_power(data: np.ndarray, sfreq: float) -> Dict[str, np.ndarray]:
     """Versão assíncrona do cálculo de poder nas bandas"""
     try:
-        # Ajusta nperseg para o tamanho do sinal
-        nperseg = min(256, data.shape[1])
-        freqs, psd = signal.welch(data, fs=sfreq, nperseg=nperseg)
-        
-        bands = {
-            'delta': (0.5, 4),
-            'theta': (4, 8),
-            'alpha': (8, 13),
-            'beta': (13, 30),
-            'gamma': (30, 45)
-        }
-        
-        powers = {}
-        for band_name, (low, high) in bands.items():
-            mask = (freqs >= low) & (freqs <= high)
-            powers[band_name] = np.mean(psd[:, mask], axis=1)
+        # PSD de todos os canais e projeção nas bandas
+        engine = get_band_power_engine(sfreq, data.shape[1], 256)
+        absolute = engine.band_powers(data).absolute
+        powers = {band: absolute[:, i] for i, band in enumerate(engine.bands)}
         
         return powers
         
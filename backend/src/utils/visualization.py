@@ -1,23 +1,135 @@
 """
 Utilitários para preparação de dados para visualização
 """
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 import numpy as np
 
-def prepare_eeg_visualization(data: np.ndarray, sfreq: float = 128.0) -> Dict[str, Any]:
+DECIMATION_METHODS = ('lttb', 'minmax')
+
+def lttb_indices(data: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Índices escolhidos pelo Largest-Triangle-Three-Buckets
+
+    O primeiro e o último ponto são mantidos; de cada um dos n_out - 2
+    buckets intermediários fica o ponto que forma o maior triângulo com
+    o ponto escolhido no bucket anterior e a média do bucket seguinte.
+    Os canais são processados juntos, um bucket por iteração.
+
+    Args:
+        data: Sinais (channels x samples)
+        n_out: Pontos por canal na saída (>= 3)
+
+    Returns:
+        Array de índices (channels x n_out), crescentes em cada canal
+    """
+    data = np.atleast_2d(data)
+    n_channels, n_samples = data.shape
+    if n_out >= n_samples:
+        return np.tile(np.arange(n_samples), (n_channels, 1))
+    if n_out < 3:
+        raise ValueError("LTTB requer ao menos 3 pontos")
+
+    edges = np.linspace(1, n_samples - 1, n_out - 1).astype(np.int64)
+    rows = np.arange(n_channels)
+    out = np.empty((n_channels, n_out), dtype=np.int64)
+    out[:, 0] = 0
+    out[:, -1] = n_samples - 1
+    selected = np.zeros(n_channels, dtype=np.int64)
+
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_lo = edges[i + 1]
+        next_hi = edges[i + 2] if i + 2 < len(edges) else n_samples
+        avg_x = (next_lo + next_hi - 1) / 2.0
+        avg_y = data[:, next_lo:next_hi].mean(axis=1)
+
+        ax = selected.astype(np.float64)
+        ay = data[rows, selected]
+        xs = np.arange(lo, hi)
+        area = np.abs(
+            (ax - avg_x)[:, None] * (data[:, lo:hi] - ay[:, None])
+            - (ax[:, None] - xs[None, :]) * (avg_y - ay)[:, None]
+        )
+        selected = lo + np.argmax(area, axis=1)
+        out[:, i + 1] = selected
+    return out
+
+def minmax_envelope(data: np.ndarray, n_buckets: int) -> Tuple[np.ndarray, np.ndarray, int]:
+    """
+    Mínimo e máximo de cada bucket de amostras consecutivas
+
+    Todos os buckets têm bucket_size amostras (exceto o último), então
+    o eixo do tempo do envelope é descrito pela taxa sfreq / bucket_size.
+
+    Args:
+        data: Sinais (channels x samples)
+        n_buckets: Buckets máximos por canal (ex.: largura em pixels)
+
+    Returns:
+        Tupla (mínimos, máximos, bucket_size), arrays (channels x buckets)
+    """
+    data = np.atleast_2d(data)
+    bucket_size = max(1, -(-data.shape[1] // n_buckets))
+    starts = np.arange(0, data.shape[1], bucket_size)
+    return (
+        np.minimum.reduceat(data, starts, axis=1),
+        np.maximum.reduceat(data, starts, axis=1),
+        bucket_size
+    )
+
+def prepare_eeg_visualization(
+    data: np.ndarray,
+    sfreq: float = 128.0,
+    width: Optional[int] = None,
+    method: str = 'minmax',
+    start: float = 0.0
+) -> Dict[str, Any]:
     """
     Prepara dados EEG para visualização no frontend
     
+    O eixo do tempo é descrito por start e sampling_rate, sem listar
+    cada instante. Com width, o sinal é reduzido para no máximo width
+    pontos (LTTB) ou width pares mínimo/máximo (envelope) por canal,
+    qualquer que seja a duração ou a taxa de amostragem.
+    
     Args:
         data: Array com dados EEG (channels x samples)
         sfreq: Frequência de amostragem
+        width: Largura do gráfico em pixels (None = sem redução)
+        method: 'minmax' (envelope, preserva picos) ou 'lttb'
+        start: Instante da primeira amostra
         
     Returns:
-        Dicionário com dados formatados para visualização
+        Dicionário com dados formatados para visualização:
+        - sem redução: data, start, sampling_rate
+        - 'minmax': min, max, start, sampling_rate (dos buckets), bucket_size
+        - 'lttb': data, indices (amostras escolhidas por canal), start, sampling_rate
     """
+    if method not in DECIMATION_METHODS:
+        raise ValueError(f"Método desconhecido: {method} (opções: {DECIMATION_METHODS})")
+    data = np.atleast_2d(data)
+    result = {'start': start, 'n_samples': data.shape[1]}
+    
+    if width is None or data.shape[1] <= width:
+        return {**result, 'method': None, 'data': data.tolist(), 'sampling_rate': sfreq}
+    
+    if method == 'minmax':
+        mins, maxs, bucket_size = minmax_envelope(data, width)
+        return {
+            **result,
+            'method': method,
+            'min': mins.tolist(),
+            'max': maxs.tolist(),
+            'sampling_rate': sfreq / bucket_size,
+            'bucket_size': bucket_size
+        }
+    
+    indices = lttb_indices(data, max(width, 3))
     return {
-        'data': data.tolist(),
-        'timepoints': (np.arange(data.shape[1]) / sfreq).tolist(),
+        **result,
+        'method': method,
+        'data': np.take_along_axis(data, indices, axis=1).tolist(),
+        'indices': indices.tolist(),
         'sampling_rate': sfreq
     }
 
@@ -8,4 +8,7 @@ logging.getLogger('test').setLevel(logging.INFO)
 
 from .test_processing import *
 from .test_api import *
-from .test_websocket import *
\ No newline at end of file
+from .test_websocket import *
+from .test_training import *
+from .test_data import *
+from .test_session import *
@@ -1,8 +1,16 @@
+import json
+import httpx
 import pytest
+import asyncio
+import numpy as np
 from fastapi.testclient import TestClient
 from api.main import app
 from api.core.application import app, get_state
 from api.core.config import settings
+from api.core.state import GlobalState
+from src.attention_bci import AttentionBCI, BCIConfig
+from src.ingest import align_channels
+from src.synthetic import SyntheticFleet
 
 client = TestClient(app)
 
@@ -59,4 +67,134 @@ async def test_websocket_connection(client):
 async def test_session_controls(client):
     """Testa controles de sessão"""
     response = client.post(f"{settings.API_V1_STR}/session/start")
-    assert response.status_code == 200
\ No newline at end of file
+    assert response.status_code == 200
+
+def test_analysis_ndjson_stream_selects_channels_and_metrics(sample_eeg_data):
+    """Testa /eeg/analysis em NDJSON com período, canais e métricas"""
+    state = app.state.global_state
+    for i in range(5):
+        state.add_data({
+            **sample_eeg_data,
+            'timestamp': 100.0 + i,
+            'attention_metrics': {'attention_score': i / 10, 'eye_state': 'open'},
+            'band_powers': {'alpha': float(i), 'beta': 1.0}
+        })
+    
+    response = client.get(
+        f"{settings.API_V1_STR}/eeg/analysis",
+        params={
+            'start_time': 101.0, 'end_time': 103.0, 'format': 'ndjson',
+            'channels': ['O1', 'O2'], 'metrics': ['band_powers.alpha', 'attention_metrics']
+        }
+    )
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('application/x-ndjson')
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [r['timestamp'] for r in records] == [101.0, 102.0, 103.0]
+    assert set(records[0]['channels']) == {'O1', 'O2'}
+    assert records[0]['channels']['O1'] == pytest.approx(sample_eeg_data['channels']['O1'])
+    assert records[2]['band_powers'] == {'alpha': 3.0}
+    assert records[2]['attention_metrics']['eye_state'] == 'open'
+    
+    # Apenas métricas: sinais brutos não são serializados
+    response = client.get(
+        f"{settings.API_V1_STR}/eeg/analysis",
+        params={'format': 'ndjson', 'metrics': ['band_powers.beta']}
+    )
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert len(records) == 5 and records[0] == {'timestamp': 100.0, 'band_powers': {'beta': 1.0}}
+
+def test_summary_and_trends_from_rollups():
+    """Testa /eeg/summary e /eeg/trends servidos pelos agregados"""
+    state = app.state.global_state
+    assert client.get(f"{settings.API_V1_STR}/eeg/summary").status_code == 404
+    for i in range(30):
+        state.rollups.add(600.0 + i, {
+            'attention_metrics': {'attention_score': 0.5, 'eye_state': 'closed'},
+            'band_powers': {band: 1.0 for band in ('delta', 'theta', 'alpha', 'beta', 'gamma')},
+            'quality': {'overall_score': 1.0, 'artifact_ratio': 0.0}
+        })
+    
+    summary = client.get(f"{settings.API_V1_STR}/eeg/summary").json()
+    assert summary['mean_attention'] == 0.5 and summary['dominant_eye_state'] == 'closed'
+    
+    trends = client.get(
+        f"{settings.API_V1_STR}/eeg/trends",
+        params={'start_time': 600.0, 'end_time': 629.0, 'max_points': 5, 'metrics': ['alpha']}
+    ).json()
+    assert trends['resolution'] == 10.0 and trends['time'] == [600.0, 610.0, 620.0]
+    assert trends['alpha']['mean'] == [1.0, 1.0, 1.0]
+    assert client.get(f"{settings.API_V1_STR}/eeg/summary", params={'session': 'live'}).json() == summary
+    assert client.get(f"{settings.API_V1_STR}/eeg/trends", params={'session': 'unknown'}).status_code == 404
+
+async def _trained_bci() -> AttentionBCI:
+    """Modelo pequeno treinado em épocas sintéticas (alfa forte na classe 1)"""
+    rng = np.random.default_rng(0)
+    y = np.arange(8) % 2
+    X = rng.normal(0, 5, (8, 14, 64)) + (y[:, None, None] * 20) * np.sin(2 * np.pi * 10 * np.arange(64) / 128.0)
+    bci = AttentionBCI(BCIConfig(model_params={'n_estimators': 10, 'random_state': 0}))
+    await bci.train(X, y)
+    return bci
+
+async def test_process_eeg_batches_predictions_across_sessions(global_state):
+    """Testa predições do modelo ativo em /eeg/process agrupadas entre sessões"""
+    bci = await _trained_bci()
+    # Lote disparado pela quarta linha (sem depender do tempo)
+    bci.batcher.max_wait_ms, bci.batcher.max_batch_size = 5000.0, 4
+    global_state.bci = bci
+    
+    fleet = SyntheticFleet(4)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://test') as http:
+        responses = await asyncio.gather(*(
+            http.post(
+                f"{settings.API_V1_STR}/eeg/process",
+                json={**headset.payload(128, timestamp=0.0), 'stream_id': f'headset-{i}'}
+            )
+            for i, headset in enumerate(fleet.headsets)
+        ))
+    
+    assert all(r.status_code == 200 for r in responses)
+    for response in responses:
+        prediction = response.json()['prediction']
+        assert prediction['label'] in (0, 1) and prediction['model_version'] == bci.model.version
+        assert sum(prediction['probabilities']) == pytest.approx(1.0)
+    assert list(bci.batcher.batch_sizes) == [4]
+    assert global_state.get_processing_stats()['inference']['total_rows'] == 4
+
+async def test_restarted_worker_serves_saved_model(tmp_path, monkeypatch, sample_eeg_data):
+    """Testa modelo carregado de MODEL_PATH na inicialização servindo predições"""
+    path = (await _trained_bci()).save(tmp_path / 'model.joblib')
+    monkeypatch.setattr(settings, 'MODEL_PATH', str(path))
+    state = GlobalState()
+    assert state.bci.is_trained
+    
+    result = await state.process_data(sample_eeg_data)
+    assert result['prediction']['model_version'] == state.bci.model.version
+    assert len(result['prediction']['probabilities']) == 2
+
+async def test_live_features_match_training_pipeline(monkeypatch, sample_eeg_data):
+    """Testa que a predição ao vivo usa as mesmas características do treinamento"""
+    from src.training import EpochFeaturePipeline
+    monkeypatch.setattr(settings, 'DEVICE_SAMPLING_RATE', 256.0)
+    state = GlobalState()
+    state.bci = await _trained_bci()
+    
+    live = {}
+    predict_features = state.bci.predict_features
+    async def spy(features):
+        live.update(features)
+        return await predict_features(features)
+    monkeypatch.setattr(state.bci, 'predict_features', spy)
+    await state.process_data(sample_eeg_data)
+    
+    aligned, _ = align_channels(
+        sample_eeg_data['channels'],
+        state.processor.config.channels,
+        state.processor.input_window_size,
+        dtype=state.processor.dtype
+    )
+    epoch = state.processor.resample(aligned)
+    expected = EpochFeaturePipeline(state.bci.config.sfreq, state.bci.config.dtype).features(epoch)
+    assert live.keys() == expected.keys()
+    for name, value in expected.items():
+        np.testing.assert_allclose(live[name], value, rtol=1e-10, err_msg=name)
@@ -0,0 +1,220 @@
+import pytest
+import asyncio
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from src.data_loader import EyeStateDataset, resolve_columns
+from src.streaming import PrefetchingLoader, CSVRecordingSource
+from src.edf_reader import EDFReader, EDFEpochs
+from src.synthetic import SyntheticConfig, SyntheticHeadset, SyntheticFleet
+
+@pytest.fixture
+def eye_state_csv(tmp_path):
+    """CSV pequeno no formato do eeg-eye-state (coluna 'P' para P7)"""
+    header = ['AF3', 'F7', 'F3', 'FC5', 'T7', 'P', 'O1',
+              'O2', 'P8', 'T8', 'FC6', 'F4', 'F8', 'AF4']
+    n_samples = 40
+    data = pd.DataFrame(
+        np.arange(n_samples)[:, None] + 1000.0 * np.arange(14)[None, :],
+        columns=header
+    )
+    # Colunas em outra ordem para garantir o mapeamento por nome
+    data = data[header[::-1]]
+    data['class'] = (np.arange(n_samples) >= 25).astype(int)
+    path = tmp_path / 'eye.csv'
+    data.to_csv(path, index=False)
+    return path
+
+def test_resolve_columns_by_name_and_alias():
+    """Testa mapeamento de canais por nome, incluindo aliases"""
+    assert resolve_columns(['p', 'O1 ', 'F3'], ['F3', 'P7', 'O1']) == ['F3', 'p', 'O1 ']
+    with pytest.raises(KeyError):
+        resolve_columns(['F3'], ['Cz'])
+
+def test_eye_state_epochs_are_strided_views(eye_state_csv):
+    """Testa épocas rotuladas com janela deslizante sem cópia"""
+    dataset = EyeStateDataset(eye_state_csv)
+    X, y = dataset.epochs(window=10, hop=5)
+    
+    assert X.shape == (7, 14, 10)
+    assert np.shares_memory(X, dataset.signals)
+    assert not X.flags.writeable
+    # Canal P7 (coluna 'P') na posição 5, amostras da época 2
+    np.testing.assert_array_equal(X[2, 5], 5000.0 + np.arange(10, 20))
+    np.testing.assert_array_equal(dataset.epoch_starts(10, 5), np.arange(0, 31, 5))
+    
+    # Transição de rótulo na amostra 25: janela [20, 30) está mista
+    np.testing.assert_array_equal(y, [0, 0, 0, 0, 1, 1, 1])
+    _, y_last = dataset.epochs(window=10, hop=5, label='last')
+    assert y_last[3] == 0 and y_last[4] == 1
+    X_pure, y_pure = dataset.epochs(window=10, hop=5, label='pure')
+    assert len(X_pure) == 6 and list(y_pure) == [0, 0, 0, 0, 1, 1]
+    
+    with pytest.raises(ValueError):
+        dataset.epochs(label='mode')
+
+@pytest.mark.asyncio
+async def test_prefetching_loader_matches_dataset_windows(eye_state_csv, tmp_path):
+    """Testa leitura em blocos, múltiplas fontes e backpressure"""
+    
+    expected, labels = EyeStateDataset(eye_state_csv).epochs(window=10, hop=5)
+    
+    # Blocos menores que a janela para exercitar a sobreposição
+    source = CSVRecordingSource(eye_state_csv, chunk_rows=7)
+    windows = list(source.windows(10, 5))
+    np.testing.assert_array_equal(np.stack([w.data for w in windows]), expected)
+    assert [w.start for w in windows] == list(range(0, 31, 5))
+    assert [w.label for w in windows] == list(labels)
+    
+    # Diretório com duas gravações
+    directory = tmp_path / 'archive'
+    directory.mkdir()
+    for name in ('a.csv', 'b.csv'):
+        (directory / name).write_bytes(eye_state_csv.read_bytes())
+    
+    loader = PrefetchingLoader([directory], window=10, hop=5, max_prefetch=3)
+    async with loader:
+        await asyncio.sleep(0.2)
+        # A fila limitada segura a thread de leitura
+        assert loader.queued <= 3 and loader.windows_produced <= 4
+        received = [w async for w in loader]
+    assert len(received) == 14
+    assert [Path(w.source).name for w in received] == ['a.csv'] * 7 + ['b.csv'] * 7
+    
+    payload = received[0].to_payload(timestamp=1.0)
+    assert payload['timestamp'] == 1.0 and payload['channels']['P7'] == list(expected[0, 5])
+
+def _write_edf(path, labels, data, spr, units, bdf=False, n_records=None):
+    """Escreve um EDF/BDF mínimo (data: lista de sinais em valores digitais)"""
+    def field(value, width):
+        return str(value).ljust(width)[:width].encode('latin-1')
+
+    n = len(labels)
+    n_rec = len(data[0]) // spr[0]
+    digital = (-(2 ** 23), 2 ** 23 - 1) if bdf else (-32768, 32767)
+    header = (b'\xffBIOSEMI' if bdf else field(0, 8)) + field('X', 80) + field('X', 80)
+    header += field('01.01.24', 8) + field('00.00.00', 8) + field(256 * (n + 1), 8)
+    header += field('24BIT' if bdf else '', 44) + field(n_rec if n_records is None else n_records, 8)
+    header += field(1, 8) + field(n, 4)
+    for values, width in (
+        (labels, 16), (['AgAgCl'] * n, 80), (units, 8),
+        ([-1000] * n, 8), ([1000] * n, 8),
+        ([digital[0]] * n, 8), ([digital[1]] * n, 8),
+        ([''] * n, 80), (spr, 8), ([''] * n, 32)
+    ):
+        header += b''.join(field(v, width) for v in values)
+
+    records = []
+    for r in range(n_rec):
+        for values, k in zip(data, spr):
+            chunk = np.asarray(values[r * k:(r + 1) * k], dtype='<i4')
+            if bdf:
+                records.append(chunk.view(np.uint8).reshape(-1, 4)[:, :3].tobytes())
+            else:
+                records.append(chunk.astype('<i2').tobytes())
+    path.write_bytes(header + b''.join(records))
+    return path
+
+def test_edf_reader_maps_channels_and_reads_in_chunks(tmp_path):
+    """Testa leitura de EDF por nome de canal, entre registros e sob demanda"""
+    sfreq, n_records = 16, 5
+    channels = ['AF3', 'P7', 'O1']
+    rng = np.random.default_rng(0)
+    digital = {ch: rng.integers(-32768, 32767, sfreq * n_records) for ch in channels}
+    # Ordem diferente, prefixo/referência nos rótulos e um canal extra a outra taxa
+    labels = ['EEG O1-REF', 'Status', 'EEG T5-REF', 'EEG AF3-REF']
+    data = [digital['O1'], np.zeros(4 * n_records, dtype=int), digital['P7'], digital['AF3']]
+    path = _write_edf(tmp_path / 'rec.edf', labels, data, [sfreq, 4, sfreq, sfreq], ['uV', '', 'mV', 'uV'])
+
+    reader = EDFReader(path, channels=channels)
+    assert reader.sfreq == sfreq and len(reader) == sfreq * n_records
+    gain = 2000 / 65535
+    expected = np.stack([(digital[ch] + 32768) * gain - 1000 for ch in channels])
+    expected[1] *= 1000  # P7 em mV -> µV
+    np.testing.assert_allclose(reader.read(0, len(reader)), expected)
+    # Intervalo atravessando registros
+    np.testing.assert_allclose(reader.read(10, 37), expected[:, 10:37])
+
+    windows = list(reader.windows(20, 12))
+    assert [w.start for w in windows] == [0, 12, 24, 36, 48, 60]
+    np.testing.assert_allclose(windows[2].data, expected[:, 24:44])
+
+    epochs = reader.epochs(20, 12)
+    assert isinstance(epochs, EDFEpochs) and epochs.shape == (6, 3, 20)
+    np.testing.assert_allclose(epochs[[1, 4]], np.stack([expected[:, 12:32], expected[:, 48:68]]))
+    np.testing.assert_allclose(np.stack(list(epochs)), np.stack([w.data for w in windows]))
+
+    loader = PrefetchingLoader([tmp_path], window=20, hop=12, channels=channels)
+    async def consume():
+        async with loader:
+            return [w async for w in loader]
+    assert len(asyncio.run(consume())) == 6
+
+def test_bdf_reader_decodes_24_bit_samples(tmp_path):
+    """Testa decodificação de amostras de 24 bits com sinal (BDF)"""
+    values = np.array([-(2 ** 23), -1, 0, 1, 2 ** 23 - 1, 12345, -54321, 7])
+    # Número de registros desconhecido (-1): calculado pelo tamanho do arquivo
+    path = _write_edf(tmp_path / 'rec.bdf', ['Fp1'], [values], [4], ['uV'], bdf=True, n_records=-1)
+    reader = EDFReader(path, channels=['FP1'])
+    assert reader.n_records == 2
+    gain = 2000 / (2 ** 24 - 1)
+    np.testing.assert_allclose(reader.read(0, 8)[0], (values + 2 ** 23) * gain - 1000)
+
+def test_synthetic_headset_is_block_invariant_and_realistic():
+    """Testa continuidade entre blocos e componentes do sinal sintético"""
+    config = SyntheticConfig(dropout_rate=0.0, seed=1)
+    whole = SyntheticHeadset(config, headset_id=2).next_block(1280)
+    headset = SyntheticHeadset(config, headset_id=2)
+    blocks = np.concatenate([headset.next_block(n) for n in (100, 28, 500, 652)], axis=1)
+    np.testing.assert_allclose(blocks, whole)
+    
+    # Headsets diferentes geram sinais diferentes
+    other = SyntheticHeadset(config, headset_id=3).next_block(1280)
+    assert not np.allclose(other, whole)
+    
+    # Piscadas dominam os canais frontais; alfa aparece nos occipitais
+    channels = config.channels
+    centered = whole - whole.mean(axis=1, keepdims=True)
+    assert np.ptp(centered[channels.index('AF3')]) > np.ptp(centered[channels.index('T7')])
+    
+    # Perdas de contato omitem o canal do payload
+    dropping = SyntheticHeadset(SyntheticConfig(dropout_rate=5.0, dropout_duration=5.0))
+    dropping.next_block(128)
+    payload = dropping.payload(64, timestamp=1.0)
+    assert len(payload['channels']) < len(channels)
+
+@pytest.mark.asyncio
+async def test_synthetic_source_feeds_loader_and_api(global_state):
+    """Testa o gerador como fonte do loader e como driver de /eeg/process"""
+    fleet = SyntheticFleet(3, SyntheticConfig(duration=2.0))
+    loader = PrefetchingLoader(list(fleet), window=128, hop=128)
+    windows = [w async for w in loader]
+    assert [w.source for w in windows] == ['synthetic:0'] * 2 + ['synthetic:1'] * 2 + ['synthetic:2'] * 2
+    assert windows[0].data.shape == (14, 128)
+    
+    # Mesmo payload enviado pelo driver de /eeg/process
+    result = await global_state.process_data(fleet.headsets[0].payload(128, timestamp=0.0))
+    assert 0 <= result['attention_metrics']['attention_score'] <= 1
+
+async def test_load_test_process_driver_against_app(global_state):
+    """Testa o driver de /eeg/process de scripts/load_test.py contra o app"""
+    import argparse
+    import httpx
+    import importlib.util
+    from api.main import app
+    spec = importlib.util.spec_from_file_location(
+        'load_test', Path(__file__).resolve().parents[1] / 'scripts' / 'load_test.py'
+    )
+    load_test = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(load_test)
+    
+    with pytest.raises(ValueError):
+        load_test.build_fleet(2, 32, 128.0)
+    fleet = load_test.build_fleet(2, 8, 128.0)
+    assert fleet.config.channels == SyntheticConfig().channels[:8]
+    
+    args = argparse.Namespace(url='http://test', seconds=0.5, block=1.0, realtime=False)
+    latencies, errors = [], []
+    await load_test.run_process(args, fleet, latencies, errors, transport=httpx.ASGITransport(app=app))
+    assert not errors and len(latencies) >= 2
+    assert global_state.stats['total_processed'] == len(latencies)
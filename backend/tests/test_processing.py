@@ -4,6 +4,7 @@ import pytest
 import numpy as np
 from src.attention_bci import AttentionBCI
 from src.signal_processor import EEGProcessor, SignalConfig
+from src.utils.visualization import lttb_indices, prepare_eeg_visualization
 
 @pytest.mark.asyncio
 async def test_eeg_processor(processor, sample_eeg_data):
@@ -63,4 +64,273 @@ async def test_signal_processing_pipeline(processor, bci, sample_eeg_data):
     
     # Verifica bandas de frequência
     band_powers = await processor.get_band_power(processed)
-    assert all(band in band_powers for band in ['delta', 'theta', 'alpha', 'beta', 'gamma'])
\ No newline at end of file
+    assert all(band in band_powers for band in ['delta', 'theta', 'alpha', 'beta', 'gamma'])
+
+@pytest.mark.asyncio
+async def test_float32_processing_matches_float64(sample_eeg_data):
+    """Testa desvio numérico do modo float32 em relação ao float64"""
+    proc64 = EEGProcessor(SignalConfig(sfreq=128.0))
+    proc32 = EEGProcessor(SignalConfig(sfreq=128.0, dtype='float32'))
+    data = np.array([sample_eeg_data["channels"][ch] for ch in proc64.config.channels])
+    
+    # Offset DC típico do headset (~4000 µV) para exercitar a precisão simples
+    data = data * 20 + 4200
+    
+    processed64 = await proc64.process_async(data)
+    processed32 = await proc32.process_async(data)
+    assert processed32.dtype == np.float32
+    scale = np.max(np.abs(processed64))
+    assert np.max(np.abs(processed32 - processed64)) / scale < 1e-4
+    
+    # Poder das bandas
+    powers64 = proc64._calculate_band_power(processed64)
+    powers32 = proc32._calculate_band_power(processed32)
+    for band in powers64:
+        assert abs(powers32[band] - powers64[band]) < 1e-4
+    
+    # Conectividade
+    conn64 = await proc64.compute_connectivity(processed64)
+    conn32 = await proc32.compute_connectivity(processed32)
+    assert conn32.dtype == np.float32
+    assert np.max(np.abs(conn32 - conn64)) < 1e-3
+
+@pytest.mark.asyncio
+async def test_float32_features_match_float64(sample_eeg_data):
+    """Testa desvio das características espectrais e temporais em float32"""
+    from src.feature_extractor import EEGFeatureExtractor
+    
+    data = np.array(list(sample_eeg_data["channels"].values())) * 20
+    ext64 = EEGFeatureExtractor(128.0)
+    ext32 = EEGFeatureExtractor(128.0, dtype='float32')
+    
+    data32 = data.astype(np.float32)
+    for compute in ('_compute_spectral_features', '_compute_temporal_features'):
+        features64 = getattr(ext64, compute)(data)
+        features32 = getattr(ext32, compute)(data32)
+        for name, value in features64.items():
+            assert abs(features32[name] - value) <= 1e-3 * max(abs(value), 1.0), name
+
+def test_spatial_filter_matches_car(processor, sample_eeg_data):
+    """Testa que o filtro espacial equivale a remoção de DC seguida de CAR"""
+    data = np.array([sample_eeg_data["channels"][ch] for ch in processor.config.channels]) + 4200
+    
+    expected = processor.apply_car(data - np.mean(data, axis=1, keepdims=True))
+    result = processor.apply_spatial_filter(data)
+    np.testing.assert_allclose(result, expected, atol=1e-8)
+    
+    # Cada chamada devolve um novo array (sem buffer compartilhado)
+    again = processor.apply_spatial_filter(data * 2)
+    assert again is not result
+    np.testing.assert_allclose(result, expected, atol=1e-8)
+
+def test_processing_order_matches_car_after_artifact_removal(processor, sample_eeg_data):
+    """Testa a ordem DC -> filtros -> artefatos -> CAR do processamento"""
+    data = np.array([sample_eeg_data["channels"][ch] for ch in processor.config.channels]) + 4200
+    data[3, 20:25] += 400.0  # artefato em um canal
+    
+    centered = data - np.mean(data, axis=1, keepdims=True)
+    expected = processor.apply_car(processor.remove_artifacts(processor.apply_filters(centered)))
+    np.testing.assert_allclose(processor.process_sync(data), expected, atol=1e-8)
+
+def test_spatial_filter_bad_channel_interpolation():
+    """Testa interpolação de canais ruins e recompilação da matriz"""
+    from src.spatial_filter import SpatialFilter, DEFAULT_MONTAGE
+    
+    channels = list(DEFAULT_MONTAGE)
+    spatial = SpatialFilter(channels, reference=None, bad_channels=['O1'])
+    matrix = spatial.matrix
+    
+    # Canal ruim é reconstruído apenas a partir dos canais bons
+    o1 = channels.index('O1')
+    assert matrix[o1, o1] == 0
+    assert np.isclose(matrix[o1].sum(), 1.0)
+    
+    # Campo suave (gradiente antero-posterior) é recuperado no canal ruim
+    positions = np.array([DEFAULT_MONTAGE[ch] for ch in channels])
+    field_values = positions[:, 1:2] * np.ones((1, 32))
+    corrupted = field_values.copy()
+    corrupted[o1] = 500.0
+    interpolated = spatial.matrix @ corrupted
+    assert abs(interpolated[o1, 0] - field_values[o1, 0]) < 0.1
+    
+    # Matriz só é recompilada quando o conjunto de canais ruins muda
+    assert not spatial.set_bad_channels(['O1'])
+    assert spatial.matrix is matrix
+    assert spatial.set_bad_channels(['O1', 'T7'])
+    assert spatial.matrix is not matrix
+
+def test_polyphase_resampler_streaming():
+    """Testa decimação em blocos: continuidade entre blocos e anti-aliasing"""
+    from src.resampling import PolyphaseResampler
+    
+    resampler = PolyphaseResampler(512.0, 128.0)
+    t = np.arange(5120) / 512.0
+    data = np.vstack([
+        np.sin(2 * np.pi * 10 * t),   # dentro da banda
+        np.sin(2 * np.pi * 200 * t)   # acima do Nyquist de saída
+    ])
+    
+    whole = resampler.process(data)
+    resampler.reset()
+    chunks = np.concatenate(
+        [resampler.process(data[:, i:i+333]) for i in range(0, data.shape[1], 333)],
+        axis=1
+    )
+    
+    assert whole.shape == (2, 1280)
+    np.testing.assert_allclose(chunks, whole, atol=1e-12)
+    
+    # Descarta o transiente inicial do filtro
+    assert abs(np.max(np.abs(whole[0, 300:])) - 1.0) < 0.01
+    assert np.max(np.abs(whole[1, 300:])) < 1e-3
+
+@pytest.mark.asyncio
+async def test_processor_decimates_device_rate():
+    """Testa processamento de dispositivo a 1 kHz na taxa de análise"""
+    processor = EEGProcessor(SignalConfig(sfreq=128.0, input_sfreq=1000.0))
+    assert processor.input_window_size == 1000
+    
+    data = np.random.normal(0, 10, (len(processor.config.channels), 1000))
+    processed = [await processor.process_async(data, stream='headset') for _ in range(3)]
+    
+    # Fase é mantida entre blocos do fluxo: 3 s a 1 kHz viram 3 s a 128 Hz
+    assert sum(p.shape[1] for p in processed) == 384
+    assert all(p.shape[0] == len(processor.config.channels) for p in processed)
+
+@pytest.mark.asyncio
+async def test_processor_keeps_resampler_state_per_stream():
+    """Testa fluxos intercalados sem mistura do estado de reamostragem"""
+    config = SignalConfig(sfreq=128.0, input_sfreq=512.0)
+    shared = EEGProcessor(config)
+    rng = np.random.default_rng(0)
+    streams = {name: rng.normal(0, 10, (14, 3 * 512)) for name in ('a', 'b')}
+    
+    interleaved = {'a': [], 'b': []}
+    for i in range(0, 3 * 512, 512):
+        for name, data in streams.items():
+            resampled = shared.stream_resampler(name).process(data[:, i:i + 512])
+            interleaved[name].append(resampled)
+    
+    for name, data in streams.items():
+        alone = EEGProcessor(config).stream_resampler(name).process(data)
+        np.testing.assert_allclose(np.concatenate(interleaved[name], axis=1), alone, atol=1e-9)
+    
+    # Reinício do fluxo descarta o histórico
+    shared.reset('a')
+    first = shared.stream_resampler('a').process(streams['a'][:, :512])
+    np.testing.assert_allclose(first, interleaved['a'][0], atol=1e-9)
+    
+    # Sem fluxo, nenhum estado é compartilhado entre blocos
+    for name, data in streams.items():
+        isolated = shared.stream_resampler(None).process(data[:, 512:1024])
+        fresh = EEGProcessor(config).stream_resampler('x').process(data[:, 512:1024])
+        np.testing.assert_allclose(isolated, fresh, atol=1e-9)
+    assert None not in shared._streams
+
+def test_align_channels_resamples_and_masks():
+    """Testa alinhamento vetorizado dos canais na ingestão"""
+    from src.ingest import align_channels
+    
+    channels = ['AF3', 'F7', 'F3', 'FC5']
+    t_in = np.arange(100) / 100.0
+    t_out = np.arange(128) / 128.0
+    data = {
+        'AF3': np.sin(2 * np.pi * 3 * t_in).tolist(),
+        'F7': np.cos(2 * np.pi * 3 * t_in).tolist(),
+        'F3': [],
+    }
+    
+    aligned, mask = align_channels(data, channels, 128)
+    
+    assert aligned.shape == (4, 128)
+    assert mask.tolist() == [True, True, False, False]
+    assert np.all(aligned[~mask] == 0)
+    
+    # Longe das bordas a reamostragem segue o sinal original
+    np.testing.assert_allclose(aligned[0, 10:-10], np.sin(2 * np.pi * 3 * t_out)[10:-10], atol=0.02)
+
+@pytest.mark.asyncio
+async def test_masked_channels_are_excluded(bci, sample_eeg_data):
+    """Testa que canais ausentes não entram em CAR, conectividade e características"""
+    data = np.array([sample_eeg_data["channels"][ch] for ch in bci.config.channels])
+    mask = np.ones(len(bci.config.channels), dtype=bool)
+    mask[[2, 5]] = False
+    
+    # CAR calculada apenas sobre os canais presentes
+    spatial = bci.processor.apply_spatial_filter(data, mask)
+    assert np.all(spatial[~mask] == 0)
+    np.testing.assert_allclose(spatial[mask].mean(axis=0), 0, atol=1e-10)
+    
+    result = await bci.process_epoch(data, mask)
+    connectivity = np.array(result['connectivity'])
+    assert np.all(connectivity[~mask] == 0)
+    assert np.all(connectivity[:, ~mask] == 0)
+    
+    features = await bci.feature_extractor.extract_async(data, mask)
+    assert 'ch2_mean' not in features and 'ch5_alpha_power' not in features
+    assert 'ch3_mean' in features and 'ch13_alpha_power' in features
+
+def test_band_power_engine_matches_welch():
+    """Testa paridade do motor de poder espectral com scipy.signal.welch"""
+    from scipy import signal
+    from src.band_power import FREQUENCY_BANDS, get_band_power_engine
+    
+    data = np.random.normal(0, 10, (14, 500)) + 3
+    engine = get_band_power_engine(128.0, 500, 128)
+    assert get_band_power_engine(128.0, 500, 128) is engine
+    
+    freqs, psd = signal.welch(data, fs=128.0, nperseg=128)
+    np.testing.assert_allclose(engine.psd(data), psd, rtol=1e-10)
+    
+    powers = engine.band_powers(data)
+    total = psd.sum(axis=1)
+    for b, (band, (low, high)) in enumerate(FREQUENCY_BANDS.items()):
+        mask = (freqs >= low) & (freqs <= high)
+        np.testing.assert_allclose(powers.absolute[:, b], psd[:, mask].mean(axis=1), rtol=1e-10)
+        np.testing.assert_allclose(powers.relative[:, b], psd[:, mask].mean(axis=1) / total, rtol=1e-10)
+        np.testing.assert_array_equal(powers.peak_freq[:, b], freqs[mask][np.argmax(psd[:, mask], axis=1)])
+
+def test_analyze_recording_matches_windowed_analysis():
+    """Testa linha do tempo vetorizada contra a análise janela a janela"""
+    from src.eeg_analyzer import EEGAnalyzer
+    
+    analyzer = EEGAnalyzer(sampling_rate=128.0)
+    data = np.random.normal(0, 10, (14, 128 * 30))
+    
+    timeline = analyzer.analyze_recording(data, window_size=256)
+    
+    expected = []
+    for start in range(0, data.shape[1] - 256 + 1, 128):
+        powers = analyzer._compute_band_powers(data[:, start:start + 256])
+        expected.append(1 / (1 + powers['theta'] / (powers['beta'] + 1e-10)))
+    
+    assert len(timeline.attention) == len(expected) == len(timeline.times)
+    np.testing.assert_allclose(timeline.attention, expected, rtol=1e-10)
+    assert timeline.attention_variance == pytest.approx(np.var(expected))
+    assert timeline.meditation.shape == timeline.dominant_frequency.shape == timeline.attention.shape
+
+def test_visualization_decimation_bounds_points():
+    """Testa LTTB e envelope min/max limitados à largura do gráfico"""
+    rng = np.random.default_rng(0)
+    data = rng.normal(0, 10, (3, 128 * 60))
+    data[1, 4000] = 500.0  # pico isolado
+    
+    full = prepare_eeg_visualization(data[:, :256], sfreq=128.0, width=512, start=10.0)
+    assert full['method'] is None and len(full['data'][0]) == 256 and 'timepoints' not in full
+    
+    envelope = prepare_eeg_visualization(data, sfreq=128.0, width=400, start=10.0)
+    assert len(envelope['min'][0]) <= 400 and envelope['sampling_rate'] == 128.0 / envelope['bucket_size']
+    assert max(envelope['max'][1]) == 500.0
+    np.testing.assert_array_equal(np.min(envelope['min'], axis=1), data.min(axis=1))
+    
+    lttb = prepare_eeg_visualization(data, sfreq=128.0, width=400, method='lttb')
+    indices = np.array(lttb['indices'])
+    assert indices.shape == (3, 400) and (np.diff(indices, axis=1) > 0).all()
+    assert indices[:, 0].tolist() == [0] * 3 and indices[:, -1].tolist() == [data.shape[1] - 1] * 3
+    assert 4000 in indices[1]
+    np.testing.assert_array_equal(lttb['data'], np.take_along_axis(data, indices, axis=1))
+    
+    # Mesma escolha de pontos canal a canal e em conjunto
+    np.testing.assert_array_equal(lttb_indices(data[2], 400)[0], indices[2])
+    with pytest.raises(ValueError):
+        prepare_eeg_visualization(data, width=100, method='spline')
@@ -0,0 +1,257 @@
+import io
+import pytest
+import asyncio
+import zipfile
+import numpy as np
+import pandas as pd
+from fastapi.testclient import TestClient
+from api.main import app
+from api.core.state import GlobalState
+from api.core.config import settings
+from src.session_recorder import SessionRecorder, SessionRecording, unpack_mask
+from src.session_archive import CompressedSession, compress_session, open_session
+from src.streaming import PrefetchingLoader
+from src.results_sink import ResultsSink
+from src.rollups import RollupStore
+from api.models.schemas import AnalysisSummary
+from src.synthetic import SyntheticHeadset
+
+@pytest.fixture
+def session_dir(tmp_path, monkeypatch):
+    """Sessões gravadas em um diretório temporário"""
+    monkeypatch.setattr(settings, 'SESSION_DIR', str(tmp_path / 'sessions'))
+    return tmp_path / 'sessions'
+
+def test_session_recorder_appends_and_reads_by_time(tmp_path):
+    """Testa gravação incremental e leitura memmapped por intervalo de tempo"""
+    channels = ['AF3', 'O1', 'O2']
+    rng = np.random.default_rng(0)
+    blocks = [rng.normal(0, 50, (3, 64)) for _ in range(5)]
+    path = tmp_path / 'session'
+
+    recorder = SessionRecorder(path, channels, sfreq=64.0, fsync_interval=0.0)
+    assert not path.exists()  # arquivos só no primeiro bloco
+    mask = np.array([True, False, True])
+    for i, block in enumerate(blocks):
+        recorder.append(100.0 + i, block, {'epoch': i, 'score': np.float32(0.5)}, mask if i == 2 else None)
+
+    # Sessão legível durante a gravação
+    live = SessionRecording(path)
+    assert len(live) == 5 * 64 and live.n_results == 5
+    recorder.close()
+
+    # Registros parciais no fim (queda durante a escrita) são ignorados
+    with open(path / 'signals.f32', 'ab') as f:
+        f.write(b'\x00' * 7)
+    with open(path / 'results.jsonl', 'ab') as f:
+        f.write(b'{"epoch": 5')
+
+    session = SessionRecording(path)
+    assert isinstance(session.signals, np.memmap)
+    assert session.start_time == 100.0 and session.end_time == 105.0
+    expected = np.concatenate(blocks, axis=1).astype(np.float32)
+    np.testing.assert_array_equal(session.read(), expected)
+
+    # 101.5 s -> metade do segundo bloco; 103.25 s -> 1/4 do quarto
+    np.testing.assert_array_equal(session.read(101.5, 103.25), expected[:, 96:208])
+    np.testing.assert_array_equal(session.read(101.5, 103.25, channels=['O2']), expected[2:, 96:208])
+    assert session.sample_at(0.0) == 0 and session.sample_at(1e9) == len(session)
+
+    assert [r['epoch'] for r in session.results(101.0, 103.0)] == [1, 2]
+    assert next(session.results())['score'] == 0.5
+    assert list(unpack_mask(session.chunks['channel_mask'][2], 3)) == [True, False, True]
+    assert [t for t, _ in session.iter_chunks()] == [100.0, 101.0, 102.0, 103.0, 104.0]
+
+def test_session_recorder_serializes_threaded_appends(tmp_path):
+    """Testa gravação concorrente a partir de threads e blocos após close()"""
+    recorder = SessionRecorder(tmp_path / 'session', ['AF3', 'O1'], sfreq=128.0)
+
+    async def record():
+        await asyncio.gather(*(
+            asyncio.to_thread(recorder.append, float(i), np.full((2, 32), i), {'epoch': i})
+            for i in range(20)
+        ))
+    asyncio.run(record())
+    recorder.close()
+    recorder.append(99.0, np.zeros((2, 32)), {'epoch': 99})  # descartado
+
+    session = SessionRecording(tmp_path / 'session')
+    assert len(session) == 20 * 32 and session.n_results == 20
+    for timestamp, block in session.iter_chunks():
+        assert (block == timestamp).all()
+
+def test_compressed_session_round_trip_is_lossless(tmp_path):
+    """Testa compressão sem perda, acesso aleatório e reprodução"""
+    channels = ['AF3', 'F7', 'O1', 'O2']
+    rng = np.random.default_rng(0)
+    # Sinal na grade do Emotiv (LSB 20/39 µV, 2 casas decimais) com DC de ~4200 µV
+    steps = rng.integers(-40, 41, (4, 3000)).cumsum(axis=1) + 8200
+    signals = np.round(steps * (20 / 39), 2)
+    signals[1, 100] = 715897.0  # pico de artefato (deltas de 32 bits)
+    signals[2, 2000] = 86.6667  # valor fora da grade (exceção)
+    signals[:, 2560:] = rng.normal(0, 1, (4, 440))  # último bloco sem quantização
+
+    source = tmp_path / 'raw'
+    with SessionRecorder(source, channels, sfreq=128.0) as recorder:
+        for i, start in enumerate(range(0, 3000, 250)):
+            recorder.append(50.0 + i * 250 / 128, signals[:, start:start + 250], {'epoch': i})
+    raw = SessionRecording(source)
+
+    archive = compress_session(raw, tmp_path / 'archive', block_samples=512)
+    assert isinstance(open_session(tmp_path / 'archive'), CompressedSession)
+    assert sorted(set(archive.blocks['width'])) == [0, 2, 4]
+    # Sem perda em relação ao float32 gravado
+    np.testing.assert_array_equal(archive.read(), raw.read())
+    assert archive.compression_ratio > 3
+
+    # Acesso aleatório atravessando blocos, por tempo e por canal
+    np.testing.assert_array_equal(archive.read_samples(500, 1100), raw.read_samples(500, 1100))
+    np.testing.assert_array_equal(archive.read(60.0, 61.5, ['O2']), raw.read(60.0, 61.5, ['O2']))
+    assert [r['epoch'] for r in archive.results(50.0, 52.0)] == [0, 1]
+
+    # Reprodução pelo PrefetchingLoader
+    async def replay():
+        async with PrefetchingLoader([archive], window=256, hop=256) as loader:
+            return [w async for w in loader]
+    windows = asyncio.run(replay())
+    assert len(windows) == 11
+    np.testing.assert_array_equal(windows[9].data, raw.read_samples(2304, 2560))
+
+async def test_global_state_records_saves_and_loads_sessions(global_state, session_dir):
+    """Testa start/stop/save/load de sessões no GlobalState"""
+    headset = SyntheticHeadset()
+    await global_state.start_recording()
+    for i in range(3):
+        await global_state.process_data(headset.payload(128, timestamp=10.0 + i))
+    assert len(global_state.session_data) == 3 * 128
+    await global_state.stop_recording()
+
+    session = global_state.session_data
+    assert isinstance(session, SessionRecording) and len(session) == 3 * 128
+    assert session.channels == global_state.processor.config.channels
+    assert session.n_results == 3 and len(list(session.results(10.0, 12.0))) == 2
+    # Agregados da sessão separados dos dados processados fora da gravação
+    assert global_state.get_rollups(session.path.name).n_results == 3
+    assert global_state.rollups.n_results == 0
+
+    await global_state.save_session('../escape')
+    assert (session_dir / 'escape' / 'meta.json').exists()
+    assert isinstance(global_state.session_data, CompressedSession)
+    with pytest.raises(FileExistsError):
+        await global_state.save_session('escape')
+
+    assert global_state.get_rollups('escape').n_results == 3
+
+    global_state.session = None
+    global_state.session_rollups.pop('escape')
+    await global_state.load_session('escape')
+    np.testing.assert_array_equal(global_state.session_data.read(), session.read())
+    # Reconstruídos a partir dos resultados gravados
+    rebuilt = global_state.get_rollups('escape')
+    assert rebuilt.n_results == 3 and rebuilt.first_time == 10.0
+    assert rebuilt.summary()['mean_attention'] == pytest.approx(
+        np.mean([r['attention_metrics']['attention_score'] for r in session.results()])
+    )
+
+def _epoch_result(i: int) -> dict:
+    """Resultado no formato de AttentionBCI.process_epoch"""
+    return {
+        'attention_metrics': {'attention_score': i / 100, 'eye_state': 'open' if i % 2 else 'closed'},
+        'band_powers': {'alpha': float(i), 'beta': 2.0 * i},
+        'quality': {'amplitude_ok': np.True_, 'overall_score': np.float64(0.9)},
+        'connectivity': np.eye(3).tolist(),
+        'features': {'ignored': 1.0}
+    }
+
+def test_results_sink_writes_columnar_partitions(tmp_path):
+    """Testa lotes colunares gravados em segundo plano e exportação"""
+    sink = ResultsSink(tmp_path / 'results', ['AF3', 'O1', 'O2'], batch_size=10, flush_interval=60)
+    for i in range(25):
+        sink.append(1000.0 + i, _epoch_result(i))
+    sink.flush()
+    assert len(sink.parts()) == 3 and sink.rows_written == 25
+    # Partições selecionadas pelo intervalo no nome do arquivo
+    assert len(sink.parts(1012.0, 1015.0)) == 1
+
+    columns = sink.read(1005.0, 1012.0)
+    np.testing.assert_array_equal(columns['timestamp'], np.arange(1005.0, 1012.0))
+    np.testing.assert_allclose(columns['band_powers.beta'], 2.0 * np.arange(5, 12))
+    assert columns['attention_metrics.eye_state'][0] == 'open'
+    assert columns['quality.amplitude_ok'].dtype == np.float32
+    assert 'connectivity.AF3-O1' in columns and 'features.ignored' not in columns
+    assert list(sink.read(columns=['band_powers.alpha'])) == ['timestamp', 'band_powers.alpha']
+
+    csv = pd.read_csv(io.BytesIO(b''.join(sink.iter_csv(1020.0, columns=['band_powers.alpha']))))
+    assert list(csv.columns) == ['timestamp', 'band_powers.alpha'] and len(csv) == 5
+
+    with zipfile.ZipFile(io.BytesIO(b''.join(sink.iter_zip()))) as archive:
+        assert archive.namelist() == [p.name for p in sink.parts()]
+        with archive.open(archive.namelist()[0]) as part, np.load(part) as data:
+            np.testing.assert_array_equal(data['timestamp'], np.arange(1000.0, 1010.0))
+    sink.close()
+
+    # Instantes abaixo da precisão do nome do arquivo não são descartados
+    fine = ResultsSink(tmp_path / 'fine', ['AF3', 'O1', 'O2'], batch_size=2, flush_interval=60)
+    fine.append(1000.0001, _epoch_result(1))
+    fine.append(1000.0004, _epoch_result(2))
+    fine.close()
+    assert [p.name.split('-')[1:3] for p in fine.parts()] == [['1000.000', '1000.001']]
+    np.testing.assert_array_equal(fine.read(start_time=1000.0003)['timestamp'], [1000.0004])
+
+def test_results_download_endpoint_streams_csv(tmp_path, monkeypatch):
+    """Testa /eeg/results com o coletor do GlobalState"""
+    monkeypatch.setattr(settings, 'RESULTS_DIR', str(tmp_path / 'results'))
+    state = GlobalState()
+    monkeypatch.setattr(app.state, 'global_state', state)
+    headset = SyntheticHeadset()
+
+    async def process():
+        for i in range(3):
+            await state.process_data(headset.payload(128, timestamp=500.0 + i))
+    asyncio.run(process())
+    assert state.results_sink.n_rows == 3  # ainda em memória
+
+    client = TestClient(app)
+    response = client.get(
+        f"{settings.API_V1_STR}/eeg/results",
+        params={'start_time': 501.0, 'columns': ['attention_metrics.attention_score']}
+    )
+    assert response.status_code == 200 and response.headers['content-type'].startswith('text/csv')
+    csv = pd.read_csv(io.BytesIO(response.content))
+    assert list(csv['timestamp']) == [501.0, 502.0]
+    assert csv['attention_metrics.attention_score'].between(0, 1).all()
+    assert client.get(f"{settings.API_V1_STR}/eeg/results", params={'format': 'xml'}).status_code == 400
+    state.results_sink.close()
+
+def test_rollup_store_serves_summaries_from_bounded_buckets():
+    """Testa agregados incrementais em várias resoluções"""
+    store = RollupStore(((1.0, 120), (10.0, 60), (60.0, 200)))
+    rng = np.random.default_rng(0)
+    n = 2 * 3600  # 2 h, 1 época por segundo
+    timestamps = 1200.0 + np.arange(n)  # alinhado aos buckets de 1 min
+    scores = rng.uniform(0, 1, n)
+    for t, score in zip(timestamps, scores):
+        store.add(t, {
+            'attention_metrics': {'attention_score': score, 'eye_state': 'closed' if score > 0.7 else 'open'},
+            'band_powers': {'alpha': 2.0 if t < 1200.0 + 3600 else 4.0},
+            'quality': {'overall_score': 0.9, 'artifact_ratio': 0.0}
+        })
+
+    # Janela curta recente: 1 s; histórico todo: 60 s (1 s e 10 s não retêm 2 h)
+    assert store.select_level(timestamps[-60], timestamps[-1]).resolution == 1.0
+    assert store.select_level(timestamps[-500], timestamps[-1]).resolution == 10.0
+    summary = store.summary()
+    assert summary['quality_metrics']['resolution'] == 60.0
+    assert summary['mean_attention'] == pytest.approx(scores.mean())
+    assert summary['attention_variance'] == pytest.approx(scores.var())
+    assert summary['dominant_eye_state'] == 'open'
+    assert len(summary['band_power_trends']['alpha']) == 120
+    assert summary['band_power_trends']['alpha'][0] == 2.0 and summary['band_power_trends']['alpha'][-1] == 4.0
+    AnalysisSummary(**summary)
+
+    trends = store.trends(timestamps[-100], timestamps[-1], max_points=20, metrics=['attention_score'])
+    assert trends['resolution'] == 10.0 and len(trends['time']) <= 20
+    window = scores[-100:]
+    assert trends['attention_score']['max'][-1] == pytest.approx(window[-(n % 10 or 10):].max())
+    with pytest.raises(ValueError):
+        store.trends(metrics=['unknown'])
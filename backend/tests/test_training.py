@@ -0,0 +1,267 @@
+import pytest
+import numpy as np
+import joblib
+import asyncio
+from src.attention_bci import AttentionBCI, BCIConfig
+from src import training
+from src.inference import InferenceBatcher
+from src.model_registry import ModelVersion
+from src.tree_ensemble import CompiledEnsemble
+from src.adaptation import RunningScaler
+from src.evaluation import cross_validate
+from sklearn.ensemble import GradientBoostingClassifier
+from sklearn.preprocessing import StandardScaler
+
+def _make_epochs(n_epochs: int = 8, n_samples: int = 64, seed: int = 0):
+    """Gera épocas sintéticas com alfa forte na classe 1"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(n_samples) / 128.0
+    y = np.arange(n_epochs) % 2
+    X = rng.normal(0, 5, (n_epochs, 14, n_samples))
+    X += (y[:, None, None] * 20) * np.sin(2 * np.pi * 10 * t)
+    return X, y
+
+@pytest.mark.asyncio
+async def test_train_parallel_matches_sequential():
+    """Testa extração em blocos paralela contra a sequencial"""
+    X, y = _make_epochs()
+    progress = []
+    
+    sequential = AttentionBCI(BCIConfig(n_jobs=1, chunk_size=4))
+    stats = await sequential.train(X, y, progress_callback=lambda done, total: progress.append(done))
+    
+    parallel = AttentionBCI(BCIConfig(n_jobs=2, chunk_size=3))
+    features = await parallel.extract_features(X)
+    
+    assert sequential.is_trained
+    assert stats['n_epochs'] == len(X)
+    assert stats['n_features'] == len(sequential.feature_schema) == features.shape[1]
+    assert progress[-1] == len(X)
+    
+    expected = await sequential.extract_features(X)
+    np.testing.assert_allclose(features, expected)
+
+
+@pytest.mark.asyncio
+async def test_feature_store_reuses_cached_rows(tmp_path, monkeypatch):
+    """Testa reaproveitamento de linhas em cache e extração só das faltantes"""
+    X, _ = _make_epochs()
+    config = BCIConfig(feature_store_path=str(tmp_path))
+    
+    baseline = await AttentionBCI(config).extract_features(X[:5])
+    
+    extracted = []
+    original = training.EpochFeaturePipeline.transform
+    def counting_transform(self, epochs, schema):
+        extracted.append(len(epochs))
+        return original(self, epochs, schema)
+    monkeypatch.setattr(training.EpochFeaturePipeline, 'transform', counting_transform)
+    
+    # Nova instância (índice relido do disco): só 3 épocas novas
+    bci = AttentionBCI(config)
+    features = await bci.extract_features(X)
+    assert sum(extracted) == 3
+    np.testing.assert_array_equal(features[:5], baseline)
+    
+    # Tudo em cache: nada é extraído
+    extracted.clear()
+    again = await AttentionBCI(config).extract_features(X)
+    assert extracted == []
+    np.testing.assert_array_equal(again, features)
+    
+    # Configuração diferente usa outro namespace
+    other = AttentionBCI(BCIConfig(feature_store_path=str(tmp_path), dtype='float32'))
+    await other.extract_features(X[:2])
+    assert len(other.feature_store) == len(X) + 2
+
+@pytest.mark.asyncio
+async def test_model_save_load_roundtrip(tmp_path):
+    """Testa persistência do modelo e predição após recarregar"""
+    X, y = _make_epochs()
+    bci = AttentionBCI(BCIConfig(model_params={'n_estimators': 10, 'random_state': 0}))
+    await bci.train(X, y)
+    
+    path = bci.save(tmp_path / 'model.joblib')
+    loaded = AttentionBCI.load(path)
+    
+    assert loaded.is_trained
+    assert loaded.feature_schema == bci.feature_schema
+    assert loaded.config == bci.config
+    
+    expected = await bci.predict(X[1])
+    result = await loaded.predict(X[1])
+    assert result['prediction'] == expected['prediction']
+    assert result['probability'] == pytest.approx(expected['probability'])
+    
+    # Artefatos de outra versão do formato são rejeitados
+    artifact = joblib.load(path)
+    artifact['format_version'] = -1
+    joblib.dump(artifact, tmp_path / 'old.joblib')
+    with pytest.raises(ValueError):
+        AttentionBCI.load(tmp_path / 'old.joblib')
+
+@pytest.mark.asyncio
+async def test_background_retrain_swaps_and_rolls_back():
+    """Testa retreino em segundo plano, troca de versão e rollback"""
+    X, y = _make_epochs()
+    bci = AttentionBCI(BCIConfig(model_params={'n_estimators': 10, 'random_state': 0}))
+    await bci.train(X, y)
+    first = bci.model
+    
+    # Predições continuam na versão 1 enquanto a 2 é treinada
+    task = bci.start_retraining(X, 1 - y)
+    assert bci.is_retraining
+    with pytest.raises(RuntimeError):
+        bci.start_retraining(X, y)
+    during = await bci.predict(X[1])
+    stats = await task
+    
+    assert during['model_version'] == first.version
+    assert stats['model_version'] == bci.model.version == first.version + 1
+    assert bci.model.scaler is not first.scaler
+    
+    after = await bci.predict(X[1])
+    assert after['model_version'] == first.version + 1
+    
+    assert bci.rollback() == first.version
+    assert bci.model is first
+    assert bci.registry.versions() == [1, 2]
+
+@pytest.mark.asyncio
+async def test_inference_batcher_groups_concurrent_rows():
+    """Testa micro-lotes: linhas concorrentes viram uma única predição"""
+    rng = np.random.default_rng(0)
+    features = rng.normal(size=(40, 6))
+    y = (features[:, 0] > 0).astype(int)
+    scaler, classifier, _ = training.fit_classifier(features, y, {'n_estimators': 10})
+    model = ModelVersion(1, scaler, classifier, tuple(f'f{i}' for i in range(6)))
+    
+    batcher = InferenceBatcher(max_wait_ms=50, max_batch_size=16)
+    results = await asyncio.gather(*[
+        batcher.predict_proba(model, row) for row in features[:20]
+    ])
+    
+    # 16 linhas disparam um lote cheio, as 4 restantes saem por tempo
+    assert list(batcher.batch_sizes) == [16, 4]
+    expected = classifier.predict_proba(scaler.transform(features[:20]))
+    np.testing.assert_allclose(np.array([p for _, p in results]), expected)
+    assert [label for label, _ in results] == list(classifier.predict(scaler.transform(features[:20])))
+    
+    stats = batcher.get_stats()
+    assert stats['total_rows'] == 20 and stats['total_batches'] == 2
+    assert stats['latency_ms_p95'] >= stats['latency_ms_p50'] > 0
+
+@pytest.mark.parametrize("n_classes,loss", [(2, 'log_loss'), (3, 'log_loss'), (2, 'exponential')])
+def test_compiled_ensemble_matches_sklearn(n_classes, loss):
+    """Testa paridade do avaliador vetorizado com predict_proba do sklearn"""
+    rng = np.random.default_rng(n_classes)
+    X = rng.normal(size=(300, 20))
+    y = np.digitize(X[:, 0] + X[:, 1] ** 2, np.quantile(X[:, 0] + X[:, 1] ** 2, np.linspace(0, 1, n_classes + 1)[1:-1]))
+    classifier = GradientBoostingClassifier(n_estimators=30, max_depth=3, loss=loss, random_state=0).fit(X, y)
+    
+    ensemble = CompiledEnsemble.from_sklearn(classifier)
+    X_test = rng.normal(size=(100, 20))
+    np.testing.assert_allclose(ensemble.predict_proba(X_test), classifier.predict_proba(X_test), atol=1e-12)
+    np.testing.assert_array_equal(ensemble.predict(X_test), classifier.predict(X_test))
+    assert ensemble.feature.flags['C_CONTIGUOUS'] and len(ensemble.roots) == 30 * (n_classes if n_classes > 2 else 1)
+
+@pytest.mark.asyncio
+async def test_classifier_backends_and_partial_fit():
+    """Testa backends configuráveis e atualização incremental com SGD"""
+    X, y = _make_epochs()
+    
+    with pytest.raises(ValueError):
+        BCIConfig(classifier='svm')
+    
+    hist = AttentionBCI(BCIConfig(classifier='hist_gradient_boosting', fit_in_process=False))
+    await hist.train(X, y)
+    assert (await hist.predict(X[0]))['prediction'] in (0, 1)
+    with pytest.raises(ValueError):
+        await hist.partial_fit(X[:2], y[:2])
+    
+    sgd = AttentionBCI(BCIConfig(classifier='sgd', fit_in_process=False))
+    stats = await sgd.train(X, y)
+    assert stats['classifier'] == 'sgd' and len(stats['feature_importance']) == stats['n_features']
+    
+    first = sgd.model
+    update = await sgd.partial_fit(X[:4], y[:4])
+    assert update['model_version'] == first.version + 1 and update['n_updates'] == 1
+    assert sgd.model.scaler is first.scaler
+    assert not np.array_equal(sgd.model.classifier.coef_, first.classifier.coef_)
+    
+    # Perdas sem predict_proba são rejeitadas no treino, antes da extração
+    hinge = AttentionBCI(BCIConfig(classifier='sgd', model_params={'loss': 'hinge'}))
+    with pytest.raises(ValueError):
+        await hinge.train(X, y)
+    assert not hinge.is_trained and hinge.feature_schema == []
+    huber = AttentionBCI(BCIConfig(classifier='sgd', model_params={'loss': 'modified_huber'}, fit_in_process=False))
+    await huber.train(X, y)
+    assert sum((await huber.predict(X[0]))['probabilities']) == pytest.approx(1.0)
+
+def test_running_scaler_converges_to_subject_statistics():
+    """Testa média/variância online contra as estatísticas em lote"""
+    rng = np.random.default_rng(0)
+    population = StandardScaler().fit(rng.normal(0, 1, (200, 5)))
+    subject = rng.normal(3, 2, (500, 5))
+    
+    scaler = RunningScaler.from_scaler(population, prior_weight=0)
+    for row in subject:
+        scaler.update(row)
+    np.testing.assert_allclose(scaler.mean, subject.mean(axis=0))
+    np.testing.assert_allclose(scaler.var, subject.var(axis=0))
+    np.testing.assert_allclose(scaler.transform(subject), StandardScaler().fit_transform(subject))
+
+@pytest.mark.asyncio
+async def test_subject_adaptation_checkpoint_roundtrip(tmp_path):
+    """Testa adaptação online com SGD e restauração do checkpoint"""
+    X, y = _make_epochs()
+    bci = AttentionBCI(BCIConfig(classifier='sgd', fit_in_process=False))
+    await bci.train(X, y)
+    base_coef = bci.model.classifier.coef_.copy()
+    
+    await bci.predict(X[0], subject_id='s1')
+    stats = await bci.adapt('s1', X[1], 1)
+    assert stats == {'model_version': 1, 'incremental': True, 'n_observed': 2, 'n_labeled': 1}
+    # O modelo global não é alterado
+    np.testing.assert_array_equal(bci.model.classifier.coef_, base_coef)
+    
+    path = bci.save_adapter('s1', tmp_path / 's1.joblib')
+    expected = await bci.predict(X[2], subject_id='s1')
+    
+    restored = AttentionBCI(BCIConfig(classifier='sgd', fit_in_process=False))
+    restored.registry.publish(bci.model)
+    restored.load_adapter('s1', path)
+    result = await restored.predict(X[2], subject_id='s1')
+    assert result['probability'] == pytest.approx(expected['probability'])
+
+@pytest.mark.asyncio
+async def test_grouped_cross_validation_parallel_matches_sequential():
+    """Testa validação cruzada agrupada em processos com memória compartilhada"""
+    rng = np.random.default_rng(0)
+    features = rng.normal(size=(60, 8))
+    y = (features[:, 0] > 0).astype(int)
+    groups = np.repeat(np.arange(6), 10)
+    grid = {'alpha': [1e-4, 1e-1], 'penalty': ['l2']}
+    
+    sequential = await cross_validate(features, y, groups, grid, backend='sgd',
+                                      base_params={'loss': 'log_loss', 'random_state': 0}, n_splits=3)
+    parallel = await cross_validate(features, y, groups, grid, backend='sgd',
+                                    base_params={'loss': 'log_loss', 'random_state': 0}, n_splits=3, n_jobs=2)
+    
+    assert [r.rank for r in parallel] == [1, 2]
+    assert parallel[0].mean_score >= parallel[1].mean_score
+    assert [(r.params, r.fold_scores) for r in parallel] == [(r.params, r.fold_scores) for r in sequential]
+    assert all(len(r.fold_scores) == 3 and r.mean_fit_time > 0 for r in parallel)
+    
+    with pytest.raises(ValueError):
+        await cross_validate(features, y, np.zeros(60), grid, n_splits=3)
+
+@pytest.mark.asyncio
+async def test_evaluate_uses_extracted_features_once():
+    """Testa a API de avaliação sobre épocas brutas"""
+    X, y = _make_epochs()
+    bci = AttentionBCI(BCIConfig(classifier='sgd'))
+    table = await bci.evaluate(X, y, groups=np.arange(8) // 2, param_grid={'alpha': [1e-4, 1e-2]}, n_splits=2)
+    assert [row['rank'] for row in table] == [1, 2]
+    assert {row['params']['alpha'] for row in table} == {1e-4, 1e-2}
+    assert not bci.is_trained